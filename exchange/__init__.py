@@ -3,7 +3,7 @@
 # from exchange.bybit import Bybit
 # from exchange.bitget import Bitget
 # from exchange.kis import KoreaInvestment
-from exchange.pexchange import get_bot, get_exchange
+from exchange.pexchange import get_bot, registry
 from exchange.database import db
 from exchange.model import (
     PriceRequest,
@@ -0,0 +1,130 @@
+import asyncio
+import time
+from loguru import logger
+from exchange import metrics
+from exchange.utility import settings
+
+
+class AccountState:
+    """
+    거래소 계정의 잔고/포지션 캐시
+    REST 스냅샷 한 번으로 채운 뒤 private 웹소켓 이벤트로 최신 상태를 유지합니다.
+    스트림이 끊겼거나 데이터가 ACCOUNT_CACHE_MAX_AGE 보다 오래되면 REST 로 조회합니다.
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self._balances: dict[str, tuple[dict, float]] = {}
+        self._positions: dict[str, dict[str, tuple[dict, float]]] = {}
+        self._consumed_at: dict[str, float] = {}
+        self._healthy: dict[tuple[str, str], bool] = {}
+        self._tasks: dict[tuple[str, str], asyncio.Task] = {}
+
+    @property
+    def max_age(self) -> float:
+        return settings.ACCOUNT_CACHE_MAX_AGE
+
+    def get_market_type(self) -> str:
+        return self.client.options.get("defaultType", "spot")
+
+    def is_fresh(self, market_type: str, stream: str, updated_at: float) -> bool:
+        return (
+            self._healthy.get((market_type, stream), False)
+            and updated_at > self._consumed_at.get(market_type, 0)
+            and time.monotonic() - updated_at < self.max_age
+        )
+
+    def consume(self, market_type: str):
+        # 캐시를 읽은 직후 주문이 나가므로, 다음 이벤트가 올 때까지는 REST 를 사용
+        self._consumed_at[market_type] = time.monotonic()
+
+    async def fetch_balance(self, currency: str, params: dict = None) -> dict:
+        market_type = self.get_market_type()
+        cached = self._balances.get(market_type)
+        if cached is not None:
+            balance, updated_at = cached
+            if self.is_fresh(market_type, "balance", updated_at) and currency in (
+                balance.get("total") or {}
+            ):
+                self.consume(market_type)
+                metrics.cache_requests.inc("balance", self.client.id, "hit")
+                return balance
+
+        metrics.cache_requests.inc("balance", self.client.id, "miss")
+        started_at = time.monotonic()
+        balance = await self.client.fetch_balance(params or {})
+        self._set_balance(market_type, balance, started_at)
+        self.consume(market_type)
+        self._start(market_type, "balance")
+        return balance
+
+    async def fetch_positions(self, symbol: str) -> list[dict]:
+        market_type = self.get_market_type()
+        by_side = self._positions.get(market_type, {}).get(symbol)
+        if by_side:
+            updated_at = max(position_at for _, position_at in by_side.values())
+            if self.is_fresh(market_type, "positions", updated_at):
+                self.consume(market_type)
+                metrics.cache_requests.inc("position", self.client.id, "hit")
+                return [position for position, _ in by_side.values()]
+
+        metrics.cache_requests.inc("position", self.client.id, "miss")
+        started_at = time.monotonic()
+        positions = await self.client.fetch_positions(symbols=[symbol])
+        self._positions.setdefault(market_type, {})[symbol] = {}
+        self._set_positions(market_type, positions, started_at)
+        self.consume(market_type)
+        self._start(market_type, "positions")
+        return positions
+
+    def _set_balance(self, market_type: str, balance: dict, updated_at: float):
+        cached = self._balances.get(market_type)
+        if cached is None or cached[1] < updated_at:
+            self._balances[market_type] = (balance, updated_at)
+
+    def _set_positions(self, market_type: str, positions: list[dict], updated_at: float):
+        by_symbol = self._positions.setdefault(market_type, {})
+        for position in positions:
+            symbol = position.get("symbol")
+            if symbol not in by_symbol:
+                continue
+            side = position.get("side")
+            if side is None and not position.get("contracts"):
+                by_symbol[symbol] = {}
+            else:
+                by_symbol[symbol][side] = (position, updated_at)
+
+    def _start(self, market_type: str, stream: str):
+        has = "watchBalance" if stream == "balance" else "watchPositions"
+        if (market_type, stream) in self._tasks or not self.client.has.get(has):
+            return
+        self._tasks[(market_type, stream)] = asyncio.create_task(
+            self._watch(market_type, stream)
+        )
+
+    async def _watch(self, market_type: str, stream: str):
+        params = {"type": market_type}
+        delay = 1
+        while True:
+            try:
+                if stream == "balance":
+                    balance = await self.client.watch_balance(params)
+                    self._set_balance(market_type, balance, time.monotonic())
+                else:
+                    positions = await self.client.watch_positions(None, None, None, params)
+                    self._set_positions(market_type, positions, time.monotonic())
+                self._healthy[(market_type, stream)] = True
+                delay = 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._healthy[(market_type, stream)] = False
+                logger.warning(f"{self.client.id} {stream} 스트림 에러: {str(e)}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 60)
+
+    def stop(self):
+        for task in self._tasks.values():
+            task.cancel()
+        self._tasks.clear()
+        self._healthy.clear()
@@ -1,25 +1,40 @@
-from exchange.pexchange import ccxt, ccxt_async, httpx
+from exchange.pexchange import ccxt, ccxt_async, ccxt_pro, httpx
 from devtools import debug
 from exchange.model import MarketOrder
 import exchange.error as error
+from exchange.markets import market_snapshot
+from exchange.account import AccountState
+from exchange.ticker import PriceService
+from exchange.timing import traced
 
 
 class Binance:
-    def __init__(self, key, secret):
-        self.client = ccxt.binance(
+    def __init__(self, key, secret, market_type="spot"):
+        self.market_type = market_type
+        self.client = ccxt_pro.binance(
             {
                 "apiKey": key,
                 "secret": secret,
-                "options": {"adjustForTimeDifference": True},
+                "options": {
+                    "adjustForTimeDifference": True,
+                    "defaultType": market_type,
+                },
             }
         )
-        self.client.load_markets()
         self.position_mode = "one-way"
-        self.order_info: MarketOrder = None
+        self.account = AccountState(self.client)
+        self.prices = PriceService(self.client)
 
-    def init_info(self, order_info: MarketOrder):
-        self.order_info = order_info
+    async def load_markets(self):
+        await market_snapshot.hydrate(self.client)
+
+    async def close(self):
+        market_snapshot.stop(self.client)
+        self.account.stop()
+        self.prices.stop()
+        await self.client.close()
 
+    def init_info(self, order_info: MarketOrder):
         unified_symbol = order_info.unified_symbol
         market = self.client.market(unified_symbol)
 
@@ -30,27 +45,25 @@ class Binance:
                 )
             )
 
-        if order_info.is_futures:
-            if order_info.is_coinm:
-                is_contract = market.get("contract")
-                if is_contract:
-                    order_info.is_contract = True
-                    order_info.contract_size = market.get("contractSize")
-                self.client.options["defaultType"] = "delivery"
-            else:
-                self.client.options["defaultType"] = "swap"
-        else:
-            self.client.options["defaultType"] = "spot"
+        if order_info.is_futures and order_info.is_coinm:
+            is_contract = market.get("contract")
+            if is_contract:
+                order_info.is_contract = True
+                order_info.contract_size = market.get("contractSize")
+
+        return order_info
 
-    def get_ticker(self, symbol: str):
-        return self.client.fetch_ticker(symbol)
+    async def get_ticker(self, symbol: str):
+        return await self.prices.get_ticker(symbol)
 
-    def get_price(self, symbol: str):
-        return self.get_ticker(symbol)["last"]
+    async def get_price(self, symbol: str):
+        return await self.prices.get_price(symbol)
 
-    def get_futures_position(self, symbol=None, all=False):
+    async def get_futures_position(
+        self, symbol=None, order_info: MarketOrder = None, all=False
+    ):
         if symbol is None and all:
-            positions = self.client.fetch_balance()["info"]["positions"]
+            positions = (await self.client.fetch_balance())["info"]["positions"]
             positions = [
                 position
                 for position in positions
@@ -59,8 +72,8 @@ class Binance:
             return positions
 
         positions = None
-        if self.order_info.is_coinm:
-            positions = self.client.fetch_balance()["info"]["positions"]
+        if order_info.is_coinm:
+            positions = (await self.client.fetch_balance())["info"]["positions"]
             positions = [
                 position
                 for position in positions
@@ -68,12 +81,12 @@ class Binance:
                 and position["symbol"] == self.client.market(symbol).get("id")
             ]
         else:
-            positions = self.client.fetch_positions(symbols=[symbol])
+            positions = await self.account.fetch_positions(symbol)
 
         long_contracts = None
         short_contracts = None
         if positions:
-            if self.order_info.is_coinm:
+            if order_info.is_coinm:
                 for position in positions:
                     amt = float(position["positionAmt"])
                     if position["positionSide"] == "LONG":
@@ -91,12 +104,12 @@ class Binance:
                         long_contracts = position["contracts"]
                     elif position["side"] == "short":
                         short_contracts = position["contracts"]
-            if self.order_info.is_close and self.order_info.is_buy:
+            if order_info.is_close and order_info.is_buy:
                 if not short_contracts:
                     raise error.ShortPositionNoneError()
                 else:
                     return short_contracts
-            elif self.order_info.is_close and self.order_info.is_sell:
+            elif order_info.is_close and order_info.is_sell:
                 if not long_contracts:
                     raise error.LongPositionNoneError()
                 else:
@@ -104,17 +117,16 @@ class Binance:
         else:
             raise error.PositionNoneError()
 
-    def get_balance(self, base: str):
+    async def get_balance(self, base: str, order_info: MarketOrder):
         free_balance_by_base = None
 
-        if self.order_info.is_entry or (
-            self.order_info.is_spot
-            and (self.order_info.is_buy or self.order_info.is_sell)
+        if order_info.is_entry or (
+            order_info.is_spot
+            and (order_info.is_buy or order_info.is_sell)
         ):
+            balance = await self.account.fetch_balance(base)
             free_balance = (
-                self.client.fetch_free_balance()
-                if not self.order_info.is_total
-                else self.client.fetch_total_balance()
+                balance["free"] if not order_info.is_total else balance["total"]
             )
             free_balance_by_base = free_balance.get(base)
 
@@ -122,43 +134,48 @@ class Binance:
             raise error.FreeAmountNoneError()
         return free_balance_by_base
 
-    def get_amount(self, order_info: MarketOrder) -> float:
+    @traced("get_amount")
+    async def get_amount(self, order_info: MarketOrder) -> float:
         if order_info.amount is not None and order_info.percent is not None:
             raise error.AmountPercentBothError()
         elif order_info.amount is not None:
             if order_info.is_contract:
-                current_price = self.get_price(order_info.unified_symbol)
+                current_price = await self.get_price(order_info.unified_symbol)
                 result = (order_info.amount * current_price) // order_info.contract_size
             else:
                 result = order_info.amount
         elif order_info.percent is not None:
             if order_info.is_entry or (order_info.is_spot and order_info.is_buy):
                 if order_info.is_coinm:
-                    free_base = self.get_balance(order_info.base)
+                    free_base = await self.get_balance(order_info.base, order_info)
                     if order_info.is_contract:
-                        current_price = self.get_price(order_info.unified_symbol)
+                        current_price = await self.get_price(order_info.unified_symbol)
                         result = (
                             free_base * order_info.percent / 100 * current_price
                         ) // order_info.contract_size
                     else:
                         result = free_base * order_info.percent / 100
                 else:
-                    free_quote = self.get_balance(order_info.quote)
+                    free_quote = await self.get_balance(order_info.quote, order_info)
                     cash = free_quote * (order_info.percent - 0.5) / 100
-                    current_price = self.get_price(order_info.unified_symbol)
+                    current_price = await self.get_price(order_info.unified_symbol)
                     if order_info.is_contract:
                         result = (cash / current_price) // order_info.contract_size
                     else:
                         result = cash / current_price
-            elif self.order_info.is_close:
+            elif order_info.is_close:
                 if order_info.is_contract:
-                    free_amount = self.get_futures_position(order_info.unified_symbol)
+                    free_amount = await self.get_futures_position(
+                        order_info.unified_symbol, order_info
+                    )
                     result = free_amount * order_info.percent / 100
                 else:
-                    free_amount = self.get_futures_position(order_info.unified_symbol)
+                    free_amount = await self.get_futures_position(
+                        order_info.unified_symbol, order_info
+                    )
                     result = free_amount * float(order_info.percent) / 100
             elif order_info.is_spot and order_info.is_sell:
-                free_amount = self.get_balance(order_info.base)
+                free_amount = await self.get_balance(order_info.base, order_info)
                 result = free_amount * float(order_info.percent) / 100
 
             result = float(
@@ -170,17 +187,18 @@ class Binance:
 
         return result
 
-    def set_leverage(self, leverage, symbol):
-        if self.order_info.is_futures:
-            self.client.set_leverage(leverage, symbol)
+    @traced("set_leverage")
+    async def set_leverage(self, leverage, symbol, order_info: MarketOrder):
+        if order_info.is_futures:
+            await self.client.set_leverage(leverage, symbol)
 
-    def market_order(self, order_info: MarketOrder):
+    async def market_order(self, order_info: MarketOrder):
         from exchange.pexchange import retry
 
         symbol = order_info.unified_symbol  # self.parse_symbol(base, quote)
         params = {}
         try:
-            return retry(
+            return await retry(
                 self.client.create_order,
                 symbol,
                 order_info.type.lower(),
@@ -194,7 +212,7 @@ class Binance:
                 instance=self,
             )
         except Exception as e:
-            raise error.OrderError(e, self.order_info)
+            raise error.OrderError(e, order_info)
 
     # async def market_order_async(
     #     self,
@@ -210,33 +228,34 @@ class Binance:
     #         symbol, type.lower(), side.lower(), amount
     #     )
 
-    def market_buy(self, order_info: MarketOrder):
+    async def market_buy(self, order_info: MarketOrder):
         # 수량기반
-        buy_amount = self.get_amount(order_info)
+        buy_amount = await self.get_amount(order_info)
         order_info.amount = buy_amount
 
-        return self.market_order(order_info)
+        return await self.market_order(order_info)
 
-    def market_sell(self, order_info: MarketOrder):
-        sell_amount = self.get_amount(order_info)
+    async def market_sell(self, order_info: MarketOrder):
+        sell_amount = await self.get_amount(order_info)
         order_info.amount = sell_amount
-        return self.market_order(order_info)
+        return await self.market_order(order_info)
 
-    def market_entry(
+    async def market_entry(
         self,
         order_info: MarketOrder,
     ):
         from exchange.pexchange import retry
 
         # self.client.options["defaultType"] = "swap"
-        symbol = self.order_info.unified_symbol  # self.parse_symbol(base, quote)
+        symbol = order_info.unified_symbol  # self.parse_symbol(base, quote)
 
-        entry_amount = self.get_amount(order_info)
+        entry_amount = await self.get_amount(order_info)
         if entry_amount == 0:
             raise error.MinAmountError()
-        if self.position_mode == "one-way":
+        position_mode = self.position_mode
+        if position_mode == "one-way":
             params = {}
-        elif self.position_mode == "hedge":
+        elif position_mode == "hedge":
             if order_info.side == "buy":
                 if order_info.is_entry:
                     positionSide = "LONG"
@@ -249,10 +268,10 @@ class Binance:
                     positionSide = "LONG"
             params = {"positionSide": positionSide}
         if order_info.leverage is not None:
-            self.set_leverage(order_info.leverage, symbol)
+            await self.set_leverage(order_info.leverage, symbol, order_info)
 
         try:
-            result = retry(
+            result = await retry(
                 self.client.create_order,
                 symbol,
                 order_info.type.lower(),
@@ -264,19 +283,20 @@ class Binance:
                 max_attempts=10,
                 delay=0.1,
                 instance=self,
+                position_mode=position_mode,
             )
             return result
         except Exception as e:
-            raise error.OrderError(e, self.order_info)
+            raise error.OrderError(e, order_info)
 
-    def is_hedge_mode(self):
-        response = self.client.fapiPrivate_get_positionside_dual()
+    async def is_hedge_mode(self):
+        response = await self.client.fapiPrivate_get_positionside_dual()
         if response["dualSidePosition"]:
             return True
         else:
             return False
 
-    def market_sltp_order(
+    async def market_sltp_order(
         self,
         base: str,
         quote: str,
@@ -285,12 +305,13 @@ class Binance:
         amount: float,
         stop_price: float,
         profit_price: float,
+        order_info: MarketOrder,
     ):
-        symbol = self.order_info.unified_symbol  # self.parse_symbol(base, quote)
+        symbol = order_info.unified_symbol  # self.parse_symbol(base, quote)
         inverted_side = (
             "sell" if side.lower() == "buy" else "buy"
         )  # buy면 sell, sell이면 buy * 진입 포지션과 반대로 주문 넣어줘 야함
-        self.client.create_order(
+        await self.client.create_order(
             symbol,
             "STOP_MARKET",
             inverted_side,
@@ -298,7 +319,7 @@ class Binance:
             None,
             {"stopPrice": stop_price, "newClientOrderId": "STOP_MARKET"},
         )  # STOP LOSS 오더
-        self.client.create_order(
+        await self.client.create_order(
             symbol,
             "TAKE_PROFIT_MARKET",
             inverted_side,
@@ -323,17 +344,18 @@ class Binance:
         #     # 'newOrderRespType': 'ACK',  # ACK, RESULT, FULL
         # })
 
-    def market_close(
+    async def market_close(
         self,
         order_info: MarketOrder,
     ):
         from exchange.pexchange import retry
 
-        symbol = self.order_info.unified_symbol  # self.parse_symbol(base, quote)
-        close_amount = self.get_amount(order_info)
-        if self.position_mode == "one-way":
+        symbol = order_info.unified_symbol  # self.parse_symbol(base, quote)
+        close_amount = await self.get_amount(order_info)
+        position_mode = self.position_mode
+        if position_mode == "one-way":
             params = {"reduceOnly": True}
-        elif self.position_mode == "hedge":
+        elif position_mode == "hedge":
             if order_info.side == "buy":
                 if order_info.is_entry:
                     positionSide = "LONG"
@@ -347,7 +369,7 @@ class Binance:
             params = {"positionSide": positionSide}
 
         try:
-            return retry(
+            return await retry(
                 self.client.create_order,
                 symbol,
                 order_info.type.lower(),
@@ -359,20 +381,21 @@ class Binance:
                 max_attempts=10,
                 delay=0.1,
                 instance=self,
+                position_mode=position_mode,
             )
         except Exception as e:
-            raise error.OrderError(e, self.order_info)
+            raise error.OrderError(e, order_info)
 
     def get_listen_key(self):
-        url = "https://fapi.binance.com/fapi/v1/listenKey"
+        url = f"{self.client.urls['api']['fapiPrivate']}/listenKey"
 
         listenkey = httpx.post(
             url, headers={"X-MBX-APIKEY": self.client.apiKey}
         ).json()["listenKey"]
         return listenkey
 
-    def get_trades(self):
-        is_futures = self.order_info.is_futures
+    async def get_trades(self, order_info: MarketOrder):
+        is_futures = order_info.is_futures
         if is_futures:
-            trades = self.client.fetch_my_trades()
+            trades = await self.client.fetch_my_trades()
             print(trades)
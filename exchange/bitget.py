@@ -1,22 +1,28 @@
 from pprint import pprint
-from exchange.pexchange import ccxt
+from exchange.pexchange import ccxt, ccxt_async, ccxt_pro
 from exchange.database import db
 from exchange.model import MarketOrder
 import exchange.error as error
+from exchange.markets import market_snapshot
+from exchange.account import AccountState
+from exchange.ticker import PriceService
 from exchange.utility import settings, log_message
+from exchange.timing import traced
 from devtools import debug
 
 
 class Bitget:
-    def __init__(self, key, secret, passphrase=None):
+    def __init__(self, key, secret, passphrase=None, market_type="spot"):
+        self.market_type = market_type
         # 데모 모드 체크
         self.demo_mode = settings.BITGET_DEMO_MODE == "true"
         
-        self.client = ccxt.bitget(
+        self.client = ccxt_pro.bitget(
             {
                 "apiKey": key,
                 "secret": secret,
                 "password": passphrase,
+                "options": {"defaultType": market_type},
             }
         )
         
@@ -29,13 +35,20 @@ class Bitget:
             self.client.headers['PAPTRADING'] = '1'
             log_message("비트겟 데모 트레이딩 모드 활성화됨")
         
-        self.client.load_markets()
-        self.order_info: MarketOrder = None
+        self.account = AccountState(self.client)
+        self.prices = PriceService(self.client)
         self.position_mode = "one-way"
 
-    def init_info(self, order_info: MarketOrder):
-        self.order_info = order_info
+    async def load_markets(self):
+        await market_snapshot.hydrate(self.client)
+
+    async def close(self):
+        market_snapshot.stop(self.client)
+        self.account.stop()
+        self.prices.stop()
+        await self.client.close()
 
+    def init_info(self, order_info: MarketOrder):
         unified_symbol = order_info.unified_symbol
         market = self.client.market(unified_symbol)
 
@@ -46,26 +59,22 @@ class Bitget:
                 )
             )
 
-        if order_info.is_futures:
-            if order_info.is_coinm:
-                self.client.options["defaultType"] = "delivery"
-                is_contract = market.get("contract")
-                if is_contract:
-                    order_info.is_contract = True
-                    order_info.contract_size = market.get("contractSize")
-            else:
-                self.client.options["defaultType"] = "swap"
-        else:
-            self.client.options["defaultType"] = "spot"
+        if order_info.is_futures and order_info.is_coinm:
+            is_contract = market.get("contract")
+            if is_contract:
+                order_info.is_contract = True
+                order_info.contract_size = market.get("contractSize")
 
-    def get_ticker(self, symbol: str):
-        return self.client.fetch_ticker(symbol)
+        return order_info
 
-    def get_price(self, symbol: str):
-        return self.get_ticker(symbol)["last"]
+    async def get_ticker(self, symbol: str):
+        return await self.prices.get_ticker(symbol)
 
-    def get_futures_position(self, symbol):
-        positions = self.client.fetch_positions([symbol])
+    async def get_price(self, symbol: str):
+        return await self.prices.get_price(symbol)
+
+    async def get_futures_position(self, symbol, order_info: MarketOrder):
+        positions = await self.client.fetch_positions([symbol])
         long_contracts = None
         short_contracts = None
 
@@ -77,12 +86,12 @@ class Bitget:
                     elif position["side"] == "short":
                         short_contracts = float(position["info"]["available"])
 
-                if self.order_info.is_close and self.order_info.is_buy:
+                if order_info.is_close and order_info.is_buy:
                     if not short_contracts:
                         raise error.ShortPositionNoneError()
                     else:
                         return short_contracts
-                elif self.order_info.is_close and self.order_info.is_sell:
+                elif order_info.is_close and order_info.is_sell:
                     if not long_contracts:
                         raise error.LongPositionNoneError()
                     else:
@@ -96,25 +105,25 @@ class Bitget:
         else:
             raise error.PositionNoneError()
 
-    def get_balance(self, base: str):
+    async def get_balance(self, base: str, order_info: MarketOrder):
         free_balance_by_base = None
-        if self.order_info.is_entry or (
-            self.order_info.is_spot
-            and (self.order_info.is_buy or self.order_info.is_sell)
+        if order_info.is_entry or (
+            order_info.is_spot
+            and (order_info.is_buy or order_info.is_sell)
         ):
             balance_params = {"coin": base}
             # 데모 모드에서는 추가 파라미터 불필요 (헤더로 처리됨)
+            balance = await self.account.fetch_balance(base, balance_params)
             free_balance = (
-                self.client.fetch_free_balance(balance_params)
-                if not self.order_info.is_total
-                else self.client.fetch_total_balance(balance_params)
+                balance["free"] if not order_info.is_total else balance["total"]
             )
             free_balance_by_base = free_balance.get(base)
         if free_balance_by_base is None or free_balance_by_base == 0:
             raise error.FreeAmountNoneError()
         return free_balance_by_base
 
-    def get_amount(self, order_info: MarketOrder) -> float:
+    @traced("get_amount")
+    async def get_amount(self, order_info: MarketOrder) -> float:
         if order_info.amount is not None and order_info.percent is not None:
             raise error.AmountPercentBothError()
         elif order_info.amount is not None:
@@ -122,15 +131,17 @@ class Bitget:
 
         elif order_info.percent is not None:
             if order_info.is_entry or (order_info.is_spot and order_info.is_buy):
-                free_quote = self.get_balance(order_info.quote)
+                free_quote = await self.get_balance(order_info.quote, order_info)
                 cash = free_quote * (order_info.percent - 1) / 100
-                current_price = self.get_price(order_info.unified_symbol)
+                current_price = await self.get_price(order_info.unified_symbol)
                 result = cash / current_price
-            elif self.order_info.is_close:
-                free_amount = self.get_futures_position(order_info.unified_symbol)
+            elif order_info.is_close:
+                free_amount = await self.get_futures_position(
+                    order_info.unified_symbol, order_info
+                )
                 result = free_amount * order_info.percent / 100
             elif order_info.is_spot and order_info.is_sell:
-                free_amount = self.get_balance(order_info.base)
+                free_amount = await self.get_balance(order_info.base, order_info)
                 result = free_amount * order_info.percent / 100
             result = float(
                 self.client.amount_to_precision(order_info.unified_symbol, result)
@@ -140,13 +151,14 @@ class Bitget:
             raise error.AmountPercentNoneError()
         return result
 
-    def set_leverage(self, leverage, symbol):
-        hold_side = "long" if self.order_info.is_buy else "short"
+    @traced("set_leverage")
+    async def set_leverage(self, leverage, symbol, order_info: MarketOrder):
+        hold_side = "long" if order_info.is_buy else "short"
         params = {"holdSide": hold_side}
         # 데모 모드에서는 별도 헤더 추가 불필요 (이미 client에 설정됨)
-        return self.client.set_leverage(leverage, symbol, params=params)
+        return await self.client.set_leverage(leverage, symbol, params=params)
 
-    def market_order(self, order_info: MarketOrder):
+    async def market_order(self, order_info: MarketOrder):
         from exchange.pexchange import retry
 
         symbol = order_info.unified_symbol
@@ -154,7 +166,7 @@ class Bitget:
         
         # 데모 모드에서는 별도 파라미터 추가 불필요 (헤더로 처리됨)
         try:
-            return retry(
+            return await retry(
                 self.client.create_order,
                 symbol,
                 order_info.type.lower(),
@@ -170,30 +182,31 @@ class Bitget:
         except Exception as e:
             raise error.OrderError(e, order_info)
 
-    def market_buy(self, order_info: MarketOrder):
+    async def market_buy(self, order_info: MarketOrder):
         # 비용주문
-        buy_amount = self.get_amount(order_info)
+        buy_amount = await self.get_amount(order_info)
         order_info.amount = buy_amount
-        order_info.price = self.get_price(order_info.unified_symbol)
+        order_info.price = await self.get_price(order_info.unified_symbol)
 
-        return self.market_order(order_info)
+        return await self.market_order(order_info)
 
-    def market_sell(self, order_info: MarketOrder):
-        sell_amount = self.get_amount(order_info)
+    async def market_sell(self, order_info: MarketOrder):
+        sell_amount = await self.get_amount(order_info)
         order_info.amount = sell_amount
-        return self.market_order(order_info)
+        return await self.market_order(order_info)
 
-    def market_entry(self, order_info: MarketOrder):
+    async def market_entry(self, order_info: MarketOrder):
         from exchange.pexchange import retry
 
         symbol = order_info.unified_symbol
-        entry_amount = self.get_amount(order_info)
+        entry_amount = await self.get_amount(order_info)
         if entry_amount == 0:
             raise error.MinAmountError()
         
-        if self.position_mode == "one-way":
+        position_mode = self.position_mode
+        if position_mode == "one-way":
             params = {"oneWayMode": True}
-        elif self.position_mode == "hedge":
+        elif position_mode == "hedge":
             if order_info.is_futures:
                 if order_info.is_buy:
                     trade_side = "Open" 
@@ -203,13 +216,13 @@ class Bitget:
                 
         params |= {"marginMode": order_info.margin_mode or "isolated"}
         if order_info.margin_mode is not None:
-            self.client.set_margin_mode(order_info.margin_mode, symbol)
+            await self.client.set_margin_mode(order_info.margin_mode, symbol)
 
         if order_info.leverage is not None:
-            retry(self.set_leverage, order_info.leverage, symbol, order_info=order_info, instance=self)
+            await retry(self.set_leverage, order_info.leverage, symbol, order_info, order_info=order_info, instance=self)
         
         try:
-            return retry(
+            return await retry(
                 self.client.create_order,
                 symbol,
                 order_info.type.lower(),
@@ -221,20 +234,22 @@ class Bitget:
                 max_attempts=5,
                 delay=0.1,
                 instance=self,
+                position_mode=position_mode,
             )
 
         except Exception as e:
             raise error.OrderError(e, order_info)
 
-    def market_close(self, order_info: MarketOrder):
+    async def market_close(self, order_info: MarketOrder):
         from exchange.pexchange import retry
 
-        symbol = self.order_info.unified_symbol
-        close_amount = self.get_amount(order_info)
+        symbol = order_info.unified_symbol
+        close_amount = await self.get_amount(order_info)
         final_side = order_info.side
-        if self.position_mode == "one-way":
+        position_mode = self.position_mode
+        if position_mode == "one-way":
             params = {"reduceOnly": True, "oneWayMode": True}
-        elif self.position_mode == "hedge":
+        elif position_mode == "hedge":
             if order_info.side == "sell":
                 final_side = "buy"
             elif order_info.side == "buy":
@@ -242,7 +257,7 @@ class Bitget:
             params = {"reduceOnly": True, "tradeSide": "close"}
         
         try:
-            result = retry(
+            result = await retry(
                 self.client.create_order,
                 symbol,
                 order_info.type.lower(),
@@ -254,8 +269,9 @@ class Bitget:
                 max_attempts=5,
                 delay=0.1,
                 instance=self,
+                position_mode=position_mode,
             )
 
             return result
         except Exception as e:
-            raise error.OrderError(e, self.order_info)
+            raise error.OrderError(e, order_info)
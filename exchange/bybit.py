@@ -1,30 +1,45 @@
 from pprint import pprint
-from exchange.pexchange import ccxt
+from exchange.pexchange import ccxt, ccxt_async, ccxt_pro
 from exchange.model import MarketOrder
-import time
+import asyncio
 import exchange.error as error
+from exchange.markets import market_snapshot
+from exchange.account import AccountState
+from exchange.ticker import PriceService
+from exchange.timing import traced
 from devtools import debug
 
 
 class Bybit:
-    def __init__(self, key, secret):
-        self.client = ccxt.bybit(
+    def __init__(self, key, secret, market_type="spot"):
+        self.market_type = market_type
+        self.client = ccxt_pro.bybit(
             {
                 "apiKey": key,
                 "secret": secret,
-                "options": {"adjustForTimeDifference": True},
+                "options": {
+                    "adjustForTimeDifference": True,
+                    "defaultType": market_type,
+                },
             }
         )
-        self.client.load_markets()
-        self.order_info: MarketOrder = None
+        self.account = AccountState(self.client)
+        self.prices = PriceService(self.client)
         self.position_mode = "one-way"
 
-    def load_time_difference(self):
-        self.client.load_time_difference()
+    async def load_markets(self):
+        await market_snapshot.hydrate(self.client)
 
-    def init_info(self, order_info: MarketOrder):
-        self.order_info = order_info
+    async def close(self):
+        market_snapshot.stop(self.client)
+        self.account.stop()
+        self.prices.stop()
+        await self.client.close()
+
+    async def load_time_difference(self):
+        await self.client.load_time_difference()
 
+    def init_info(self, order_info: MarketOrder):
         unified_symbol = order_info.unified_symbol
         market = self.client.market(unified_symbol)
 
@@ -35,26 +50,22 @@ class Bybit:
                 )
             )
 
-        if order_info.is_futures:
-            if order_info.is_coinm:
-                self.client.options["defaultType"] = "delivery"
-                is_contract = market.get("contract")
-                if is_contract:
-                    order_info.is_contract = True
-                    order_info.contract_size = market.get("contractSize")
-            else:
-                self.client.options["defaultType"] = "swap"
-        else:
-            self.client.options["defaultType"] = "spot"
+        if order_info.is_futures and order_info.is_coinm:
+            is_contract = market.get("contract")
+            if is_contract:
+                order_info.is_contract = True
+                order_info.contract_size = market.get("contractSize")
 
-    def get_ticker(self, symbol: str):
-        return self.client.fetch_ticker(symbol)
+        return order_info
 
-    def get_price(self, symbol: str):
-        return self.get_ticker(symbol)["last"]
+    async def get_ticker(self, symbol: str):
+        return await self.prices.get_ticker(symbol)
 
-    def get_futures_position(self, symbol):
-        positions = self.client.fetch_positions(symbols=[symbol])
+    async def get_price(self, symbol: str):
+        return await self.prices.get_price(symbol)
+
+    async def get_futures_position(self, symbol, order_info: MarketOrder):
+        positions = await self.account.fetch_positions(symbol)
         long_contracts = None
         short_contracts = None
         if positions:
@@ -64,12 +75,12 @@ class Bybit:
                 elif position["side"] == "short":
                     short_contracts = position["contracts"]
 
-            if self.order_info.is_close and self.order_info.is_buy:
+            if order_info.is_close and order_info.is_buy:
                 if not short_contracts:
                     raise error.ShortPositionNoneError()
                 else:
                     return short_contracts
-            elif self.order_info.is_close and self.order_info.is_sell:
+            elif order_info.is_close and order_info.is_sell:
                 if not long_contracts:
                     raise error.LongPositionNoneError()
                 else:
@@ -77,43 +88,48 @@ class Bybit:
         else:
             raise error.PositionNoneError()
 
-    def get_balance(self, base: str):
+    async def get_balance(self, base: str, order_info: MarketOrder):
         free_balance_by_base = None
-        if self.order_info.is_entry or (
-            self.order_info.is_spot
-            and (self.order_info.is_buy or self.order_info.is_sell)
+        if order_info.is_entry or (
+            order_info.is_spot
+            and (order_info.is_buy or order_info.is_sell)
         ):
-            balance_by_base = self.client.fetch_balance().get(base)
-            free_balance_by_base = balance_by_base.get("free") or balance_by_base.get("total") if not self.order_info.is_total else balance_by_base.get("total")
+            balance_by_base = (await self.account.fetch_balance(base)).get(base)
+            free_balance_by_base = balance_by_base.get("free") or balance_by_base.get("total") if not order_info.is_total else balance_by_base.get("total")
 
         if free_balance_by_base is None or free_balance_by_base == 0:
             raise error.FreeAmountNoneError()
         return free_balance_by_base
 
-    def get_amount(self, order_info: MarketOrder) -> float:
+    @traced("get_amount")
+    async def get_amount(self, order_info: MarketOrder) -> float:
         if order_info.amount is not None and order_info.percent is not None:
             raise error.AmountPercentBothError()
         elif order_info.amount is not None:
             if order_info.is_contract:
-                current_price = self.get_price(order_info.unified_symbol)
+                current_price = await self.get_price(order_info.unified_symbol)
                 result = (order_info.amount * current_price) // order_info.contract_size
             else:
                 result = order_info.amount
         elif order_info.percent is not None:
             if order_info.is_entry or (order_info.is_spot and order_info.is_buy):
-                free_quote = self.get_balance(order_info.quote)
+                free_quote = await self.get_balance(order_info.quote, order_info)
                 cash = free_quote * (order_info.percent - 0.5) / 100
-                current_price = self.get_price(order_info.unified_symbol)
+                current_price = await self.get_price(order_info.unified_symbol)
                 result = cash / current_price
-            elif self.order_info.is_close:
+            elif order_info.is_close:
                 if order_info.is_contract:
-                    free_amount = self.get_futures_position(order_info.unified_symbol)
+                    free_amount = await self.get_futures_position(
+                        order_info.unified_symbol, order_info
+                    )
                     result = free_amount * order_info.percent / 100
                 else:
-                    free_amount = self.get_futures_position(order_info.unified_symbol)
+                    free_amount = await self.get_futures_position(
+                        order_info.unified_symbol, order_info
+                    )
                     result = free_amount * order_info.percent / 100
             elif order_info.is_spot and order_info.is_sell:
-                free_amount = self.get_balance(order_info.base)
+                free_amount = await self.get_balance(order_info.base, order_info)
                 result = free_amount * order_info.percent / 100
             result = float(
                 self.client.amount_to_precision(order_info.unified_symbol, result)
@@ -123,9 +139,10 @@ class Bybit:
             raise error.AmountPercentNoneError()
         return result
 
-    def set_leverage(self, leverage: float, symbol: str):
+    @traced("set_leverage")
+    async def set_leverage(self, leverage: float, symbol: str):
         try:
-            self.client.set_leverage(leverage, symbol)
+            await self.client.set_leverage(leverage, symbol)
         except Exception as e:
             error = str(e)
             if "leverage not modified" in error:
@@ -133,30 +150,30 @@ class Bybit:
             else:
                 raise Exception(e)
 
-    def get_order_amount(self, order_id: str, order_info: MarketOrder):
+    async def get_order_amount(self, order_id: str, order_info: MarketOrder):
         order_amount = None
         for i in range(8):
             try:
                 if order_info.is_futures:
-                    order_result = self.client.fetch_order(
+                    order_result = await self.client.fetch_order(
                         order_id, order_info.unified_symbol
                     )
                 else:
-                    order_result = self.client.fetch_order(order_id)
+                    order_result = await self.client.fetch_order(order_id)
                 order_amount = order_result["amount"]
                 break
             except Exception as e:
                 print("...", e)
-                time.sleep(0.5)
+                await asyncio.sleep(0.5)
         return order_amount
 
-    def market_order(self, order_info: MarketOrder):
+    async def market_order(self, order_info: MarketOrder):
         from exchange.pexchange import retry
 
         symbol = order_info.unified_symbol
         params = {}
         try:
-            return retry(
+            return await retry(
                 self.client.create_order,
                 symbol,
                 order_info.type.lower(),
@@ -172,35 +189,36 @@ class Bybit:
         except Exception as e:
             raise error.OrderError(e, order_info)
 
-    def market_buy(
+    async def market_buy(
         self,
         order_info: MarketOrder,
     ):
         # 비용주문
-        buy_amount = self.get_amount(order_info)
+        buy_amount = await self.get_amount(order_info)
         order_info.amount = buy_amount
-        order_info.price = self.get_price(order_info.unified_symbol)
+        order_info.price = await self.get_price(order_info.unified_symbol)
 
-        return self.market_order(order_info)
+        return await self.market_order(order_info)
 
-    def market_sell(self, order_info: MarketOrder):
-        sell_amount = self.get_amount(order_info)
+    async def market_sell(self, order_info: MarketOrder):
+        sell_amount = await self.get_amount(order_info)
         order_info.amount = sell_amount
         order_info.price = None
-        return self.market_order(order_info)
+        return await self.market_order(order_info)
 
-    def market_entry(self, order_info: MarketOrder):
+    async def market_entry(self, order_info: MarketOrder):
         from exchange.pexchange import retry
 
         symbol = order_info.unified_symbol
 
-        entry_amount = self.get_amount(order_info)
+        entry_amount = await self.get_amount(order_info)
         if entry_amount == 0:
             raise error.MinAmountError()
 
-        if self.position_mode == "one-way":
+        position_mode = self.position_mode
+        if position_mode == "one-way":
             params = {"position_idx": 0}
-        elif self.position_mode == "hedge":
+        elif position_mode == "hedge":
             if order_info.side == "buy":
                 if order_info.is_entry:
                     position_idx = 1
@@ -217,9 +235,9 @@ class Bybit:
                     params = {"reduceOnly": True, "position_idx": position_idx, "hedged": True}
 
         if order_info.leverage is not None:
-            self.set_leverage(order_info.leverage, symbol)
+            await self.set_leverage(order_info.leverage, symbol)
         try:
-            result = retry(
+            result = await retry(
                 self.client.create_order,
                 symbol,
                 order_info.type.lower(),
@@ -231,6 +249,7 @@ class Bybit:
                 max_attempts=5,
                 delay=0.1,
                 instance=self,
+                position_mode=position_mode,
             )
             # order_amount = self.get_order_amount(result["id"], order_info)
             # result["amount"] = order_amount
@@ -238,15 +257,16 @@ class Bybit:
         except Exception as e:
             raise error.OrderError(e, order_info)
 
-    def market_close(self, order_info: MarketOrder):
+    async def market_close(self, order_info: MarketOrder):
         from exchange.pexchange import retry
 
-        symbol = self.order_info.unified_symbol
-        close_amount = self.get_amount(order_info)
+        symbol = order_info.unified_symbol
+        close_amount = await self.get_amount(order_info)
 
-        if self.position_mode == "one-way":
+        position_mode = self.position_mode
+        if position_mode == "one-way":
             params = {"reduceOnly": True, "position_idx": 0}
-        elif self.position_mode == "hedge":
+        elif position_mode == "hedge":
             if order_info.side == "buy":
                 if order_info.is_entry:
                     position_idx = 1
@@ -263,7 +283,7 @@ class Bybit:
                     params = {"reduceOnly": True, "position_idx": position_idx}
 
         try:
-            result = retry(
+            result = await retry(
                 self.client.create_order,
                 symbol,
                 order_info.type.lower(),
@@ -275,9 +295,10 @@ class Bybit:
                 max_attempts=5,
                 delay=0.1,
                 instance=self,
+                position_mode=position_mode,
             )
             # order_amount = self.get_order_amount(result["id"], order_info)
             # result["amount"] = order_amount
             return result
         except Exception as e:
-            raise error.OrderError(e, self.order_info)
+            raise error.OrderError(e, order_info)
@@ -1,12 +1,55 @@
+import asyncio
+import queue
 import sqlite3
+import threading
 import traceback
 import os
 from pathlib import Path
+from loguru import logger
 
 current_file_direcotry = os.path.dirname(os.path.realpath(__file__))
 parent_directory = Path(current_file_direcotry).parent
 
+# 한 번에 묶어서 커밋할 최대 쓰기 수
+GROUP_COMMIT_SIZE = 64
+# 쓰기 하나가 끝나길 기다리는 최대 시간(초)
+WRITE_TIMEOUT = 30.0
+
+
+class WriteRequest:
+    def __init__(self, query: str, values, many: bool = False):
+        self.query = query
+        self.values = values
+        self.many = many
+        self.done = threading.Event()
+        self.error: Exception | None = None
+        self._lock = threading.Lock()
+        self.started = False
+        self.abandoned = False
+
+    def start(self) -> bool:
+        """쓰기 스레드가 실행을 시작, 기다리던 쪽이 이미 포기했으면 False"""
+        with self._lock:
+            if not self.abandoned:
+                self.started = True
+            return self.started
+
+    def abandon(self) -> bool:
+        """기다리던 쪽이 포기, 쓰기 스레드가 이미 실행을 시작했으면 False"""
+        with self._lock:
+            if not self.started:
+                self.abandoned = True
+            return self.abandoned
+
+
 class Database:
+    """
+    store.db 접근 계층
+    읽기는 스레드마다 따로 연결(WAL)을 쓰고, 쓰기는 전용 스레드 하나가
+    대기 중인 쓰기를 한 트랜잭션으로 묶어 커밋합니다 (그룹 커밋).
+    *_async 메서드는 이벤트 루프를 막지 않도록 스레드에서 실행합니다.
+    """
+
     def __new__(cls, *args, **kwargs):
         if not hasattr(cls, "_instance"):
             cls._instance = super().__new__(cls)
@@ -15,29 +58,173 @@ class Database:
     def __init__(self, database_url: str = f"{parent_directory}/store.db"):
         cls = type(self)
         if not hasattr(cls, "_init"):
-            self.database_url = database_url
-            self.con = sqlite3.connect(self.database_url)
-            self.cursor = self.con.cursor()
+            self._setup(database_url)
             cls._init = True
 
+    def _setup(self, database_url: str):
+        self.database_url = database_url
+        self._local = threading.local()
+        self._connections: list[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._writes: queue.Queue[WriteRequest | None] = queue.Queue()
+        self._writer: threading.Thread | None = None
+        self._writer_lock = threading.Lock()
+        self._closed = False
+        self._start_writer()
+
+    def _start_writer(self):
+        with self._writer_lock:
+            if self._writer is not None and self._writer.is_alive():
+                return
+            if self._writer is not None:
+                logger.error("DB 쓰기 스레드가 종료되어 다시 시작합니다")
+            self._writer = threading.Thread(
+                target=self._write_forever, name="db-writer", daemon=True
+            )
+            self._writer.start()
+
+    def connect(self) -> sqlite3.Connection:
+        con = getattr(self._local, "con", None)
+        if con is None:
+            con = sqlite3.connect(
+                self.database_url,
+                isolation_level=None,
+                check_same_thread=False,
+                cached_statements=256,
+                timeout=10,
+            )
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=NORMAL")
+            self._local.con = con
+            with self._connections_lock:
+                self._connections.append(con)
+        return con
+
+    def _write_forever(self):
+        try:
+            con = self.connect()
+        except Exception as e:
+            logger.error(f"DB 연결 실패: {str(e)}")
+            self._fail_pending(e)
+            return
+        while True:
+            request = self._writes.get()
+            if request is None:
+                return
+            batch = [request]
+            while len(batch) < GROUP_COMMIT_SIZE:
+                try:
+                    request = self._writes.get_nowait()
+                except queue.Empty:
+                    break
+                if request is None:
+                    self._writes.put(None)
+                    break
+                batch.append(request)
+            # 기다리다 포기한 쓰기는 실행하지 않음 (호출한 쪽은 실패로 알고 있음)
+            batch = [request for request in batch if request.start()]
+            if not batch:
+                continue
+            try:
+                self._commit(con, batch)
+            except Exception as e:
+                # 롤백 실패 등 예상하지 못한 에러도 기다리는 쪽에 전달하고 스레드는 계속 동작
+                logger.error(f"DB 쓰기 스레드 에러: {str(e)}")
+                for request in batch:
+                    if not request.done.is_set():
+                        request.error = e
+                        request.done.set()
+
+    def _fail_pending(self, error: Exception):
+        while True:
+            try:
+                request = self._writes.get_nowait()
+            except queue.Empty:
+                return
+            if request is not None:
+                request.error = error
+                request.done.set()
+
+    def _commit(self, con: sqlite3.Connection, batch: list[WriteRequest]):
+        try:
+            con.execute("BEGIN")
+            for request in batch:
+                self._apply(con, request)
+            con.execute("COMMIT")
+        except Exception as e:
+            if con.in_transaction:
+                con.execute("ROLLBACK")
+            if len(batch) == 1:
+                batch[0].error = e
+            else:
+                # 실패한 쓰기만 골라내도록 하나씩 다시 실행
+                for request in batch:
+                    self._commit(con, [request])
+                return
+            logger.error(f"DB 쓰기 실패: {str(e)}")
+        for request in batch:
+            request.done.set()
+
+    def _apply(self, con: sqlite3.Connection, request: WriteRequest):
+        if request.many:
+            con.executemany(request.query, request.values)
+        else:
+            con.execute(request.query, request.values)
+
+    def _write(self, query: str, values, many: bool = False):
+        if self._closed:
+            raise sqlite3.ProgrammingError("데이터베이스가 닫혔습니다")
+        if not self._writer.is_alive():
+            self._start_writer()
+        request = WriteRequest(query, values, many)
+        self._writes.put(request)
+        if not request.done.wait(WRITE_TIMEOUT):
+            if request.abandon():
+                raise sqlite3.OperationalError(
+                    f"DB 쓰기가 {WRITE_TIMEOUT}초 안에 시작되지 않아 취소했습니다"
+                )
+            # 이미 커밋 중인 쓰기는 취소할 수 없으므로 결과를 한 번 더 기다림
+            if not request.done.wait(WRITE_TIMEOUT):
+                raise sqlite3.OperationalError(
+                    f"DB 쓰기가 {WRITE_TIMEOUT * 2}초 안에 끝나지 않았습니다 (반영 여부를 알 수 없음)"
+                )
+        if request.error is not None:
+            raise request.error
+
     def close(self):
-        self.con.close()
+        self._closed = True
+        if self._writer.is_alive():
+            self._writes.put(None)
+            self._writer.join(timeout=5)
+        with self._connections_lock:
+            for con in self._connections:
+                con.close()
+            self._connections.clear()
+        self._local = threading.local()
 
     def excute(self, query: str, value: dict | tuple):
-        self.cursor.execute(query, value)
-        self.con.commit()
+        self._write(query, value)
 
     def excute_many(self, query: str, values: list[dict | tuple]):
-        self.cursor.executemany(query, values)
-        self.con.commit()
+        self._write(query, values, many=True)
 
     def fetch_one(self, query: str, value: dict | tuple):
-        self.cursor.execute(query, value)
-        return self.cursor.fetchone()
+        return self.connect().execute(query, value).fetchone()
 
     def fetch_all(self, query: str, value: dict | tuple):
-        self.cursor.execute(query, value)
-        return self.cursor.fetchall()
+        return self.connect().execute(query, value).fetchall()
+
+    async def excute_async(self, query: str, value: dict | tuple):
+        await asyncio.to_thread(self.excute, query, value)
+
+    async def excute_many_async(self, query: str, values: list[dict | tuple]):
+        await asyncio.to_thread(self.excute_many, query, values)
+
+    async def fetch_one_async(self, query: str, value: dict | tuple):
+        return await asyncio.to_thread(self.fetch_one, query, value)
+
+    async def fetch_all_async(self, query: str, value: dict | tuple):
+        return await asyncio.to_thread(self.fetch_all, query, value)
 
     def set_auth(self, exchange, access_token, access_token_token_expired):
         query = """
@@ -0,0 +1,161 @@
+import asyncio
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+import orjson
+from exchange.model import MarketOrder
+from exchange.order_queue import get_queue_database_url
+from exchange.utility import settings
+
+# 중복 판단에 쓰는 주문 필드 (접수 시각, 비밀번호, 계산된 필드 제외)
+ORDER_KEY_FIELDS = (
+    "exchange",
+    "base",
+    "quote",
+    "type",
+    "side",
+    "amount",
+    "price",
+    "cost",
+    "percent",
+    "leverage",
+    "stop_price",
+    "profit_price",
+    "kis_number",
+    "account",
+    "amounts",
+    "is_futures",
+)
+
+
+class AlertDedup:
+    """
+    같은 알림이 여러 번 들어와도 한 번만 실행되도록 걸러냅니다.
+    alert_id 가 있으면 그 값으로, 없으면 주문 내용 해시 + 시간 구간으로 판단합니다.
+    메모리 TTL 캐시에서 먼저 확인하고, 재시작/다른 프로세스를 위해 SQLite 에도 기록합니다.
+    """
+
+    def __init__(self, database_url: str | None = None, max_size: int = 10000):
+        """database_url: 생략하면 주문 큐와 같은 DB (start/첫 사용 때 연결)"""
+        self.database_url = database_url
+        self.max_size = max_size
+        self._seen: OrderedDict[str, float] = OrderedDict()
+        self._lock = threading.Lock()
+        self.con: sqlite3.Connection | None = None
+
+    def connect(self) -> sqlite3.Connection:
+        with self._lock:
+            if self.con is not None:
+                return self.con
+            self.database_url = self.database_url or get_queue_database_url()
+            con = sqlite3.connect(self.database_url, check_same_thread=False, timeout=5)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute(
+                """
+                CREATE TABLE IF NOT EXISTS seen_alerts (
+                    key TEXT PRIMARY KEY,
+                    expires_at REAL NOT NULL
+                );
+                """
+            )
+            con.commit()
+            self.con = con
+            return con
+
+    async def start(self):
+        """DB 에 연결하고 재시작 전에 본 알림을 메모리로 불러옵니다"""
+        await asyncio.to_thread(self.load)
+
+    def load(self):
+        con = self.connect()
+        now = time.time()
+        with self._lock:
+            con.execute("DELETE FROM seen_alerts WHERE expires_at < ?", (now,))
+            con.commit()
+            rows = con.execute(
+                "SELECT key, expires_at FROM seen_alerts ORDER BY expires_at DESC LIMIT ?",
+                (self.max_size,),
+            ).fetchall()
+        for key, expires_at in reversed(rows):
+            self._seen[key] = expires_at
+
+    def get_keys(self, order_info: MarketOrder, now: float) -> tuple[list[str], float]:
+        """(확인할 키 목록, 만료 시각) 첫 번째 키를 기록합니다"""
+        if order_info.alert_id:
+            return [f"id:{order_info.alert_id}"], now + settings.ALERT_ID_TTL
+
+        fields = {field: getattr(order_info, field) for field in ORDER_KEY_FIELDS}
+        digest = hashlib.sha1(
+            orjson.dumps(fields, option=orjson.OPT_SORT_KEYS)
+        ).hexdigest()
+        # 구간 경계에 걸친 중복도 잡도록 직전 구간까지 확인
+        window = settings.ALERT_DEDUP_WINDOW
+        bucket = int(now // window)
+        keys = [f"hash:{digest}:{bucket}", f"hash:{digest}:{bucket - 1}"]
+        return keys, now + window * 2
+
+    def seen(self, key: str, now: float) -> bool:
+        expires_at = self._seen.get(key)
+        if expires_at is None:
+            return False
+        if expires_at < now:
+            del self._seen[key]
+            return False
+        return True
+
+    def remember(self, key: str, expires_at: float):
+        self._seen[key] = expires_at
+        self._seen.move_to_end(key)
+        while len(self._seen) > self.max_size:
+            self._seen.popitem(last=False)
+
+    def claim(self, key: str, expires_at: float, now: float) -> bool:
+        # 만료되지 않은 같은 키가 이미 있으면 rowcount 0
+        con = self.connect()
+        with self._lock:
+            cursor = con.execute(
+                """
+                INSERT INTO seen_alerts (key, expires_at) VALUES (?, ?)
+                ON CONFLICT(key) DO UPDATE SET expires_at = excluded.expires_at
+                WHERE seen_alerts.expires_at < ?
+                """,
+                (key, expires_at, now),
+            )
+            con.commit()
+            return cursor.rowcount > 0
+
+    def unclaim(self, key: str):
+        con = self.connect()
+        with self._lock:
+            con.execute("DELETE FROM seen_alerts WHERE key = ?", (key,))
+            con.commit()
+
+    async def acquire(self, order_info: MarketOrder) -> str | None:
+        """처음 들어온 알림이면 기록한 키, 중복이면 None"""
+        now = time.time()
+        keys, expires_at = self.get_keys(order_info, now)
+        if any(self.seen(key, now) for key in keys):
+            return None
+        # 같은 프로세스 안의 동시 요청은 await 전에 메모리에 기록해서 막습니다
+        self.remember(keys[0], expires_at)
+        claimed = await asyncio.to_thread(self.claim, keys[0], expires_at, now)
+        return keys[0] if claimed else None
+
+    async def release(self, key: str):
+        """접수하지 못한 알림의 기록을 지워서 재전송된 알림이 실행되도록 합니다"""
+        self._seen.pop(key, None)
+        await asyncio.to_thread(self.unclaim, key)
+
+    async def is_duplicate(self, order_info: MarketOrder) -> bool:
+        return await self.acquire(order_info) is None
+
+    def close(self):
+        with self._lock:
+            if self.con is not None:
+                self.con.close()
+                self.con = None
+
+
+alert_dedup = AlertDedup()
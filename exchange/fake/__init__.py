@@ -0,0 +1,2 @@
+from exchange.fake.engine import FakeConfig, FakeServer, InjectedError
+from exchange.fake.app import create_app
@@ -0,0 +1,111 @@
+import asyncio
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from loguru import logger
+from exchange.fake import binance, bitget, bybit, kis, okx, upbit
+from exchange.fake.engine import FakeServer, InjectedError
+from exchange.fake.utils import error_response
+
+# 경로 접두사 -> 거래소 방언 (EXCHANGE_BASE_URLS 에 http://host:port/<접두사> 로 지정)
+DIALECTS = {
+    "binance": binance,
+    "upbit": upbit,
+    "bybit": bybit,
+    "bitget": bitget,
+    "okx": okx,
+    "kis": kis,
+}
+# error_rate 로 무작위 실패시키는 요청 (주문/레버리지 등 상태를 바꾸는 요청)
+FAILING_METHODS = ("POST", "PUT", "DELETE")
+
+
+def get_error(exchange: str, error: dict) -> InjectedError:
+    """{"preset": "position_side"} 또는 {"status": 400, "body": {...}} 형식의 에러 주입 요청"""
+    if "preset" in error:
+        status, body = DIALECTS[exchange].ERRORS[error["preset"]]
+    else:
+        status, body = error["status"], error["body"]
+    return InjectedError(
+        exchange=exchange,
+        status=status,
+        body=body,
+        path=error.get("path", ""),
+        count=error.get("count", 1),
+    )
+
+
+def create_app(server: FakeServer | None = None) -> FastAPI:
+    server = server or FakeServer()
+    app = FastAPI(title="POA fake exchange")
+    app.state.server = server
+
+    @app.middleware("http")
+    async def simulate(request: Request, call_next):
+        path = request.url.path
+        exchange = path.strip("/").split("/", 1)[0]
+        if exchange not in DIALECTS:
+            return await call_next(request)
+
+        latency = server.config.get_latency(exchange)
+        if latency > 0:
+            await asyncio.sleep(latency)
+        error = server.take_error(exchange, path)
+        if error is not None:
+            return error_response(error.status, error.body)
+        if request.method in FAILING_METHODS and server.should_fail():
+            dialect = DIALECTS[exchange]
+            status, body = dialect.ERRORS[dialect.DEFAULT_ERROR]
+            return error_response(status, body)
+
+        response = await call_next(request)
+        if response.status_code == 404:
+            logger.warning(f"가짜 거래소에 없는 경로: {request.method} {path}")
+        return response
+
+    @app.get("/_fake/state")
+    async def get_state():
+        return {
+            "config": server.config.__dict__,
+            "tokens_issued": server.tokens_issued,
+            "errors": [error.__dict__ for error in server.errors],
+            "accounts": {
+                name: {
+                    "balances": account.balances,
+                    "positions": account.get_positions(),
+                    "leverage": account.leverage,
+                    "hedge_mode": account.hedge_mode,
+                    "orders": len(account.orders),
+                }
+                for name, account in server.accounts.items()
+            },
+        }
+
+    @app.post("/_fake/config")
+    async def set_config(request: Request):
+        data = await request.json()
+        for key, value in data.items():
+            if not hasattr(server.config, key):
+                return JSONResponse({"detail": f"없는 설정: {key}"}, status_code=400)
+            setattr(server.config, key, value)
+        if "seed" in data:
+            server.random.seed(server.config.seed)
+        return server.config.__dict__
+
+    @app.post("/_fake/errors")
+    async def inject_error(request: Request):
+        data = await request.json()
+        exchange = data.get("exchange", "").lower()
+        if exchange not in DIALECTS:
+            return JSONResponse({"detail": f"없는 거래소: {exchange}"}, status_code=400)
+        server.inject(get_error(exchange, data))
+        return {"errors": len(server.errors)}
+
+    @app.post("/_fake/reset")
+    async def reset():
+        server.reset()
+        return {"reset": True}
+
+    for prefix, dialect in DIALECTS.items():
+        app.include_router(dialect.create_router(server), prefix=f"/{prefix}")
+
+    return app
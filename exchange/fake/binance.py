@@ -0,0 +1,323 @@
+import time
+from fastapi import APIRouter, Request
+from exchange.fake.engine import FakeServer
+from exchange.fake.utils import error_response, get_params, split_symbol
+
+# retry.ERROR_TABLES 가 찾는 에러 응답 그대로
+ERRORS = {
+    "overloaded": (503, {"code": -1001, "msg": "Internal error; unable to process your request. Please try again."}),
+    "position_side": (400, {"code": -4061, "msg": "Order's position side does not match user's setting."}),
+    "timestamp": (400, {"code": -1021, "msg": "Timestamp for this request is outside of the recvWindow."}),
+    "insufficient": (400, {"code": -2019, "msg": "Margin is insufficient."}),
+}
+DEFAULT_ERROR = "overloaded"
+
+QUOTES = ("USDT", "USDC", "BUSD", "BTC")
+
+
+def spot_symbol(symbol: str, base: str, quote: str) -> dict:
+    return {
+        "symbol": symbol,
+        "status": "TRADING",
+        "baseAsset": base,
+        "baseAssetPrecision": 8,
+        "quoteAsset": quote,
+        "quotePrecision": 8,
+        "quoteAssetPrecision": 8,
+        "orderTypes": ["LIMIT", "MARKET"],
+        "isSpotTradingAllowed": True,
+        "isMarginTradingAllowed": False,
+        "permissions": ["SPOT"],
+        "filters": [
+            {"filterType": "PRICE_FILTER", "minPrice": "0.00001", "maxPrice": "1000000", "tickSize": "0.00001"},
+            {"filterType": "LOT_SIZE", "minQty": "0.00001", "maxQty": "9000000", "stepSize": "0.00001"},
+            {"filterType": "NOTIONAL", "minNotional": "5"},
+        ],
+    }
+
+
+def futures_symbol(symbol: str, base: str, quote: str) -> dict:
+    return {
+        "symbol": symbol,
+        "pair": symbol,
+        "contractType": "PERPETUAL",
+        "deliveryDate": 4133404800000,
+        "onboardDate": 1569398400000,
+        "status": "TRADING",
+        "baseAsset": base,
+        "quoteAsset": quote,
+        "marginAsset": quote,
+        "pricePrecision": 2,
+        "quantityPrecision": 3,
+        "baseAssetPrecision": 8,
+        "quotePrecision": 8,
+        "underlyingType": "COIN",
+        "orderTypes": ["LIMIT", "MARKET", "STOP_MARKET", "TAKE_PROFIT_MARKET"],
+        "filters": [
+            {"filterType": "PRICE_FILTER", "minPrice": "0.01", "maxPrice": "1000000", "tickSize": "0.01"},
+            {"filterType": "LOT_SIZE", "minQty": "0.001", "maxQty": "1000", "stepSize": "0.001"},
+            {"filterType": "MARKET_LOT_SIZE", "minQty": "0.001", "maxQty": "1000", "stepSize": "0.001"},
+            {"filterType": "MIN_NOTIONAL", "notional": "5"},
+        ],
+    }
+
+
+def create_router(server: FakeServer) -> APIRouter:
+    router = APIRouter()
+
+    def spot():
+        return server.account("binance")
+
+    def futures():
+        return server.account("binance-futures")
+
+    def ticker(account, symbol: str) -> dict:
+        base, quote = split_symbol(symbol, QUOTES)
+        price = str(account.get_price(base, quote))
+        now = int(time.time() * 1000)
+        return {
+            "symbol": symbol,
+            "lastPrice": price,
+            "bidPrice": price,
+            "askPrice": price,
+            "openPrice": price,
+            "highPrice": price,
+            "lowPrice": price,
+            "volume": "1000",
+            "quoteVolume": "1000000",
+            "openTime": now - 86400000,
+            "closeTime": now,
+        }
+
+    def order_response(order: dict, futures: bool) -> dict:
+        status = "FILLED" if order["status"] == "closed" else "PARTIALLY_FILLED"
+        response = {
+            "symbol": order["symbol"],
+            "orderId": int(order["id"]),
+            "clientOrderId": order["client_order_id"],
+            "price": "0",
+            "origQty": str(order["amount"]),
+            "executedQty": str(order["filled"]),
+            "status": status,
+            "timeInForce": "GTC",
+            "type": "MARKET",
+            "side": order["side"].upper(),
+            "updateTime": order["timestamp"],
+        }
+        if futures:
+            response |= {
+                "avgPrice": str(order["price"]),
+                "cumQuote": str(order["cost"]),
+                "reduceOnly": order["reduce_only"],
+                "positionSide": order["position_side"],
+            }
+        else:
+            response |= {
+                "transactTime": order["timestamp"],
+                "cummulativeQuoteQty": str(order["cost"]),
+                "fills": [
+                    {
+                        "price": str(order["price"]),
+                        "qty": str(order["filled"]),
+                        "commission": "0",
+                        "commissionAsset": order["quote"],
+                    }
+                ],
+            }
+        return response
+
+    def create_order(account, params: dict, futures: bool) -> dict:
+        symbol = params["symbol"]
+        base, quote = split_symbol(symbol, QUOTES)
+        amount = params.get("quantity")
+        cost = params.get("quoteOrderQty")
+        order = account.fill(
+            symbol,
+            base,
+            quote,
+            params["side"].lower(),
+            amount=float(amount) if amount else None,
+            cost=float(cost) if cost else None,
+            futures=futures,
+            reduce_only=str(params.get("reduceOnly", "false")).lower() == "true",
+            position_side=params.get("positionSide", "BOTH"),
+            client_order_id=params.get("newClientOrderId"),
+        )
+        return order_response(order, futures)
+
+    # ---------- 현물 ----------
+    @router.get("/api/v3/time")
+    @router.get("/fapi/v1/time")
+    async def server_time():
+        return {"serverTime": int(time.time() * 1000)}
+
+    @router.get("/api/v3/exchangeInfo")
+    async def spot_exchange_info():
+        symbols = [
+            spot_symbol(f"{base}{quote}", base, quote)
+            for base in spot().prices
+            for quote in ("USDT", "USDC")
+        ]
+        return {"timezone": "UTC", "serverTime": int(time.time() * 1000), "symbols": symbols}
+
+    @router.get("/api/v3/ticker/24hr")
+    async def spot_ticker(request: Request):
+        return ticker(spot(), request.query_params["symbol"])
+
+    @router.get("/api/v3/account")
+    async def spot_account():
+        balances = [
+            {"asset": asset, "free": str(amount), "locked": "0"}
+            for asset, amount in spot().balances.items()
+        ]
+        return {"accountType": "SPOT", "canTrade": True, "balances": balances}
+
+    @router.post("/api/v3/order")
+    async def spot_order(request: Request):
+        return create_order(spot(), await get_params(request), futures=False)
+
+    @router.get("/api/v3/order")
+    async def spot_fetch_order(request: Request):
+        order = spot().orders[request.query_params["orderId"]]
+        return order_response(order, futures=False)
+
+    @router.post("/api/v3/userDataStream")
+    async def spot_listen_key():
+        return {"listenKey": "fake-spot-listen-key"}
+
+    @router.get("/sapi/v1/capital/config/getall")
+    @router.get("/sapi/v1/margin/allPairs")
+    @router.get("/sapi/v1/margin/isolated/allPairs")
+    async def currencies():
+        return []
+
+    # ---------- USDⓈ-M 선물 ----------
+    @router.get("/fapi/v1/exchangeInfo")
+    async def futures_exchange_info():
+        symbols = [
+            futures_symbol(f"{base}USDT", base, "USDT") for base in futures().prices
+        ]
+        return {"timezone": "UTC", "serverTime": int(time.time() * 1000), "assets": [], "symbols": symbols}
+
+    @router.get("/dapi/v1/exchangeInfo")
+    async def delivery_exchange_info():
+        return {"timezone": "UTC", "serverTime": int(time.time() * 1000), "symbols": []}
+
+    @router.get("/fapi/v1/ticker/24hr")
+    async def futures_ticker(request: Request):
+        return ticker(futures(), request.query_params["symbol"])
+
+    def position_risk(position: dict) -> dict:
+        account = futures()
+        base, quote = split_symbol(position["symbol"], QUOTES)
+        mark = account.get_price(base, quote)
+        amount = position["signed"] if position["position_side"] == "BOTH" else (
+            position["contracts"] if position["side"] == "long" else -position["contracts"]
+        )
+        return {
+            "symbol": position["symbol"],
+            "positionAmt": str(amount),
+            "entryPrice": str(position["entry_price"]),
+            "markPrice": str(mark),
+            "unRealizedProfit": str((mark - position["entry_price"]) * amount),
+            "liquidationPrice": "0",
+            "leverage": str(position["leverage"]),
+            "marginType": "cross",
+            "isolatedMargin": "0",
+            "isAutoAddMargin": "false",
+            "positionSide": position["position_side"],
+            "notional": str(mark * amount),
+            "isolatedWallet": "0",
+            "updateTime": int(time.time() * 1000),
+        }
+
+    @router.get("/fapi/v2/positionRisk")
+    @router.get("/fapi/v3/positionRisk")
+    async def futures_position_risk(request: Request):
+        symbol = request.query_params.get("symbol")
+        return [position_risk(position) for position in futures().get_positions(symbol)]
+
+    @router.get("/fapi/v2/account")
+    @router.get("/fapi/v3/account")
+    async def futures_account():
+        account = futures()
+        assets = [
+            {
+                "asset": asset,
+                "walletBalance": str(amount),
+                "unrealizedProfit": "0",
+                "marginBalance": str(amount),
+                "maintMargin": "0",
+                "initialMargin": "0",
+                "positionInitialMargin": "0",
+                "openOrderInitialMargin": "0",
+                "crossWalletBalance": str(amount),
+                "crossUnPnl": "0",
+                "availableBalance": str(amount),
+                "maxWithdrawAmount": str(amount),
+                "marginAvailable": True,
+                "updateTime": int(time.time() * 1000),
+            }
+            for asset, amount in account.balances.items()
+            if asset in ("USDT", "USDC", "BUSD")
+        ]
+        positions = [position_risk(position) for position in account.get_positions()]
+        return {
+            "canTrade": True,
+            "totalWalletBalance": str(account.balances.get("USDT", 0)),
+            "availableBalance": str(account.balances.get("USDT", 0)),
+            "assets": assets,
+            "positions": positions,
+        }
+
+    @router.get("/fapi/v1/leverageBracket")
+    async def futures_leverage_bracket():
+        bracket = {
+            "bracket": 1,
+            "initialLeverage": 125,
+            "notionalCap": 1000000000,
+            "notionalFloor": 0,
+            "maintMarginRatio": 0.004,
+            "cum": 0,
+        }
+        return [
+            {"symbol": f"{base}USDT", "brackets": [bracket]} for base in futures().prices
+        ]
+
+    @router.post("/fapi/v1/leverage")
+    async def futures_leverage(request: Request):
+        params = await get_params(request)
+        futures().leverage[params["symbol"]] = int(params["leverage"])
+        return {"symbol": params["symbol"], "leverage": int(params["leverage"]), "maxNotionalValue": "1000000"}
+
+    @router.get("/fapi/v1/positionSide/dual")
+    async def futures_position_mode():
+        return {"dualSidePosition": futures().hedge_mode}
+
+    @router.post("/fapi/v1/positionSide/dual")
+    async def futures_set_position_mode(request: Request):
+        params = await get_params(request)
+        futures().hedge_mode = str(params.get("dualSidePosition")).lower() == "true"
+        return {"code": 200, "msg": "success"}
+
+    @router.post("/fapi/v1/order")
+    async def futures_order(request: Request):
+        params = await get_params(request)
+        account = futures()
+        position_side = params.get("positionSide", "BOTH")
+        if (position_side == "BOTH") == account.hedge_mode:
+            status, body = ERRORS["position_side"]
+            return error_response(status, body)
+        return create_order(account, params, futures=True)
+
+    @router.get("/fapi/v1/order")
+    async def futures_fetch_order(request: Request):
+        order = futures().orders[request.query_params["orderId"]]
+        return order_response(order, futures=True)
+
+    @router.post("/fapi/v1/listenKey")
+    @router.put("/fapi/v1/listenKey")
+    async def futures_listen_key():
+        return {"listenKey": "fake-futures-listen-key"}
+
+    return router
@@ -0,0 +1,305 @@
+import time
+from fastapi import APIRouter, Request
+from exchange.fake.engine import FakeServer
+from exchange.fake.utils import error_response, get_params, split_symbol
+
+# retry.ERROR_TABLES 가 찾는 에러 응답 그대로
+ERRORS = {
+    "overloaded": (429, {"code": "429", "msg": "Too Many Requests", "requestTime": 0, "data": None}),
+    "unilateral_position": (400, {"code": "40774", "msg": "The order type for unilateral position must also be the unilateral position type.", "requestTime": 0, "data": None}),
+    "two_way_positions": (400, {"code": "40775", "msg": "The order type for two-way positions must also be the two-way positions type.", "requestTime": 0, "data": None}),
+    "insufficient": (400, {"code": "43012", "msg": "Insufficient balance", "requestTime": 0, "data": None}),
+}
+DEFAULT_ERROR = "overloaded"
+
+QUOTES = ("USDT", "USDC")
+
+
+def ok(data) -> dict:
+    return {"code": "00000", "msg": "success", "requestTime": int(time.time() * 1000), "data": data}
+
+
+def spot_symbol(base: str, quote: str) -> dict:
+    return {
+        "symbol": f"{base}{quote}",
+        "baseCoin": base,
+        "quoteCoin": quote,
+        "minTradeAmount": "0",
+        "maxTradeAmount": "10000000000",
+        "takerFeeRate": "0.001",
+        "makerFeeRate": "0.001",
+        "pricePrecision": "4",
+        "quantityPrecision": "6",
+        "quotePrecision": "8",
+        "status": "online",
+        "minTradeUSDT": "1",
+    }
+
+
+def contract(base: str, quote: str) -> dict:
+    return {
+        "symbol": f"{base}{quote}",
+        "baseCoin": base,
+        "quoteCoin": quote,
+        "makerFeeRate": "0.0002",
+        "takerFeeRate": "0.0006",
+        "supportMarginCoins": [quote],
+        "minTradeNum": "0.001",
+        "priceEndStep": "1",
+        "volumePlace": "3",
+        "pricePlace": "4",
+        "sizeMultiplier": "0.001",
+        "symbolType": "perpetual",
+        "minTradeUSDT": "5",
+        "symbolStatus": "normal",
+        "offTime": "-1",
+        "limitOpenTime": "-1",
+        "deliveryTime": "",
+        "launchTime": "",
+        "fundInterval": "8",
+        "minLever": "1",
+        "maxLever": "125",
+    }
+
+
+def create_router(server: FakeServer) -> APIRouter:
+    router = APIRouter()
+
+    def spot():
+        return server.account("bitget")
+
+    def futures():
+        return server.account("bitget-futures")
+
+    def ticker(account, symbol: str) -> dict:
+        base, quote = split_symbol(symbol, QUOTES)
+        price = str(account.get_price(base, quote))
+        return {
+            "symbol": symbol,
+            "lastPr": price,
+            "bidPr": price,
+            "askPr": price,
+            "bidSz": "1",
+            "askSz": "1",
+            "open": price,
+            "open24h": price,
+            "high24h": price,
+            "low24h": price,
+            "baseVolume": "1000",
+            "quoteVolume": "1000000",
+            "usdtVolume": "1000000",
+            "markPrice": price,
+            "indexPrice": price,
+            "change24h": "0",
+            "ts": str(int(time.time() * 1000)),
+        }
+
+    def order_response(order: dict, futures: bool) -> dict:
+        response = {
+            "symbol": order["symbol"],
+            "orderId": order["id"],
+            "clientOid": order["client_order_id"],
+            "price": "0",
+            "size": str(order["amount"]),
+            "orderType": "market",
+            "side": order["side"],
+            "priceAvg": str(order["price"]),
+            "baseVolume": str(order["filled"]),
+            "quoteVolume": str(order["cost"]),
+            "cTime": str(order["timestamp"]),
+            "uTime": str(order["timestamp"]),
+        }
+        status = "filled" if order["status"] == "closed" else "partially_filled"
+        if futures:
+            response |= {
+                "state": status,
+                "fee": "0",
+                "marginCoin": order["quote"],
+                "reduceOnly": "YES" if order["reduce_only"] else "NO",
+                "tradeSide": order["trade_side"],
+                "posMode": "hedge_mode" if order["position_side"] != "BOTH" else "one_way_mode",
+            }
+        else:
+            response["status"] = status
+        return response
+
+    @router.get("/api/v2/public/time")
+    async def server_time():
+        return ok({"serverTime": str(int(time.time() * 1000))})
+
+    @router.get("/api/v2/spot/public/coins")
+    @router.get("/api/v2/margin/currencies")
+    async def currencies():
+        return ok([])
+
+    @router.get("/api/v2/spot/public/symbols")
+    async def spot_symbols():
+        return ok([spot_symbol(base, "USDT") for base in spot().prices])
+
+    @router.get("/api/v2/mix/market/contracts")
+    async def contracts(request: Request):
+        if request.query_params.get("productType", "").upper() != "USDT-FUTURES":
+            return ok([])
+        return ok([contract(base, "USDT") for base in futures().prices])
+
+    @router.get("/api/v2/spot/market/tickers")
+    async def spot_ticker(request: Request):
+        return ok([ticker(spot(), request.query_params["symbol"])])
+
+    @router.get("/api/v2/mix/market/ticker")
+    async def futures_ticker(request: Request):
+        return ok([ticker(futures(), request.query_params["symbol"])])
+
+    @router.get("/api/v2/spot/account/assets")
+    async def spot_assets():
+        return ok(
+            [
+                {
+                    "coin": coin,
+                    "available": str(amount),
+                    "frozen": "0",
+                    "locked": "0",
+                    "limitAvailable": "0",
+                    "uTime": str(int(time.time() * 1000)),
+                }
+                for coin, amount in spot().balances.items()
+            ]
+        )
+
+    @router.get("/api/v2/mix/account/accounts")
+    async def futures_accounts():
+        return ok(
+            [
+                {
+                    "marginCoin": coin,
+                    "locked": "0",
+                    "available": str(amount),
+                    "crossedMaxAvailable": str(amount),
+                    "isolatedMaxAvailable": str(amount),
+                    "maxTransferOut": str(amount),
+                    "accountEquity": str(amount),
+                    "usdtEquity": str(amount),
+                    "unrealizedPL": "0",
+                }
+                for coin, amount in futures().balances.items()
+                if coin in QUOTES
+            ]
+        )
+
+    @router.get("/api/v2/mix/position/all-position")
+    @router.get("/api/v2/mix/position/single-position")
+    async def positions(request: Request):
+        account = futures()
+        symbol = request.query_params.get("symbol")
+        items = []
+        for position in account.get_positions(symbol):
+            base, quote = split_symbol(position["symbol"], QUOTES)
+            mark = account.get_price(base, quote)
+            contracts = str(position["contracts"])
+            items.append(
+                {
+                    "marginCoin": quote,
+                    "symbol": position["symbol"],
+                    "holdSide": position["side"],
+                    "openDelegateSize": "0",
+                    "marginSize": str(position["contracts"] * position["entry_price"] / position["leverage"]),
+                    "available": contracts,
+                    "locked": "0",
+                    "total": contracts,
+                    "leverage": str(position["leverage"]),
+                    "achievedProfits": "0",
+                    "openPriceAvg": str(position["entry_price"]),
+                    "marginMode": "isolated",
+                    "posMode": "hedge_mode" if account.hedge_mode else "one_way_mode",
+                    "unrealizedPL": str((mark - position["entry_price"]) * position["signed"]),
+                    "liquidationPrice": "0",
+                    "keepMarginRate": "0.004",
+                    "markPrice": str(mark),
+                    "cTime": str(int(time.time() * 1000)),
+                    "uTime": str(int(time.time() * 1000)),
+                }
+            )
+        return ok(items)
+
+    @router.post("/api/v2/mix/account/set-leverage")
+    async def set_leverage(request: Request):
+        params = await get_params(request)
+        futures().leverage[params["symbol"]] = int(float(params["leverage"]))
+        return ok({"symbol": params["symbol"], "marginCoin": params.get("marginCoin"), "longLeverage": params["leverage"], "shortLeverage": params["leverage"]})
+
+    @router.post("/api/v2/mix/account/set-margin-mode")
+    async def set_margin_mode(request: Request):
+        params = await get_params(request)
+        return ok({"symbol": params["symbol"], "marginMode": params.get("marginMode")})
+
+    @router.post("/api/v2/mix/account/set-position-mode")
+    async def set_position_mode(request: Request):
+        params = await get_params(request)
+        futures().hedge_mode = params.get("posMode") == "hedge_mode"
+        return ok({"posMode": params.get("posMode")})
+
+    @router.post("/api/v2/spot/trade/place-order")
+    async def spot_order(request: Request):
+        params = await get_params(request)
+        symbol = params["symbol"]
+        base, quote = split_symbol(symbol, QUOTES)
+        side = params["side"]
+        size = float(params["size"])
+        # 현물 시장가 매수 size 는 견적 통화 금액
+        order = spot().fill(
+            symbol,
+            base,
+            quote,
+            side,
+            amount=None if side == "buy" else size,
+            cost=size if side == "buy" else None,
+            client_order_id=params.get("clientOid"),
+        )
+        return ok({"orderId": order["id"], "clientOid": order["client_order_id"]})
+
+    @router.post("/api/v2/mix/order/place-order")
+    async def futures_order(request: Request):
+        params = await get_params(request)
+        account = futures()
+        trade_side = params.get("tradeSide")
+        # 포지션 모드와 주문 형식이 다르면 실제 거래소처럼 거절
+        if trade_side and not account.hedge_mode:
+            status, body = ERRORS["unilateral_position"]
+            return error_response(status, body)
+        if not trade_side and account.hedge_mode:
+            status, body = ERRORS["two_way_positions"]
+            return error_response(status, body)
+
+        symbol = params["symbol"]
+        base, quote = split_symbol(symbol, QUOTES)
+        side = params["side"]
+        if trade_side:
+            # 양방향 모드: buy+open 은 롱 진입, buy+close 는 롱 청산
+            position_side = "LONG" if side == "buy" else "SHORT"
+            if trade_side == "close":
+                side = "sell" if side == "buy" else "buy"
+        else:
+            position_side = "BOTH"
+        order = account.fill(
+            symbol,
+            base,
+            quote,
+            side,
+            amount=float(params["size"]),
+            futures=True,
+            reduce_only=params.get("reduceOnly") == "YES",
+            position_side=position_side,
+            client_order_id=params.get("clientOid"),
+        )
+        order["trade_side"] = trade_side or "open"
+        return ok({"orderId": order["id"], "clientOid": order["client_order_id"]})
+
+    @router.get("/api/v2/spot/trade/orderInfo")
+    async def spot_fetch_order(request: Request):
+        return ok([order_response(spot().orders[request.query_params["orderId"]], futures=False)])
+
+    @router.get("/api/v2/mix/order/detail")
+    async def futures_fetch_order(request: Request):
+        return ok(order_response(futures().orders[request.query_params["orderId"]], futures=True))
+
+    return router
@@ -0,0 +1,285 @@
+import time
+from fastapi import APIRouter, Request
+from exchange.fake.engine import FakeServer
+from exchange.fake.utils import get_params, split_symbol
+
+# retry.ERROR_TABLES 가 찾는 에러 응답 그대로 (bybit 는 HTTP 200 에 retCode 로 에러)
+ERRORS = {
+    "overloaded": (200, {"retCode": 10006, "retMsg": "Too many visits!", "result": {}, "retExtInfo": {}}),
+    "position_idx": (200, {"retCode": 10001, "retMsg": "position idx not match position mode", "result": {}, "retExtInfo": {}}),
+    "timestamp": (200, {"retCode": 10002, "retMsg": "invalid request, please check your server timestamp or recv_window param", "result": {}, "retExtInfo": {}}),
+    "insufficient": (200, {"retCode": 110007, "retMsg": "ab not enough for new order", "result": {}, "retExtInfo": {}}),
+}
+DEFAULT_ERROR = "overloaded"
+
+QUOTES = ("USDT", "USDC")
+# positionIdx -> 포지션 방향 (0 은 one-way)
+POSITION_SIDES = {0: "BOTH", 1: "LONG", 2: "SHORT"}
+
+
+def ok(result) -> dict:
+    return {
+        "retCode": 0,
+        "retMsg": "OK",
+        "result": result,
+        "retExtInfo": {},
+        "time": int(time.time() * 1000),
+    }
+
+
+def fail(code: int, message: str) -> dict:
+    return {"retCode": code, "retMsg": message, "result": {}, "retExtInfo": {}}
+
+
+def instrument(category: str, symbol: str, base: str, quote: str) -> dict:
+    if category == "spot":
+        return {
+            "symbol": symbol,
+            "baseCoin": base,
+            "quoteCoin": quote,
+            "innovation": "0",
+            "status": "Trading",
+            "marginTrading": "none",
+            "lotSizeFilter": {
+                "basePrecision": "0.000001",
+                "quotePrecision": "0.00000001",
+                "minOrderQty": "0.000001",
+                "maxOrderQty": "9000000",
+                "minOrderAmt": "1",
+                "maxOrderAmt": "2000000",
+            },
+            "priceFilter": {"tickSize": "0.0001"},
+        }
+    return {
+        "symbol": symbol,
+        "contractType": "LinearPerpetual",
+        "status": "Trading",
+        "baseCoin": base,
+        "quoteCoin": quote,
+        "settleCoin": quote,
+        "launchTime": "1585526400000",
+        "deliveryTime": "0",
+        "deliveryFeeRate": "",
+        "priceScale": "4",
+        "leverageFilter": {"minLeverage": "1", "maxLeverage": "100.00", "leverageStep": "0.01"},
+        "priceFilter": {"minPrice": "0.0001", "maxPrice": "1999999", "tickSize": "0.0001"},
+        "lotSizeFilter": {
+            "maxOrderQty": "100000",
+            "minOrderQty": "0.001",
+            "qtyStep": "0.001",
+            "postOnlyMaxOrderQty": "100000",
+        },
+        "unifiedMarginTrade": True,
+        "fundingInterval": 480,
+    }
+
+
+def create_router(server: FakeServer) -> APIRouter:
+    router = APIRouter()
+
+    def account(category: str):
+        return server.account("bybit" if category == "spot" else "bybit-futures")
+
+    def order_response(order: dict, category: str) -> dict:
+        return {
+            "orderId": order["id"],
+            "orderLinkId": order["client_order_id"],
+            "symbol": order["symbol"],
+            "price": "0",
+            "qty": str(order["amount"]),
+            "side": order["side"].title(),
+            "orderStatus": "Filled" if order["status"] == "closed" else "PartiallyFilled",
+            "avgPrice": str(order["price"]),
+            "cumExecQty": str(order["filled"]),
+            "cumExecValue": str(order["cost"]),
+            "cumExecFee": "0",
+            "leavesQty": str(order["remaining"]),
+            "timeInForce": "IOC",
+            "orderType": "Market",
+            "reduceOnly": order["reduce_only"],
+            "positionIdx": {"BOTH": 0, "LONG": 1, "SHORT": 2}[order["position_side"]],
+            "category": category,
+            "createdTime": str(order["timestamp"]),
+            "updatedTime": str(order["timestamp"]),
+        }
+
+    @router.get("/v5/market/time")
+    async def server_time():
+        now = time.time()
+        return ok({"timeSecond": str(int(now)), "timeNano": str(int(now * 1e9))})
+
+    @router.get("/v5/asset/coin/query-info")
+    async def currencies():
+        return ok({"rows": []})
+
+    @router.get("/v5/user/query-api")
+    async def api_info():
+        return ok({"id": "1", "readOnly": 0, "unified": 1, "uta": 1, "permissions": {}})
+
+    @router.get("/v5/account/info")
+    async def account_info():
+        return ok({"unifiedMarginStatus": 5, "marginMode": "REGULAR_MARGIN", "isMasterTrader": False})
+
+    @router.get("/v5/market/instruments-info")
+    async def instruments(request: Request):
+        category = request.query_params.get("category", "spot")
+        items = []
+        if category in ("spot", "linear"):
+            items = [
+                instrument(category, f"{base}USDT", base, "USDT")
+                for base in account(category).prices
+            ]
+        return ok({"category": category, "list": items, "nextPageCursor": ""})
+
+    @router.get("/v5/market/tickers")
+    async def tickers(request: Request):
+        category = request.query_params.get("category", "spot")
+        symbol = request.query_params["symbol"]
+        base, quote = split_symbol(symbol, QUOTES)
+        price = str(account(category).get_price(base, quote))
+        ticker = {
+            "symbol": symbol,
+            "lastPrice": price,
+            "bid1Price": price,
+            "ask1Price": price,
+            "prevPrice24h": price,
+            "highPrice24h": price,
+            "lowPrice24h": price,
+            "volume24h": "1000",
+            "turnover24h": "1000000",
+            "markPrice": price,
+            "indexPrice": price,
+        }
+        return ok({"category": category, "list": [ticker]})
+
+    @router.get("/v5/account/wallet-balance")
+    async def wallet_balance():
+        # 통합 계정(UNIFIED)은 현물/선물이 같은 잔고를 사용
+        balances = account("spot").balances
+        coins = [
+            {
+                "coin": coin,
+                "walletBalance": str(amount),
+                "equity": str(amount),
+                "locked": "0",
+                "availableToWithdraw": str(amount),
+                "totalPositionIM": "0",
+                "totalOrderIM": "0",
+                "unrealisedPnl": "0",
+                "usdValue": str(amount),
+            }
+            for coin, amount in balances.items()
+        ]
+        usdt = str(balances.get("USDT", 0))
+        return ok(
+            {
+                "list": [
+                    {
+                        "accountType": "UNIFIED",
+                        "totalEquity": usdt,
+                        "totalWalletBalance": usdt,
+                        "totalAvailableBalance": usdt,
+                        "coin": coins,
+                    }
+                ]
+            }
+        )
+
+    @router.get("/v5/position/list")
+    async def positions(request: Request):
+        category = request.query_params.get("category", "linear")
+        fake = account(category)
+        symbol = request.query_params.get("symbol")
+        items = []
+        for position in fake.get_positions(symbol):
+            base, quote = split_symbol(position["symbol"], QUOTES)
+            mark = fake.get_price(base, quote)
+            items.append(
+                {
+                    "positionIdx": {"BOTH": 0, "LONG": 1, "SHORT": 2}[position["position_side"]],
+                    "symbol": position["symbol"],
+                    "side": "Buy" if position["side"] == "long" else "Sell",
+                    "size": str(position["contracts"]),
+                    "avgPrice": str(position["entry_price"]),
+                    "positionValue": str(position["contracts"] * position["entry_price"]),
+                    "leverage": str(position["leverage"]),
+                    "markPrice": str(mark),
+                    "liqPrice": "",
+                    "unrealisedPnl": str((mark - position["entry_price"]) * position["signed"]),
+                    "tradeMode": 0,
+                    "positionStatus": "Normal",
+                    "createdTime": str(int(time.time() * 1000)),
+                    "updatedTime": str(int(time.time() * 1000)),
+                }
+            )
+        return ok({"category": category, "list": items, "nextPageCursor": ""})
+
+    @router.post("/v5/position/set-leverage")
+    async def set_leverage(request: Request):
+        params = await get_params(request)
+        fake = account(params.get("category", "linear"))
+        leverage = int(float(params["buyLeverage"]))
+        if fake.leverage.get(params["symbol"]) == leverage:
+            return fail(110043, "leverage not modified")
+        fake.leverage[params["symbol"]] = leverage
+        return ok({})
+
+    @router.post("/v5/position/switch-mode")
+    async def switch_mode(request: Request):
+        params = await get_params(request)
+        account(params.get("category", "linear")).hedge_mode = int(params.get("mode", 0)) == 3
+        return ok({})
+
+    @router.post("/v5/order/create")
+    async def create_order(request: Request):
+        params = await get_params(request)
+        category = params.get("category", "spot")
+        fake = account(category)
+        symbol = params["symbol"]
+        base, quote = split_symbol(symbol, QUOTES)
+        side = params["side"].lower()
+        qty = float(params["qty"])
+        if category == "spot":
+            # 현물 시장가 매수는 기본이 견적 통화 금액
+            by_cost = side == "buy" and params.get("marketUnit", "quoteCoin") == "quoteCoin"
+            order = fake.fill(
+                symbol,
+                base,
+                quote,
+                side,
+                amount=None if by_cost else qty,
+                cost=qty if by_cost else None,
+                client_order_id=params.get("orderLinkId"),
+            )
+        else:
+            position_idx = int(params.get("positionIdx", params.get("position_idx", 0)))
+            if (position_idx == 0) == fake.hedge_mode:
+                return ERRORS["position_idx"][1]
+            order = fake.fill(
+                symbol,
+                base,
+                quote,
+                side,
+                amount=qty,
+                futures=True,
+                reduce_only=str(params.get("reduceOnly", "false")).lower() == "true",
+                position_side=POSITION_SIDES[position_idx],
+                client_order_id=params.get("orderLinkId"),
+            )
+        order["category"] = category
+        return ok({"orderId": order["id"], "orderLinkId": order["client_order_id"]})
+
+    @router.get("/v5/order/realtime")
+    @router.get("/v5/order/history")
+    async def fetch_orders(request: Request):
+        category = request.query_params.get("category", "spot")
+        order_id = request.query_params.get("orderId")
+        orders = account(category).orders
+        items = [
+            order_response(order, category)
+            for order in orders.values()
+            if order_id is None or order["id"] == order_id
+        ]
+        return ok({"category": category, "list": items, "nextPageCursor": ""})
+
+    return router
@@ -0,0 +1,225 @@
+import itertools
+import random
+import time
+from dataclasses import dataclass, field
+
+# 가짜 시세 (USDT 기준), KRW 마켓은 KRW_RATE 를 곱합니다
+DEFAULT_PRICES = {
+    "BTC": 60000.0,
+    "ETH": 3000.0,
+    "SOL": 150.0,
+    "XRP": 0.5,
+    "DOGE": 0.1,
+}
+KRW_RATE = 1350.0
+# 주식 종목 시세 (KRX 는 원, 미국은 달러)
+DEFAULT_STOCK_PRICES = {
+    "005930": 70000.0,
+    "000660": 180000.0,
+    "AAPL": 190.0,
+    "TSLA": 250.0,
+    "NVDA": 120.0,
+}
+DEFAULT_BALANCES = {
+    "USDT": 100000.0,
+    "USDC": 100000.0,
+    "USD": 100000.0,
+    "KRW": 100000000.0,
+    "BTC": 1.0,
+    "ETH": 10.0,
+    "SOL": 100.0,
+    "XRP": 10000.0,
+    "DOGE": 100000.0,
+}
+
+
+@dataclass
+class FakeConfig:
+    # 모든 요청에 더하는 지연 시간(초), 거래소별로 덮어쓸 수 있음
+    latency: float = 0.0
+    latency_by_exchange: dict[str, float] = field(default_factory=dict)
+    # 주문 요청이 과부하 에러로 실패할 확률 (seed 로 재현 가능)
+    error_rate: float = 0.0
+    seed: int = 0
+    # 시장가 주문이 체결되는 비율
+    fill_ratio: float = 1.0
+
+    def get_latency(self, exchange: str) -> float:
+        return self.latency_by_exchange.get(exchange, self.latency)
+
+
+@dataclass
+class InjectedError:
+    exchange: str
+    status: int
+    body: dict
+    path: str = ""
+    count: int = 1
+
+
+class FakeAccount:
+    """
+    거래소 하나의 가짜 계정 (잔고, 포지션, 주문, 레버리지)
+    시장가 주문은 현재 가짜 시세로 즉시(fill_ratio 만큼) 체결됩니다.
+    """
+
+    def __init__(self, exchange: str, config: FakeConfig):
+        self.exchange = exchange
+        self.config = config
+        self.prices = dict(DEFAULT_PRICES)
+        self.stock_prices = dict(DEFAULT_STOCK_PRICES)
+        self.balances = dict(DEFAULT_BALANCES)
+        # (symbol id, position side) -> 수량, one-way 는 "BOTH" 에 부호 있는 수량
+        self.positions: dict[tuple[str, str], float] = {}
+        self.entry_prices: dict[tuple[str, str], float] = {}
+        self.leverage: dict[str, int] = {}
+        self.orders: dict[str, dict] = {}
+        self.hedge_mode = False
+        self._ids = itertools.count(1)
+
+    def get_price(self, base: str, quote: str = "USDT") -> float:
+        price = self.prices.get(base, 1.0)
+        return price * KRW_RATE if quote == "KRW" else price
+
+    def get_stock_price(self, ticker: str) -> float:
+        return self.stock_prices.get(ticker, 100.0)
+
+    def next_id(self) -> str:
+        return str(next(self._ids))
+
+    def fill(
+        self,
+        symbol: str,
+        base: str,
+        quote: str,
+        side: str,
+        amount: float | None = None,
+        cost: float | None = None,
+        futures: bool = False,
+        reduce_only: bool = False,
+        position_side: str = "BOTH",
+        client_order_id: str | None = None,
+    ) -> dict:
+        """시장가 주문 체결, amount 대신 cost(견적 통화 금액)로 주문할 수 있습니다"""
+        price = self.get_price(base, quote)
+        if amount is None:
+            amount = cost / price
+        filled = amount * self.config.fill_ratio
+        cost = filled * price
+
+        if futures:
+            self.update_position(symbol, side, filled, price, reduce_only, position_side)
+        elif side == "buy":
+            self.balances[quote] = self.balances.get(quote, 0.0) - cost
+            self.balances[base] = self.balances.get(base, 0.0) + filled
+        else:
+            self.balances[base] = self.balances.get(base, 0.0) - filled
+            self.balances[quote] = self.balances.get(quote, 0.0) + cost
+
+        order = {
+            "id": self.next_id(),
+            "client_order_id": client_order_id or f"fake-{int(time.time() * 1000)}",
+            "symbol": symbol,
+            "base": base,
+            "quote": quote,
+            "side": side,
+            "amount": amount,
+            "filled": filled,
+            "remaining": amount - filled,
+            "price": price,
+            "cost": cost,
+            "status": "closed" if filled >= amount else "open",
+            "reduce_only": reduce_only,
+            "position_side": position_side,
+            "timestamp": int(time.time() * 1000),
+        }
+        self.orders[order["id"]] = order
+        return order
+
+    def update_position(
+        self,
+        symbol: str,
+        side: str,
+        amount: float,
+        price: float,
+        reduce_only: bool,
+        position_side: str,
+    ):
+        key = (symbol, position_side)
+        current = self.positions.get(key, 0.0)
+        if position_side == "BOTH":
+            delta = amount if side == "buy" else -amount
+            if reduce_only:
+                # 포지션보다 크게 줄이지 않음
+                delta = max(delta, -current) if current > 0 else min(delta, -current)
+            new = current + delta
+        elif (position_side == "LONG") == (side == "buy"):
+            new = current + amount
+        else:
+            new = max(current - amount, 0.0)
+        if abs(new) > abs(current):
+            self.entry_prices[key] = price
+        if new == 0:
+            self.positions.pop(key, None)
+            self.entry_prices.pop(key, None)
+        else:
+            self.positions[key] = new
+
+    def get_positions(self, symbol: str | None = None) -> list[dict]:
+        """[{symbol, side(long/short), position_side, contracts, entry_price, leverage}]"""
+        positions = []
+        for (position_symbol, position_side), amount in self.positions.items():
+            if symbol is not None and position_symbol != symbol:
+                continue
+            if position_side == "BOTH":
+                side = "long" if amount > 0 else "short"
+            else:
+                side = position_side.lower()
+            positions.append(
+                {
+                    "symbol": position_symbol,
+                    "side": side,
+                    "position_side": position_side,
+                    "contracts": abs(amount),
+                    "signed": amount,
+                    "entry_price": self.entry_prices.get((position_symbol, position_side), 0.0),
+                    "leverage": self.leverage.get(position_symbol, 1),
+                }
+            )
+        return positions
+
+
+class FakeServer:
+    """거래소별 가짜 계정과 지연/에러 주입 설정"""
+
+    def __init__(self, config: FakeConfig | None = None):
+        self.config = config or FakeConfig()
+        self.reset()
+
+    def reset(self):
+        self.accounts: dict[str, FakeAccount] = {}
+        self.errors: list[InjectedError] = []
+        self.random = random.Random(self.config.seed)
+        # KIS 접근 토큰 발급 횟수
+        self.tokens_issued = 0
+
+    def account(self, exchange: str) -> FakeAccount:
+        account = self.accounts.get(exchange)
+        if account is None:
+            account = self.accounts[exchange] = FakeAccount(exchange, self.config)
+        return account
+
+    def inject(self, error: InjectedError):
+        self.errors.append(error)
+
+    def take_error(self, exchange: str, path: str) -> InjectedError | None:
+        for error in self.errors:
+            if error.exchange == exchange and error.path in path:
+                error.count -= 1
+                if error.count <= 0:
+                    self.errors.remove(error)
+                return error
+        return None
+
+    def should_fail(self) -> bool:
+        return self.config.error_rate > 0 and self.random.random() < self.config.error_rate
@@ -0,0 +1,104 @@
+import time
+from datetime import datetime, timedelta
+from fastapi import APIRouter, Request
+from exchange.fake.engine import FakeServer
+from exchange.fake.utils import get_params
+from exchange.stock.schemas import Endpoints, TransactionId
+from exchange.stock.token import TOKEN_TIME_FORMAT
+
+# kis.check_response 가 구분하는 응답 그대로 (토큰 만료는 재발급 후 재시도)
+ERRORS = {
+    "overloaded": (500, {"rt_cd": "1", "msg_cd": "EGW00201", "msg1": "초당 거래건수를 초과하였습니다."}),
+    "token_expired": (500, {"rt_cd": "1", "msg_cd": "EGW00123", "msg1": "기간이 만료된 token 입니다."}),
+    "invalid_token": (500, {"rt_cd": "1", "msg_cd": "EGW00121", "msg1": "유효하지 않은 token 입니다."}),
+}
+DEFAULT_ERROR = "overloaded"
+
+SELL_TR_IDS = (
+    TransactionId.korea_sell.value,
+    TransactionId.korea_paper_sell.value,
+    TransactionId.usa_sell.value,
+    TransactionId.usa_paper_sell.value,
+)
+# 토큰 유효 기간 (실제와 같이 24시간)
+TOKEN_LIFETIME = timedelta(hours=24)
+
+
+def create_router(server: FakeServer) -> APIRouter:
+    router = APIRouter()
+
+    def account():
+        return server.account("kis")
+
+    def ok(output: dict) -> dict:
+        return {"rt_cd": "0", "msg_cd": "APBK0013", "msg1": "주문 전송 완료 되었습니다.", "output": output}
+
+    @router.post("/oauth2/tokenP")
+    async def token():
+        server.tokens_issued += 1
+        expired = datetime.now() + TOKEN_LIFETIME
+        return {
+            "access_token": f"fake-token-{server.tokens_issued}",
+            "token_type": "Bearer",
+            "expires_in": int(TOKEN_LIFETIME.total_seconds()),
+            "access_token_token_expired": expired.strftime(TOKEN_TIME_FORMAT),
+        }
+
+    @router.post("/uapi/hashkey")
+    async def hashkey():
+        return {"HASH": "fake-hash"}
+
+    def order(request: Request, params: dict, ticker: str, currency: str) -> dict:
+        side = "sell" if request.headers.get("tr_id") in SELL_TR_IDS else "buy"
+        fake = account()
+        price = fake.get_stock_price(ticker)
+        amount = int(params["ORD_QTY"])
+        cost = price * amount
+        balance = fake.balances.get(currency, 0.0)
+        fake.balances[currency] = balance - cost if side == "buy" else balance + cost
+        fake.balances[ticker] = fake.balances.get(ticker, 0.0) + (
+            amount if side == "buy" else -amount
+        )
+        order_id = fake.next_id().zfill(10)
+        fake.orders[order_id] = {
+            "id": order_id,
+            "symbol": ticker,
+            "side": side,
+            "amount": amount,
+            "filled": amount,
+            "price": price,
+            "cost": cost,
+            "status": "closed",
+            "timestamp": int(time.time() * 1000),
+        }
+        return ok(
+            {
+                "KRX_FWDG_ORD_ORGNO": "91252",
+                "ODNO": order_id,
+                "ORD_TMD": datetime.now().strftime("%H%M%S"),
+            }
+        )
+
+    @router.post(Endpoints.korea_order.value)
+    async def korea_order(request: Request):
+        params = await get_params(request)
+        return order(request, params, params["PDNO"], "KRW")
+
+    @router.post(Endpoints.usa_order.value)
+    async def usa_order(request: Request):
+        params = await get_params(request)
+        return order(request, params, params["PDNO"], "USD")
+
+    @router.get(Endpoints.korea_ticker.value)
+    async def korea_ticker(request: Request):
+        ticker = request.query_params.get("FID_INPUT_ISCD", "")
+        price = account().get_stock_price(ticker)
+        return {"rt_cd": "0", "msg_cd": "MCA00000", "msg1": "정상처리 되었습니다.", "output": {"stck_prpr": str(int(price))}}
+
+    @router.get(Endpoints.usa_ticker.value)
+    async def usa_ticker(request: Request):
+        ticker = request.query_params.get("SYMB", "")
+        price = account().get_stock_price(ticker)
+        return {"rt_cd": "0", "msg_cd": "MCA00000", "msg1": "정상처리 되었습니다.", "output": {"rsym": f"D{ticker}", "zdiv": "4", "last": f"{price:.4f}"}}
+
+    return router
@@ -0,0 +1,285 @@
+import time
+from fastapi import APIRouter, Request
+from exchange.fake.engine import FakeServer
+from exchange.fake.utils import get_params
+
+# retry.ERROR_TABLES 가 찾는 에러 응답 그대로 (okx 는 HTTP 200 에 data[0].sCode 로 에러)
+ERRORS = {
+    "overloaded": (200, {"code": "50001", "msg": "Service temporarily unavailable, please try again later.", "data": []}),
+    "pos_side": (200, {"code": "1", "msg": "All operations failed", "data": [{"ordId": "", "clOrdId": "", "tag": "", "sCode": "51000", "sMsg": "Parameter posSide error "}]}),
+    "insufficient": (200, {"code": "1", "msg": "All operations failed", "data": [{"ordId": "", "clOrdId": "", "tag": "", "sCode": "51008", "sMsg": "Order failed. Insufficient USDT balance in account."}]}),
+}
+DEFAULT_ERROR = "overloaded"
+
+# 무기한 계약 1개의 기초자산 수량
+CONTRACT_VALUE = 0.01
+
+
+def ok(data) -> dict:
+    return {"code": "0", "msg": "", "data": data}
+
+
+def split_instrument(inst_id: str) -> tuple[str, str]:
+    base, quote = inst_id.split("-")[:2]
+    return base, quote
+
+
+def instrument(inst_type: str, base: str, quote: str) -> dict:
+    inst = {
+        "instType": inst_type,
+        "instId": f"{base}-{quote}",
+        "baseCcy": base,
+        "quoteCcy": quote,
+        "settleCcy": "",
+        "ctVal": "",
+        "ctMult": "",
+        "ctValCcy": "",
+        "ctType": "",
+        "uly": "",
+        "instFamily": "",
+        "lever": "10",
+        "listTime": "1606468572000",
+        "expTime": "",
+        "tickSz": "0.0001",
+        "lotSz": "0.00000001",
+        "minSz": "0.00001",
+        "state": "live",
+    }
+    if inst_type == "SWAP":
+        inst |= {
+            "instId": f"{base}-{quote}-SWAP",
+            "baseCcy": "",
+            "quoteCcy": "",
+            "settleCcy": quote,
+            "ctVal": str(CONTRACT_VALUE),
+            "ctMult": "1",
+            "ctValCcy": base,
+            "ctType": "linear",
+            "uly": f"{base}-{quote}",
+            "instFamily": f"{base}-{quote}",
+            "lever": "100",
+            "lotSz": "1",
+            "minSz": "1",
+        }
+    return inst
+
+
+def create_router(server: FakeServer) -> APIRouter:
+    router = APIRouter()
+
+    def account(inst_id: str = ""):
+        return server.account("okx-futures" if inst_id.endswith("-SWAP") else "okx")
+
+    def order_response(order: dict) -> dict:
+        return {
+            "instType": "SWAP" if order["symbol"].endswith("-SWAP") else "SPOT",
+            "instId": order["symbol"],
+            "ordId": order["id"],
+            "clOrdId": order["client_order_id"],
+            "px": "",
+            "sz": str(order["amount"]),
+            "ordType": "market",
+            "side": order["side"],
+            "posSide": order["pos_side"],
+            "tdMode": order["td_mode"],
+            "accFillSz": str(order["filled"]),
+            "fillPx": str(order["price"]),
+            "fillSz": str(order["filled"]),
+            "avgPx": str(order["price"]),
+            "state": "filled" if order["status"] == "closed" else "partially_filled",
+            "lever": "",
+            "fee": "0",
+            "feeCcy": order["quote"],
+            "reduceOnly": "true" if order["reduce_only"] else "false",
+            "tgtCcy": "",
+            "cTime": str(order["timestamp"]),
+            "uTime": str(order["timestamp"]),
+        }
+
+    @router.get("/api/v5/public/time")
+    async def server_time():
+        return ok([{"ts": str(int(time.time() * 1000))}])
+
+    @router.get("/api/v5/asset/currencies")
+    async def currencies():
+        return ok([])
+
+    @router.get("/api/v5/public/instruments")
+    async def instruments(request: Request):
+        inst_type = request.query_params.get("instType", "SPOT")
+        if inst_type not in ("SPOT", "SWAP"):
+            return ok([])
+        return ok([instrument(inst_type, base, "USDT") for base in account().prices])
+
+    @router.get("/api/v5/market/ticker")
+    async def ticker(request: Request):
+        inst_id = request.query_params["instId"]
+        base, quote = split_instrument(inst_id)
+        price = str(account(inst_id).get_price(base, quote))
+        return ok(
+            [
+                {
+                    "instType": "SWAP" if inst_id.endswith("-SWAP") else "SPOT",
+                    "instId": inst_id,
+                    "last": price,
+                    "lastSz": "1",
+                    "askPx": price,
+                    "askSz": "1",
+                    "bidPx": price,
+                    "bidSz": "1",
+                    "open24h": price,
+                    "high24h": price,
+                    "low24h": price,
+                    "volCcy24h": "1000000",
+                    "vol24h": "1000",
+                    "sodUtc0": price,
+                    "sodUtc8": price,
+                    "ts": str(int(time.time() * 1000)),
+                }
+            ]
+        )
+
+    @router.get("/api/v5/account/trade-fee")
+    async def trade_fee(request: Request):
+        return ok(
+            [
+                {
+                    "instType": request.query_params.get("instType", "SPOT"),
+                    "level": "Lv1",
+                    "maker": "-0.0008",
+                    "taker": "-0.001",
+                    "ts": str(int(time.time() * 1000)),
+                }
+            ]
+        )
+
+    @router.get("/api/v5/account/balance")
+    async def balance():
+        # 통합 계정: 현물/선물이 같은 잔고를 사용
+        balances = account().balances
+        details = [
+            {
+                "ccy": ccy,
+                "availBal": str(amount),
+                "availEq": str(amount),
+                "cashBal": str(amount),
+                "eq": str(amount),
+                "frozenBal": "0",
+                "uTime": str(int(time.time() * 1000)),
+            }
+            for ccy, amount in balances.items()
+        ]
+        return ok(
+            [
+                {
+                    "totalEq": str(balances.get("USDT", 0)),
+                    "details": details,
+                    "uTime": str(int(time.time() * 1000)),
+                }
+            ]
+        )
+
+    @router.get("/api/v5/account/positions")
+    async def positions(request: Request):
+        fake = account("-SWAP")
+        inst_id = request.query_params.get("instId")
+        items = []
+        for position in fake.get_positions(inst_id):
+            base, quote = split_instrument(position["symbol"])
+            mark = fake.get_price(base, quote)
+            pos_side = "net" if position["position_side"] == "BOTH" else position["side"]
+            items.append(
+                {
+                    "instType": "SWAP",
+                    "instId": position["symbol"],
+                    "posId": position["symbol"],
+                    "mgnMode": "isolated",
+                    "posSide": pos_side,
+                    "pos": str(position["signed"] if pos_side == "net" else position["contracts"]),
+                    "availPos": str(position["contracts"]),
+                    "avgPx": str(position["entry_price"]),
+                    "markPx": str(mark),
+                    "lever": str(position["leverage"]),
+                    "upl": str((mark - position["entry_price"]) * position["signed"] * CONTRACT_VALUE),
+                    "notionalUsd": str(position["contracts"] * CONTRACT_VALUE * mark),
+                    "margin": "0",
+                    "liqPx": "",
+                    "ccy": quote,
+                    "cTime": str(int(time.time() * 1000)),
+                    "uTime": str(int(time.time() * 1000)),
+                }
+            )
+        return ok(items)
+
+    @router.post("/api/v5/account/set-leverage")
+    async def set_leverage(request: Request):
+        params = await get_params(request)
+        inst_id = params.get("instId", "")
+        account(inst_id).leverage[inst_id] = int(float(params["lever"]))
+        return ok([{"instId": inst_id, "lever": params["lever"], "mgnMode": params.get("mgnMode"), "posSide": params.get("posSide", "")}])
+
+    @router.post("/api/v5/account/set-position-mode")
+    async def set_position_mode(request: Request):
+        params = await get_params(request)
+        account("-SWAP").hedge_mode = params.get("posMode") == "long_short_mode"
+        return ok([{"posMode": params.get("posMode")}])
+
+    def place_order(params: dict) -> dict:
+        inst_id = params["instId"]
+        fake = account(inst_id)
+        base, quote = split_instrument(inst_id)
+        side = params["side"]
+        size = float(params["sz"])
+        futures = inst_id.endswith("-SWAP")
+        pos_side = params.get("posSide", "net")
+        if futures and (pos_side == "net") == fake.hedge_mode:
+            return ERRORS["pos_side"][1]["data"][0]
+        if futures:
+            # 계약 수로 포지션을 관리하고 체결 금액만 계약 가치로 계산
+            order = fake.fill(
+                inst_id,
+                base,
+                quote,
+                side,
+                amount=size,
+                futures=True,
+                reduce_only=str(params.get("reduceOnly", "false")).lower() == "true",
+                position_side="BOTH" if pos_side == "net" else pos_side.upper(),
+                client_order_id=params.get("clOrdId"),
+            )
+            order["cost"] *= CONTRACT_VALUE
+        else:
+            # 현물 시장가 매수는 tgtCcy 가 base_ccy 가 아니면 견적 통화 금액
+            by_cost = side == "buy" and params.get("tgtCcy", "quote_ccy") != "base_ccy"
+            order = fake.fill(
+                inst_id,
+                base,
+                quote,
+                side,
+                amount=None if by_cost else size,
+                cost=size if by_cost else None,
+                client_order_id=params.get("clOrdId"),
+            )
+        order["pos_side"] = pos_side
+        order["td_mode"] = params.get("tdMode", "cash")
+        return {"ordId": order["id"], "clOrdId": order["client_order_id"], "tag": "", "sCode": "0", "sMsg": "Order placed"}
+
+    def orders_response(results: list[dict]) -> dict:
+        if all(result["sCode"] == "0" for result in results):
+            return ok(results)
+        return {"code": "1", "msg": "All operations failed", "data": results}
+
+    @router.post("/api/v5/trade/order")
+    async def create_order(request: Request):
+        return orders_response([place_order(await get_params(request))])
+
+    @router.post("/api/v5/trade/batch-orders")
+    async def create_orders(request: Request):
+        return orders_response([place_order(params) for params in await request.json()])
+
+    @router.get("/api/v5/trade/order")
+    async def fetch_order(request: Request):
+        inst_id = request.query_params["instId"]
+        return ok([order_response(account(inst_id).orders[request.query_params["ordId"]])])
+
+    return router
@@ -0,0 +1,138 @@
+import time
+from datetime import datetime, timedelta, timezone
+from fastapi import APIRouter, Request
+from exchange.fake.engine import FakeServer
+from exchange.fake.utils import error_response, get_params, split_symbol
+
+ERRORS = {
+    "overloaded": (500, {"error": {"name": "server_error", "message": "일시적인 서버 오류입니다."}}),
+    "insufficient": (400, {"error": {"name": "insufficient_funds_bid", "message": "주문가능한 금액(KRW)이 부족합니다."}}),
+    "invalid_volume": (400, {"error": {"name": "invalid_volume_ask", "message": "주문가능한 수량이 부족합니다."}}),
+}
+DEFAULT_ERROR = "overloaded"
+
+QUOTES = ("KRW", "USDT", "BTC")
+KST = timezone(timedelta(hours=9))
+
+
+def get_time(timestamp: int) -> str:
+    return datetime.fromtimestamp(timestamp / 1000, KST).isoformat(timespec="seconds")
+
+
+def create_router(server: FakeServer) -> APIRouter:
+    router = APIRouter()
+
+    def account():
+        return server.account("upbit")
+
+    def order_response(order: dict) -> dict:
+        created_at = get_time(order["timestamp"])
+        market = order["symbol"]
+        return {
+            "uuid": order["uuid"],
+            "side": "bid" if order["side"] == "buy" else "ask",
+            "ord_type": order["ord_type"],
+            "price": str(order["request_price"]) if order["request_price"] else None,
+            "state": "done" if order["status"] == "closed" else "wait",
+            "market": market,
+            "created_at": created_at,
+            "volume": str(order["amount"]) if order["ord_type"] != "price" else None,
+            "remaining_volume": str(order["remaining"]) if order["ord_type"] != "price" else None,
+            "reserved_fee": "0",
+            "remaining_fee": "0",
+            "paid_fee": "0",
+            "locked": "0",
+            "executed_volume": str(order["filled"]),
+            "trades_count": 1,
+            "trades": [
+                {
+                    "market": market,
+                    "uuid": f"{order['uuid']}-1",
+                    "price": str(order["price"]),
+                    "volume": str(order["filled"]),
+                    "funds": str(order["cost"]),
+                    "side": "bid" if order["side"] == "buy" else "ask",
+                    "created_at": created_at,
+                }
+            ],
+        }
+
+    @router.get("/v1/market/all")
+    async def markets():
+        return [
+            {
+                "market": f"{quote}-{base}",
+                "korean_name": base,
+                "english_name": base,
+                "market_warning": "NONE",
+            }
+            for base in account().prices
+            for quote in ("KRW", "USDT")
+        ]
+
+    @router.get("/v1/ticker")
+    async def tickers(request: Request):
+        now = int(time.time() * 1000)
+        response = []
+        for market in request.query_params["markets"].split(","):
+            base, quote = split_symbol(market, QUOTES)
+            price = account().get_price(base, quote)
+            response.append(
+                {
+                    "market": market,
+                    "trade_price": price,
+                    "opening_price": price,
+                    "high_price": price,
+                    "low_price": price,
+                    "prev_closing_price": price,
+                    "change": "EVEN",
+                    "acc_trade_volume_24h": 1000.0,
+                    "acc_trade_price_24h": price * 1000,
+                    "trade_timestamp": now,
+                    "timestamp": now,
+                }
+            )
+        return response
+
+    @router.get("/v1/accounts")
+    async def balances():
+        return [
+            {
+                "currency": currency,
+                "balance": str(amount),
+                "locked": "0",
+                "avg_buy_price": "0",
+                "avg_buy_price_modified": False,
+                "unit_currency": "KRW",
+            }
+            for currency, amount in account().balances.items()
+        ]
+
+    @router.post("/v1/orders")
+    async def create_order(request: Request):
+        params = await get_params(request)
+        market = params["market"]
+        base, quote = split_symbol(market, QUOTES)
+        ord_type = params.get("ord_type", "market")
+        # 시장가 매수는 수량 대신 주문 금액(price)으로 주문
+        if ord_type == "price":
+            order = account().fill(market, base, quote, "buy", cost=float(params["price"]))
+        else:
+            side = "buy" if params["side"] == "bid" else "sell"
+            amount = float(params["volume"])
+            if side == "sell" and account().balances.get(base, 0.0) < amount:
+                status, body = ERRORS["invalid_volume"]
+                return error_response(status, body)
+            order = account().fill(market, base, quote, side, amount=amount)
+        # 주문 번호로 만든 고정 uuid (같은 순서로 주문하면 같은 uuid)
+        order["uuid"] = f"00000000-0000-4000-8000-{int(order['id']):012d}"
+        order["ord_type"] = ord_type
+        order["request_price"] = params.get("price")
+        account().orders[order["uuid"]] = order
+        return order_response(order)
+
+    @router.get("/v1/order")
+    async def fetch_order(request: Request):
+        return order_response(account().orders[request.query_params["uuid"]])
+
+    return router
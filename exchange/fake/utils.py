@@ -0,0 +1,37 @@
+import orjson
+from fastapi import Request
+from fastapi.responses import JSONResponse
+
+
+async def get_params(request: Request) -> dict:
+    """쿼리스트링, form, JSON 본문을 하나로 합친 요청 파라미터"""
+    params = dict(request.query_params)
+    body = await request.body()
+    if not body:
+        return params
+    content_type = request.headers.get("content-type", "")
+    if "json" in content_type or body[:1] in (b"{", b"["):
+        data = orjson.loads(body)
+        if isinstance(data, dict):
+            params |= data
+    else:
+        params |= dict((await request.form()).items())
+    return params
+
+
+def split_symbol(symbol: str, quotes: tuple[str, ...]) -> tuple[str, str]:
+    """BTCUSDT, BTC-USDT, KRW-BTC 같은 거래소 심볼 id 를 (base, quote) 로 분리"""
+    for separator in ("-", "_", "/"):
+        if separator in symbol:
+            first, second = symbol.split(separator)[:2]
+            if first in quotes:
+                return second, first
+            return first, second
+    for quote in quotes:
+        if symbol.endswith(quote) and symbol != quote:
+            return symbol[: -len(quote)], quote
+    return symbol, quotes[0]
+
+
+def error_response(status: int, body: dict) -> JSONResponse:
+    return JSONResponse(body, status_code=status)
@@ -0,0 +1,39 @@
+import asyncio
+from typing import Awaitable, Callable
+from exchange.model import MarketOrder
+
+
+def split_order(order_info: MarketOrder) -> list[MarketOrder]:
+    """계좌 목록이 있는 주문을 계좌별 주문으로 나눕니다"""
+    orders = []
+    for index, account in enumerate(order_info.accounts):
+        update = {"amounts": None}
+        if order_info.is_stock:
+            update["kis_number"] = account
+        else:
+            update["account"] = account
+        if order_info.amounts is not None:
+            update["amount"] = order_info.amounts[index]
+        orders.append(order_info.copy(update=update))
+    return orders
+
+
+def get_account_name(order_info: MarketOrder) -> str:
+    if order_info.is_stock:
+        return f"{order_info.kis_number}번째 계좌"
+    return order_info.account or "default"
+
+
+async def execute_fanout(
+    order_info: MarketOrder,
+    execute: Callable[[MarketOrder], Awaitable],
+) -> list[tuple[MarketOrder, object]]:
+    """
+    계좌별 주문을 동시에 실행하고 (계좌 주문, 결과 또는 예외) 목록을 돌려줍니다.
+    한 계좌가 실패해도 나머지 계좌 주문은 그대로 진행합니다.
+    """
+    orders = split_order(order_info)
+    results = await asyncio.gather(
+        *(execute(order) for order in orders), return_exceptions=True
+    )
+    return list(zip(orders, results))
@@ -0,0 +1,182 @@
+import asyncio
+import threading
+from loguru import logger
+from exchange import pocket
+from exchange.database import db
+from exchange.model import CRYPTO_EXCHANGES
+from exchange.utility import settings
+
+# PocketBase 동기화 한 번에 처리할 최대 기록 수
+SYNC_BATCH_SIZE = 100
+
+
+class HedgeLedger:
+    """
+    김프 헷지 포지션 장부
+    store.db 의 kimp_ledger 테이블에 기록하고 (base, exchange) 별 합계를 메모리에 들고 있어
+    헷지 조회/종료가 PocketBase 를 왕복하지 않습니다.
+    PocketBase 에는 HEDGE_SYNC_INTERVAL 마다 백그라운드에서 모아서 반영합니다 (write-behind).
+    """
+
+    def __init__(self):
+        self._totals: dict[tuple[str, str], float] = {}
+        self._lock = threading.Lock()
+        self._reconciled = False
+        self._task: asyncio.Task | None = None
+
+    def init_db(self):
+        db.excute(
+            """
+            CREATE TABLE IF NOT EXISTS kimp_ledger (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                exchange TEXT NOT NULL,
+                base TEXT NOT NULL,
+                quote TEXT NOT NULL,
+                amount REAL NOT NULL,
+                pb_id TEXT UNIQUE,
+                closed INTEGER NOT NULL DEFAULT 0
+            );
+            """,
+            {},
+        )
+        db.excute(
+            "CREATE INDEX IF NOT EXISTS kimp_ledger_open ON kimp_ledger (base, exchange, closed);",
+            {},
+        )
+
+    def load(self):
+        rows = db.fetch_all(
+            "SELECT base, exchange, SUM(amount) FROM kimp_ledger WHERE closed = 0 GROUP BY base, exchange",
+            {},
+        )
+        with self._lock:
+            self._totals = {(base, exchange): amount for base, exchange, amount in rows}
+
+    def get_amount(self, base: str, exchange: str) -> float:
+        return self._totals.get((base, exchange), 0.0)
+
+    def get_totals(self, base: str, exchange: str = "BINANCE") -> dict[str, float]:
+        """exchange: 업비트 현물과 짝을 이루는 해외 선물 거래소"""
+        return {
+            exchange: self.get_amount(base, exchange),
+            "UPBIT": self.get_amount(base, "UPBIT"),
+        }
+
+    async def add(self, exchange: str, base: str, quote: str, amount: float):
+        await db.excute_async(
+            "INSERT INTO kimp_ledger (exchange, base, quote, amount) VALUES (?, ?, ?, ?)",
+            (exchange, base, quote, amount),
+        )
+        with self._lock:
+            key = (base, exchange)
+            self._totals[key] = self._totals.get(key, 0.0) + amount
+
+    async def close(self, base: str, exchange: str) -> float:
+        """열린 기록을 모두 종료 처리하고 종료한 수량을 돌려줍니다"""
+        await db.excute_async(
+            "UPDATE kimp_ledger SET closed = 1 WHERE base = ? AND exchange = ? AND closed = 0",
+            (base, exchange),
+        )
+        with self._lock:
+            return self._totals.pop((base, exchange), 0.0)
+
+    def reconcile(self):
+        """장부에 없는 PocketBase 기록(이전 버전에서 쓴 기록 등)을 가져옵니다"""
+        known = {
+            row[0]
+            for row in db.fetch_all(
+                "SELECT pb_id FROM kimp_ledger WHERE pb_id IS NOT NULL", {}
+            )
+        }
+        records = [
+            record
+            for record in pocket.get_full_list("kimp")
+            if record.id not in known and record.exchange in CRYPTO_EXCHANGES
+        ]
+        if records:
+            db.excute_many(
+                "INSERT INTO kimp_ledger (exchange, base, quote, amount, pb_id) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (record.exchange, record.base, record.quote, record.amount, record.id)
+                    for record in records
+                ],
+            )
+            with self._lock:
+                for record in records:
+                    key = (record.base, record.exchange)
+                    self._totals[key] = self._totals.get(key, 0.0) + record.amount
+            logger.info(f"PocketBase 헷지 기록 {len(records)}개를 장부로 가져왔습니다")
+        self._reconciled = True
+
+    def sync(self):
+        """아직 반영하지 않은 생성/삭제를 PocketBase 에 반영"""
+        if not self._reconciled:
+            self.reconcile()
+
+        rows = db.fetch_all(
+            "SELECT id, exchange, base, quote, amount FROM kimp_ledger WHERE pb_id IS NULL AND closed = 0 LIMIT ?",
+            (SYNC_BATCH_SIZE,),
+        )
+        created = []
+        try:
+            for id, exchange, base, quote, amount in rows:
+                record = pocket.create(
+                    "kimp",
+                    {"exchange": exchange, "base": base, "quote": quote, "amount": amount},
+                )
+                created.append((record.id, id))
+        finally:
+            if created:
+                db.excute_many("UPDATE kimp_ledger SET pb_id = ? WHERE id = ?", created)
+
+        rows = db.fetch_all(
+            "SELECT id, pb_id FROM kimp_ledger WHERE closed = 1 LIMIT ?",
+            (SYNC_BATCH_SIZE,),
+        )
+        deleted = []
+        try:
+            for id, pb_id in rows:
+                if pb_id is not None:
+                    pocket.delete("kimp", pb_id)
+                deleted.append((id,))
+        finally:
+            if deleted:
+                db.excute_many("DELETE FROM kimp_ledger WHERE id = ?", deleted)
+
+    async def _sync_forever(self):
+        while True:
+            try:
+                await asyncio.to_thread(self.sync)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"헷지 장부 PocketBase 동기화 에러: {str(e)}")
+            await asyncio.sleep(settings.HEDGE_SYNC_INTERVAL)
+
+    async def start(self):
+        await asyncio.to_thread(self.load)
+        try:
+            await asyncio.to_thread(self.reconcile)
+        except Exception as e:
+            # PocketBase 가 꺼져 있으면 동기화 루프에서 다시 시도
+            logger.warning(f"PocketBase 헷지 기록을 가져오지 못했습니다: {str(e)}")
+        self._task = asyncio.create_task(self._sync_forever())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        try:
+            # 종료 전에 남은 기록 반영
+            await asyncio.to_thread(self.sync)
+        except Exception as e:
+            logger.warning(f"헷지 장부 PocketBase 동기화 에러: {str(e)}")
+
+
+hedge_ledger = HedgeLedger()
+hedge_ledger.init_db()
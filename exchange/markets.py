@@ -0,0 +1,115 @@
+import asyncio
+import os
+import time
+from pathlib import Path
+import orjson
+from loguru import logger
+from exchange import metrics
+from exchange.utility import settings
+
+parent_directory = Path(os.path.dirname(os.path.realpath(__file__))).parent
+
+
+class MarketSnapshot:
+    """
+    ccxt load_markets 결과를 파일로 저장해 두고 재시작 시 바로 불러옵니다.
+    모든 워커 프로세스가 같은 파일을 공유하며, TTL 이 지나면 백그라운드에서 갱신합니다.
+    """
+
+    def __init__(self, directory: Path = parent_directory / "markets"):
+        self.directory = Path(directory)
+        self._tasks: dict[int, asyncio.Task] = {}
+        self._background: set[asyncio.Task] = set()
+
+    @property
+    def ttl(self) -> int:
+        return settings.MARKETS_CACHE_TTL
+
+    def get_path(self, client) -> Path:
+        name = client.id
+        if getattr(client, "isSandboxModeEnabled", False):
+            name += "-sandbox"
+        if getattr(client, "base_url_override", None):
+            # 다른 서버(가짜 거래소 등)의 마켓이 실제 스냅샷을 덮어쓰지 않도록
+            name += "-override"
+        return self.directory / f"{name}.json"
+
+    def read(self, path: Path):
+        try:
+            with open(path, "rb") as f:
+                return orjson.loads(f.read())
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"마켓 스냅샷 읽기 실패({path.name}): {str(e)}")
+            return None
+
+    def write(self, path: Path, markets: dict, currencies: dict | None):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        data = {"saved_at": time.time(), "markets": markets, "currencies": currencies}
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS))
+        os.replace(tmp_path, path)
+
+    def get_age(self, path: Path) -> float | None:
+        try:
+            return time.time() - os.stat(path).st_mtime
+        except OSError:
+            return None
+
+    async def hydrate(self, client):
+        path = self.get_path(client)
+        snapshot = await asyncio.to_thread(self.read, path)
+        if snapshot is None:
+            metrics.cache_requests.inc("market", client.id, "miss")
+            await self.refresh(client)
+        else:
+            metrics.cache_requests.inc("market", client.id, "hit")
+            client.set_markets(snapshot["markets"], snapshot.get("currencies"))
+            if client.options.get("adjustForTimeDifference"):
+                # load_markets 를 건너뛰었으므로 시간 보정만 따로
+                self._spawn(client.load_time_difference())
+            if time.time() - snapshot["saved_at"] > self.ttl:
+                self._spawn(self.refresh(client))
+        self._start(client)
+
+    async def refresh(self, client):
+        path = self.get_path(client)
+        try:
+            markets = await client.load_markets(reload=True)
+            await asyncio.to_thread(self.write, path, markets, client.currencies)
+        except Exception as e:
+            if not client.markets:
+                raise
+            logger.warning(f"{client.id} 마켓 정보 갱신 실패: {str(e)}")
+
+    async def _refresh_forever(self, client):
+        path = self.get_path(client)
+        while True:
+            await asyncio.sleep(self.ttl)
+            age = self.get_age(path)
+            if age is not None and age < self.ttl:
+                # 다른 프로세스가 이미 갱신한 스냅샷을 사용
+                snapshot = await asyncio.to_thread(self.read, path)
+                if snapshot is not None:
+                    client.set_markets(snapshot["markets"], snapshot.get("currencies"))
+                    continue
+            await self.refresh(client)
+
+    def _spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    def _start(self, client):
+        if id(client) not in self._tasks:
+            self._tasks[id(client)] = asyncio.create_task(self._refresh_forever(client))
+
+    def stop(self, client):
+        task = self._tasks.pop(id(client), None)
+        if task is not None:
+            task.cancel()
+
+
+market_snapshot = MarketSnapshot()
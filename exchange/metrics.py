@@ -0,0 +1,164 @@
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Callable
+
+# 주문/거래소 호출 지연 시간 구간(초)
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        registry.append(self)
+
+    def samples(self):
+        return []
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        for suffix, values, extra, value in self.samples():
+            lines.append(
+                f"{self.name}{suffix}{format_labels(self.labels, values, extra)} {value}"
+            )
+        return lines
+
+
+class Counter(Metric):
+    """
+    라벨 값 튜플별 누적값
+    collect 를 주면 기존 카운터(dict/Counter)를 그대로 읽어서 내보냅니다.
+    """
+
+    type = "counter"
+
+    def __init__(self, name, help, labels=(), collect: Callable[[], dict] | None = None):
+        super().__init__(name, help, labels)
+        self._values: dict[tuple, float] = defaultdict(float)
+        self._collect = collect
+
+    def inc(self, *values, amount: float = 1):
+        self._values[values] += amount
+
+    def samples(self):
+        values = self._collect() if self._collect else self._values
+        return [("", key, "", value) for key, value in list(values.items())]
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def set(self, *values, value: float):
+        self._values[values] = value
+
+    def dec(self, *values, amount: float = 1):
+        self._values[values] -= amount
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = buckets
+        # 라벨 값 -> [구간별 개수..., 합계, 개수]
+        self._values: dict[tuple, list[float]] = {}
+
+    def observe(self, value: float, *values):
+        data = self._values.get(values)
+        if data is None:
+            data = self._values[values] = [0] * (len(self.buckets) + 2)
+        index = bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            data[index] += 1
+        data[-2] += value
+        data[-1] += 1
+
+    @contextmanager
+    def time(self, *values):
+        started_at = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(time.monotonic() - started_at, *values)
+
+    def samples(self):
+        samples = []
+        for key, data in list(self._values.items()):
+            cumulative = 0
+            for bucket, count in zip(self.buckets, data):
+                cumulative += count
+                samples.append(("_bucket", key, f'le="{bucket}"', cumulative))
+            samples.append(("_bucket", key, 'le="+Inf"', data[-1]))
+            samples.append(("_sum", key, "", data[-2]))
+            samples.append(("_count", key, "", data[-1]))
+        return samples
+
+
+registry: list[Metric] = []
+
+
+def render() -> str:
+    lines = []
+    for metric in registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def get_order_labels(order_info) -> tuple[str, str, str]:
+    """(exchange, market_type, side)"""
+    if order_info.is_stock:
+        market_type = "stock"
+    elif order_info.is_futures:
+        market_type = "futures"
+    else:
+        market_type = "spot"
+    return order_info.exchange, market_type, order_info.side
+
+
+order_ack_seconds = Histogram(
+    "poabot_order_ack_seconds",
+    "웹훅 수신부터 접수 응답까지 걸린 시간",
+    ("exchange", "market_type", "side"),
+)
+order_fill_seconds = Histogram(
+    "poabot_order_fill_seconds",
+    "웹훅 수신부터 주문 체결(실행 완료)까지 걸린 시간",
+    ("exchange", "market_type", "side"),
+)
+order_results = Counter(
+    "poabot_orders_total",
+    "실행한 주문 수",
+    ("exchange", "market_type", "side", "result"),
+)
+exchange_call_seconds = Histogram(
+    "poabot_exchange_call_seconds",
+    "거래소 어댑터 market_* 호출 시간",
+    ("exchange", "method"),
+)
+hedge_seconds = Histogram(
+    "poabot_hedge_seconds",
+    "헷지 요청 처리 시간",
+    ("exchange", "hedge", "result"),
+)
+cache_requests = Counter(
+    "poabot_cache_requests_total",
+    "마켓/가격/잔고 캐시 조회 수",
+    ("cache", "exchange", "result"),
+)
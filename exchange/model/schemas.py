@@ -125,6 +125,46 @@ class Settings(BaseSettings):
     KIS4_SECRET: str | None = None
     DB_ID: str = "poa@admin.com"
     DB_PASSWORD: str = "poabot!@#$"
+    # 마켓 정보 스냅샷 유효 시간(초)
+    MARKETS_CACHE_TTL: int = 60 * 60
+    # 웹소켓으로 유지하는 잔고/포지션 캐시를 믿을 수 있는 최대 시간(초)
+    ACCOUNT_CACHE_MAX_AGE: float = 60.0
+    # 티커 스트림 가격을 사용할 수 있는 최대 시간(초)
+    TICKER_MAX_AGE: float = 5.0
+    # 주문 하나가 재시도에 쓸 수 있는 전체 시간(초)
+    ORDER_RETRY_BUDGET: float = 10.0
+    # 접수된 웹훅 주문을 실행하는 워커 수
+    ORDER_WORKERS: int = 4
+    # 종료할 때 실행 중인 주문이 끝나길 기다리는 최대 시간(초)
+    ORDER_STOP_TIMEOUT: float = 30.0
+    # 주문 큐/중복 알림 DB 경로 (기본: 프로젝트 폴더의 queue.db)
+    QUEUE_DATABASE_URL: str | None = None
+    # alert_id 없는 같은 내용의 알림을 중복으로 보는 시간(초)
+    ALERT_DEDUP_WINDOW: float = 10.0
+    # 같은 alert_id 를 기억하는 시간(초)
+    ALERT_ID_TTL: float = 24 * 60 * 60
+    # 이름 있는 추가 코인 계좌 {"BINANCE": {"sub1": {"KEY": "", "SECRET": "", "PASSPHRASE": ""}}}
+    CRYPTO_ACCOUNTS: dict[str, dict[str, dict[str, str]]] = {}
+    # KIS 토큰을 만료 몇 초 전에 미리 재발급할지
+    KIS_TOKEN_REFRESH_BEFORE: float = 3 * 60 * 60
+    # KIS 시세 캐시: 사용할 수 있는 최대 시간, 갱신 주기, 미사용 시 갱신 중단 시간(초)
+    KIS_QUOTE_MAX_AGE: float = 2.0
+    KIS_QUOTE_POLL_INTERVAL: float = 1.0
+    KIS_QUOTE_IDLE: float = 10 * 60
+    # KIS 시세 갱신에 쓸 수 있는 앱키 초당 요청 한도의 비율
+    KIS_QUOTE_RATE_SHARE: float = 0.5
+    # KIS 앱키별 초당 요청 수 (실전 20회, 모의 2회 제한보다 약간 낮게)
+    KIS_RATE_LIMIT: float = 18.0
+    KIS_PAPER_RATE_LIMIT: float = 1.8
+    # 헷지 장부를 PocketBase 에 반영하는 주기(초)
+    HEDGE_SYNC_INTERVAL: float = 5.0
+    # 동시 주문(헷지 등)의 모든 주문이 끝나길 기다리는 최대 시간(초)
+    MULTILEG_TIMEOUT: float = 15.0
+    # 콘솔 로그를 사람이 읽기 좋은 형식으로 출력 (False 면 파일과 같은 JSON)
+    LOG_PRETTY_CONSOLE: bool = True
+    # 거래소 REST 주소 덮어쓰기 (가짜 거래소 fake_server.py 등)
+    # {"BINANCE": "http://127.0.0.1:8900/binance", "KIS": "http://127.0.0.1:8900/kis"}
+    EXCHANGE_BASE_URLS: dict[str, str] = {}
 
     class Config:
         env_file = env_path  # ".env"
@@ -192,6 +232,23 @@ def parse_quote(quote: str):
         return quote
 
 
+def to_request_values(values: dict) -> dict:
+    """
+    검증이 끝난 주문 값을 웹훅 요청 형식으로 되돌립니다 (entry/buy, USDT.P 등)
+    저장해 둔 주문을 다시 검증해도 같은 주문이 되도록 사용합니다.
+    """
+    values = dict(values)
+    side = values["side"]
+    if values.get("is_entry"):
+        values["side"] = f"entry/{side}"
+    elif values.get("is_close"):
+        values["side"] = f"close/{side}"
+    quote = values["quote"]
+    if values.get("is_futures") and not any(quote.endswith(code) for code in crypto_futures_code):
+        values["quote"] = f"{quote}.P"
+    return values
+
+
 class OrderRequest(BaseModel):
     exchange: EXCHANGE_LITERAL
     base: str
@@ -208,7 +265,11 @@ class OrderRequest(BaseModel):
     stop_price: float | None = None
     profit_price: float | None = None
     order_name: str = "주문"
-    kis_number: int | None = 1
+    kis_number: int | list[int] | None = 1
+    # 거래소 이름 있는 계좌 (CRYPTO_ACCOUNTS), 없으면 기본 키
+    account: str | list[str] | None = None
+    # 계좌 목록과 같은 순서의 계좌별 수량
+    amounts: list[float] | None = None
     hedge: str | None = None
     unified_symbol: str | None = None
     is_crypto: bool | None = None
@@ -224,6 +285,7 @@ class OrderRequest(BaseModel):
     is_contract: bool | None = None
     contract_size: float | None = None
     margin_mode: str | None = None
+    alert_id: str | None = None
 
     class Config:
         use_enum_values = True
@@ -270,14 +332,41 @@ class OrderRequest(BaseModel):
             values["is_stock"] = True
         return values
 
+    @root_validator(skip_on_failure=True)
+    def accounts_validate(cls, values):
+        key = "kis_number" if values.get("is_stock") else "account"
+        accounts = values.get(key)
+        if isinstance(accounts, list):
+            if not accounts:
+                raise ValueError(f"{key} 계좌 목록이 비어 있습니다")
+            # 계좌 하나짜리 목록은 단일 계좌 주문과 같음
+            if len(accounts) == 1 and values.get("amounts") is None:
+                values[key] = accounts = accounts[0]
+        if values.get("amounts") is None:
+            return values
+        if not isinstance(accounts, list) or len(accounts) != len(values["amounts"]):
+            raise ValueError("amounts 는 계좌 목록과 길이가 같아야 합니다")
+        return values
+
+    @property
+    def accounts(self) -> list:
+        """주문을 실행할 계좌 목록 (주식은 kis_number, 코인은 account)"""
+        accounts = self.kis_number if self.is_stock else self.account
+        return accounts if isinstance(accounts, list) else [accounts]
+
+    @property
+    def is_fanout(self) -> bool:
+        return len(self.accounts) > 1 or self.amounts is not None
+
 
 class OrderBase(OrderRequest):
     password: str
 
     @validator("password")
     def password_validate(cls, v):
-        setting = Settings()
-        if v != setting.PASSWORD:
+        from exchange.utility.setting import get_settings
+
+        if v != get_settings().PASSWORD:
             raise ValueError("비밀번호가 틀렸습니다")
         return v
 
@@ -336,8 +425,9 @@ class HedgeData(BaseModel):
 
     @validator("password")
     def password_validate(cls, v):
-        setting = Settings()
-        if v != setting.PASSWORD:
+        from exchange.utility.setting import get_settings
+
+        if v != get_settings().PASSWORD:
             raise ValueError("비밀번호가 틀렸습니다")
         return v
 
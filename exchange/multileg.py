@@ -0,0 +1,110 @@
+import asyncio
+from typing import Awaitable, Callable
+from loguru import logger
+from exchange.utility import settings
+
+
+class Leg:
+    """
+    여러 거래소에 동시에 넣는 주문 묶음의 한 주문
+    execute 는 주문을 실행해 결과를 돌려주고,
+    compensate 는 다른 주문이 실패했을 때 그 결과를 받아 주문을 되돌립니다.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        execute: Callable[[], Awaitable],
+        compensate: Callable[[object], Awaitable] | None = None,
+    ):
+        self.name = name
+        self.execute = execute
+        self.compensate = compensate
+
+
+class MultiLegError(Exception):
+    def __init__(
+        self,
+        errors: dict[str, BaseException],
+        compensated: list[str],
+        compensation_errors: dict[str, BaseException],
+    ):
+        self.errors = errors
+        self.compensated = compensated
+        self.compensation_errors = compensation_errors
+        messages = [f"{name} 실패: {str(e) or type(e).__name__}" for name, e in errors.items()]
+        if compensated:
+            messages.append(f"{', '.join(compensated)} 주문을 되돌렸습니다")
+        messages += [
+            f"{name} 되돌리기 실패: {str(e)}" for name, e in compensation_errors.items()
+        ]
+        super().__init__("\n".join(messages))
+
+
+# 제한 시간 뒤에 끝난 주문을 되돌리는 작업 (가비지 컬렉션 방지)
+late_tasks: set[asyncio.Task] = set()
+
+
+async def compensate(leg: Leg, result) -> BaseException | None:
+    if leg.compensate is None:
+        return None
+    try:
+        await leg.compensate(result)
+    except Exception as e:
+        logger.error(f"{leg.name} 되돌리기 실패: {str(e)}")
+        return e
+    return None
+
+
+async def compensate_late(leg: Leg, task: asyncio.Task):
+    try:
+        result = await task
+    except Exception:
+        return
+    logger.warning(f"{leg.name} 주문이 제한 시간 뒤에 체결되어 되돌립니다")
+    await compensate(leg, result)
+
+
+async def execute_legs(legs: list[Leg], timeout: float | None = None) -> dict[str, object]:
+    """
+    모든 주문을 동시에 실행하고 timeout(기본 MULTILEG_TIMEOUT) 초까지 기다립니다.
+    하나라도 실패하거나 시간 안에 끝나지 않으면 성공한 주문을 되돌리고 MultiLegError 를 냅니다.
+    시간 안에 끝나지 않은 주문은 취소하지 않고(이미 접수됐을 수 있음) 끝나는 대로 되돌립니다.
+    """
+    if timeout is None:
+        timeout = settings.MULTILEG_TIMEOUT
+    tasks = {leg.name: asyncio.create_task(leg.execute()) for leg in legs}
+    await asyncio.wait(tasks.values(), timeout=timeout)
+
+    results = {}
+    errors = {}
+    for leg in legs:
+        task = tasks[leg.name]
+        if not task.done():
+            errors[leg.name] = asyncio.TimeoutError(f"{timeout}초 안에 끝나지 않았습니다")
+        elif task.exception() is not None:
+            errors[leg.name] = task.exception()
+        else:
+            results[leg.name] = task.result()
+    if not errors:
+        return results
+
+    for leg in legs:
+        task = tasks[leg.name]
+        if not task.done():
+            late_task = asyncio.create_task(compensate_late(leg, task))
+            late_tasks.add(late_task)
+            late_task.add_done_callback(late_tasks.discard)
+
+    succeeded = [leg for leg in legs if leg.name in results]
+    outcomes = await asyncio.gather(
+        *(compensate(leg, results[leg.name]) for leg in succeeded)
+    )
+    compensated = []
+    compensation_errors = {}
+    for leg, error in zip(succeeded, outcomes):
+        if error is not None:
+            compensation_errors[leg.name] = error
+        elif leg.compensate is not None:
+            compensated.append(leg.name)
+    raise MultiLegError(errors, compensated, compensation_errors)
@@ -1,28 +1,42 @@
 import ccxt
 import ccxt.async_support as ccxt_async
+import ccxt.pro as ccxt_pro
 from devtools import debug
 
 from exchange.model import MarketOrder
 import exchange.error as error
+from exchange.markets import market_snapshot
+from exchange.account import AccountState
+from exchange.ticker import PriceService
+from exchange.timing import traced
 from decimal import Decimal
 
 
 class Okx:
-    def __init__(self, key, secret, passphrase):
-        self.client = ccxt.okx(
+    def __init__(self, key, secret, passphrase, market_type="spot"):
+        self.market_type = market_type
+        self.client = ccxt_pro.okx(
             {
                 "apiKey": key,
                 "secret": secret,
                 "password": passphrase,
+                "options": {"defaultType": market_type},
             }
         )
-        self.client.load_markets()
-        self.order_info: MarketOrder = None
+        self.account = AccountState(self.client)
+        self.prices = PriceService(self.client)
         self.position_mode = "one-way"
 
-    def init_info(self, order_info: MarketOrder):
-        self.order_info = order_info
+    async def load_markets(self):
+        await market_snapshot.hydrate(self.client)
+
+    async def close(self):
+        market_snapshot.stop(self.client)
+        self.account.stop()
+        self.prices.stop()
+        await self.client.close()
 
+    def init_info(self, order_info: MarketOrder):
         unified_symbol = order_info.unified_symbol
         market = self.client.market(unified_symbol)
 
@@ -31,10 +45,7 @@ class Okx:
             order_info.is_contract = True
             order_info.contract_size = market.get("contractSize")
 
-        if order_info.is_futures:
-            self.client.options["defaultType"] = "swap"
-        else:
-            self.client.options["defaultType"] = "spot"
+        return order_info
 
     def get_amount_precision(self, symbol):
         market = self.client.market(symbol)
@@ -50,28 +61,27 @@ class Okx:
         market = self.client.market(symbol)
         return market.get("contractSize")
 
-    def parse_symbol(self, base: str, quote: str):
-        if self.order_info.is_futures:
+    def parse_symbol(self, base: str, quote: str, order_info: MarketOrder):
+        if order_info.is_futures:
             return f"{base}/{quote}:{quote}"
         else:
             return f"{base}/{quote}"
 
-    def get_ticker(self, symbol: str):
-        return self.client.fetch_ticker(symbol)
+    async def get_ticker(self, symbol: str):
+        return await self.prices.get_ticker(symbol)
 
-    def get_price(self, symbol: str):
-        return self.get_ticker(symbol)["last"]
+    async def get_price(self, symbol: str):
+        return await self.prices.get_price(symbol)
 
-    def get_balance(self, base: str):
+    async def get_balance(self, base: str, order_info: MarketOrder):
         free_balance_by_base = None
-        if self.order_info.is_entry or (
-            self.order_info.is_spot
-            and (self.order_info.is_buy or self.order_info.is_sell)
+        if order_info.is_entry or (
+            order_info.is_spot
+            and (order_info.is_buy or order_info.is_sell)
         ):
+            balance = await self.account.fetch_balance(base)
             free_balance = (
-                self.client.fetch_free_balance()
-                if not self.order_info.is_total
-                else self.client.fetch_total_balance()
+                balance["free"] if not order_info.is_total else balance["total"]
             )
             free_balance_by_base = free_balance.get(base)
 
@@ -79,9 +89,11 @@ class Okx:
             raise error.FreeAmountNoneError()
         return free_balance_by_base
 
-    def get_futures_position(self, symbol=None, all=False):
+    async def get_futures_position(
+        self, symbol=None, order_info: MarketOrder = None, all=False
+    ):
         if symbol is None and all:
-            positions = self.client.fetch_balance()["info"]["positions"]
+            positions = (await self.client.fetch_balance())["info"]["positions"]
             positions = [
                 position
                 for position in positions
@@ -89,7 +101,7 @@ class Okx:
             ]
             return positions
 
-        positions = self.client.fetch_positions([symbol])
+        positions = await self.account.fetch_positions(symbol)
         long_contracts = None
         short_contracts = None
         if positions:
@@ -99,12 +111,12 @@ class Okx:
                 elif position["side"] == "short":
                     short_contracts = position["contracts"]
 
-            if self.order_info.is_close and self.order_info.is_buy:
+            if order_info.is_close and order_info.is_buy:
                 if not short_contracts:
                     raise error.ShortPositionNoneError()
                 else:
                     return short_contracts
-            elif self.order_info.is_close and self.order_info.is_sell:
+            elif order_info.is_close and order_info.is_sell:
                 if not long_contracts:
                     raise error.LongPositionNoneError()
                 else:
@@ -112,7 +124,8 @@ class Okx:
         else:
             raise error.PositionNoneError()
 
-    def get_amount(self, order_info: MarketOrder) -> float:
+    @traced("get_amount")
+    async def get_amount(self, order_info: MarketOrder) -> float:
         if order_info.amount is not None and order_info.percent is not None:
             raise error.AmountPercentBothError()
         elif order_info.amount is not None:
@@ -128,9 +141,9 @@ class Okx:
             else:
                 result = order_info.amount
         elif order_info.percent is not None:
-            if self.order_info.is_entry or (order_info.is_spot and order_info.is_buy):
+            if order_info.is_entry or (order_info.is_spot and order_info.is_buy):
                 if order_info.is_coinm:
-                    free_base = self.get_balance(order_info.base)
+                    free_base = await self.get_balance(order_info.base, order_info)
                     if order_info.is_contract:
                         result = (
                             free_base * (order_info.percent - 0.5) / 100
@@ -138,23 +151,27 @@ class Okx:
                     else:
                         result = free_base * order_info.percent / 100
                 else:
-                    free_quote = self.get_balance(order_info.quote)
+                    free_quote = await self.get_balance(order_info.quote, order_info)
                     cash = free_quote * (order_info.percent - 0.5) / 100
-                    current_price = self.get_price(order_info.unified_symbol)
+                    current_price = await self.get_price(order_info.unified_symbol)
                     if order_info.is_contract:
                         result = (cash / current_price) // order_info.contract_size
                     else:
                         result = cash / current_price
-            elif self.order_info.is_close:
+            elif order_info.is_close:
                 if order_info.is_contract:
-                    free_amount = self.get_futures_position(order_info.unified_symbol)
+                    free_amount = await self.get_futures_position(
+                        order_info.unified_symbol, order_info
+                    )
                     result = free_amount * order_info.percent / 100
                 else:
-                    free_amount = self.get_futures_position(order_info.unified_symbol)
+                    free_amount = await self.get_futures_position(
+                        order_info.unified_symbol, order_info
+                    )
                     result = free_amount * float(order_info.percent) / 100
 
             elif order_info.is_spot and order_info.is_sell:
-                free_amount = self.get_balance(order_info.base)
+                free_amount = await self.get_balance(order_info.base, order_info)
                 result = free_amount * float(order_info.percent) / 100
 
             result = float(
@@ -166,7 +183,7 @@ class Okx:
 
         return float(result)
 
-    def market_order(self, order_info: MarketOrder):
+    async def market_order(self, order_info: MarketOrder):
         from exchange.pexchange import retry
 
         symbol = (
@@ -175,7 +192,7 @@ class Okx:
         params = {"tgtCcy": "base_ccy"}
 
         try:
-            return retry(
+            return await retry(
                 self.client.create_order,
                 symbol,
                 order_info.type.lower(),
@@ -189,21 +206,21 @@ class Okx:
                 instance=self,
             )
         except Exception as e:
-            raise error.OrderError(e, self.order_info)
+            raise error.OrderError(e, order_info)
 
-    def market_buy(
+    async def market_buy(
         self,
         order_info: MarketOrder,
     ):
         # 수량기반
-        buy_amount = self.get_amount(order_info)
-        fee = self.client.fetch_trading_fee(self.order_info.unified_symbol)
+        buy_amount = await self.get_amount(order_info)
+        fee = await self.client.fetch_trading_fee(order_info.unified_symbol)
         order_info.amount = buy_amount
-        result = self.market_order(order_info)
+        result = await self.market_order(order_info)
         order_info.amount = buy_amount * (1 - fee["taker"])
         return result
 
-    def market_sell(
+    async def market_sell(
         self,
         order_info: MarketOrder,
     ):
@@ -211,50 +228,51 @@ class Okx:
         symbol = (
             order_info.unified_symbol
         )  # self.parse_symbol(order_info.base, order_info.quote)
-        fee = self.client.fetch_trading_fee(symbol)
-        sell_amount = self.get_amount(order_info)
+        fee = await self.client.fetch_trading_fee(symbol)
+        sell_amount = await self.get_amount(order_info)
 
         if order_info.percent is not None:
             order_info.amount = sell_amount
         else:
             order_info.amount = sell_amount * (1 - fee["taker"])
 
-        return self.market_order(order_info)
+        return await self.market_order(order_info)
 
-    def set_leverage(self, leverage, symbol):
-        if self.order_info.is_futures:
-            if self.order_info.is_futures and self.order_info.is_entry:
-                if self.order_info.is_buy:
+    @traced("set_leverage")
+    async def set_leverage(self, leverage, symbol, order_info: MarketOrder):
+        if order_info.is_futures:
+            if order_info.is_futures and order_info.is_entry:
+                if order_info.is_buy:
                     pos_side = "long"
-                elif self.order_info.is_sell:
+                elif order_info.is_sell:
                     pos_side = "short"
             try:
                 if (
-                    self.order_info.margin_mode is None
-                    or self.order_info.margin_mode == "isolated"
+                    order_info.margin_mode is None
+                    or order_info.margin_mode == "isolated"
                 ):
                     if self.position_mode == "hedge":
-                        self.client.set_leverage(
+                        await self.client.set_leverage(
                             leverage,
                             symbol,
                             params={"mgnMode": "isolated", "posSide": pos_side},
                         )
                     elif self.position_mode == "one-way":
-                        self.client.set_leverage(
+                        await self.client.set_leverage(
                             leverage,
                             symbol,
                             params={"mgnMode": "isolated", "posSide": "net"},
                         )
                 else:
-                    self.client.set_leverage(
+                    await self.client.set_leverage(
                         leverage,
                         symbol,
-                        params={"mgnMode": self.order_info.margin_mode},
+                        params={"mgnMode": order_info.margin_mode},
                     )
             except Exception as e:
                 pass
 
-    def market_entry(
+    async def market_entry(
         self,
         order_info: MarketOrder,
     ):
@@ -264,23 +282,24 @@ class Okx:
             order_info.unified_symbol
         )  # self.parse_symbol(order_info.base, order_info.quote)
 
-        entry_amount = self.get_amount(order_info)
+        entry_amount = await self.get_amount(order_info)
         if entry_amount == 0:
             raise error.MinAmountError()
 
         params = {}
         if order_info.leverage is None:
-            self.set_leverage(1, symbol)
+            await self.set_leverage(1, symbol, order_info)
         else:
-            self.set_leverage(order_info.leverage, symbol)
+            await self.set_leverage(order_info.leverage, symbol, order_info)
         if order_info.margin_mode is None:
             params |= {"tdMode": "isolated"}
         else:
             params |= {"tdMode": order_info.margin_mode}
 
-        if self.position_mode == "one-way":
+        position_mode = self.position_mode
+        if position_mode == "one-way":
             params |= {}
-        elif self.position_mode == "hedge":
+        elif position_mode == "hedge":
             if order_info.is_futures and order_info.side == "buy":
                 if order_info.is_entry:
                     pos_side = "long"
@@ -294,7 +313,7 @@ class Okx:
             params |= {"posSide": pos_side}
 
         try:
-            return retry(
+            return await retry(
                 self.client.create_order,
                 symbol,
                 order_info.type.lower(),
@@ -306,29 +325,31 @@ class Okx:
                 max_attempts=5,
                 delay=0.1,
                 instance=self,
+                position_mode=position_mode,
             )
         except Exception as e:
-            raise error.OrderError(e, self.order_info)
+            raise error.OrderError(e, order_info)
 
-    def market_close(
+    async def market_close(
         self,
         order_info: MarketOrder,
     ):
         from exchange.pexchange import retry
 
-        symbol = self.order_info.unified_symbol
-        close_amount = self.get_amount(order_info)
+        symbol = order_info.unified_symbol
+        close_amount = await self.get_amount(order_info)
 
-        if self.position_mode == "one-way":
+        position_mode = self.position_mode
+        if position_mode == "one-way":
             if (
-                self.order_info.margin_mode is None
-                or self.order_info.margin_mode == "isolated"
+                order_info.margin_mode is None
+                or order_info.margin_mode == "isolated"
             ):
                 params = {"reduceOnly": True, "tdMode": "isolated"}
-            elif self.order_info.margin_mode == "cross":
+            elif order_info.margin_mode == "cross":
                 params = {"reduceOnly": True, "tdMode": "cross"}
 
-        elif self.position_mode == "hedge":
+        elif position_mode == "hedge":
             if order_info.is_futures and order_info.side == "buy":
                 if order_info.is_entry:
                     pos_side = "long"
@@ -340,15 +361,15 @@ class Okx:
                 elif order_info.is_close:
                     pos_side = "long"
             if (
-                self.order_info.margin_mode is None
-                or self.order_info.margin_mode == "isolated"
+                order_info.margin_mode is None
+                or order_info.margin_mode == "isolated"
             ):
                 params = {"posSide": pos_side, "tdMode": "isolated"}
-            elif self.order_info.margin_mode == "cross":
+            elif order_info.margin_mode == "cross":
                 params = {"posSide": pos_side, "tdMode": "cross"}
 
         try:
-            return retry(
+            return await retry(
                 self.client.create_order,
                 symbol,
                 order_info.type.lower(),
@@ -360,6 +381,7 @@ class Okx:
                 max_attempts=5,
                 delay=0.1,
                 instance=self,
+                position_mode=position_mode,
             )
         except Exception as e:
-            raise error.OrderError(e, self.order_info)
+            raise error.OrderError(e, order_info)
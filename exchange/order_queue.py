@@ -0,0 +1,309 @@
+import asyncio
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Awaitable, Callable
+import orjson
+from loguru import logger
+from exchange import metrics
+from exchange.database import parent_directory
+from exchange.model import MarketOrder, to_request_values
+from exchange.timing import OrderTrace, start_trace
+from exchange.utility import settings, log_order_error_message
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+# 실행 중 종료된 주문에 남기는 에러
+INTERRUPTED_ERROR = "실행 중 서버가 종료된 주문입니다. 거래소에서 체결 여부를 확인하세요"
+
+
+def load_order(payload: str) -> MarketOrder:
+    """저장된 주문을 접수할 때와 같은 검증을 거쳐 다시 만듭니다"""
+    values = to_request_values(orjson.loads(payload))
+    # 비밀번호는 접수 시 검증했고 저장하지 않았으므로 현재 설정 값으로 채움
+    return MarketOrder(**values, password=settings.PASSWORD)
+
+
+def get_queue_database_url() -> str:
+    return settings.QUEUE_DATABASE_URL or f"{parent_directory}/queue.db"
+
+
+def get_order_key(order_info: MarketOrder) -> str:
+    """실행 순서를 지켜야 하는 주문 묶음 (거래소/계좌/종목)"""
+    return f"{order_info.exchange}:{order_info.kis_number}:{order_info.account}:{order_info.base}"
+
+
+class OrderQueue:
+    """
+    웹훅 주문 접수 큐
+    /order 는 검증된 주문을 SQLite(WAL) 에 기록한 즉시 응답하고,
+    워커들이 순서대로 꺼내 실행합니다. 실행 전이던 주문은 재시작 시 다시 실행하고,
+    실행 중이던 주문은 중복 주문이 되지 않도록 실패로 기록해 알립니다.
+    같은 거래소/계좌/종목의 주문은 항상 같은 워커가 처리해서 순서가 유지됩니다.
+    """
+
+    def __init__(self, database_url: str | None = None):
+        """database_url: 생략하면 QUEUE_DATABASE_URL 또는 queue.db (start/첫 사용 때 연결)"""
+        self.database_url = database_url
+        self.con: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        self._queues: list[asyncio.Queue] = []
+        self._workers: list[asyncio.Task] = []
+        # 주문을 실행 중인 워커
+        self._busy: set[asyncio.Task] = set()
+        self._stopping = False
+        self._handler: Callable[[MarketOrder], Awaitable] | None = None
+        # 지금 실행 중인 주문 수
+        self.running = 0
+
+    def connect(self) -> sqlite3.Connection:
+        with self._lock:
+            if self.con is not None:
+                return self.con
+            self.database_url = self.database_url or get_queue_database_url()
+            con = sqlite3.connect(self.database_url, check_same_thread=False)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=FULL")
+            con.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                );
+                """
+            )
+            con.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, id)")
+            columns = [row[1] for row in con.execute("PRAGMA table_info(jobs)")]
+            if "trace" not in columns:
+                # 단계별 실행 시간 (JSON)
+                con.execute("ALTER TABLE jobs ADD COLUMN trace TEXT")
+            con.commit()
+            self.con = con
+            return con
+
+    def _execute(self, query: str, value: tuple) -> int:
+        con = self.connect()
+        with self._lock:
+            cursor = con.execute(query, value)
+            con.commit()
+            return cursor.lastrowid
+
+    def _fetch_all(self, query: str, value: tuple) -> list:
+        con = self.connect()
+        with self._lock:
+            return con.execute(query, value).fetchall()
+
+    def _set_status(
+        self, job_id: int, status: str, error: str | None = None, trace: str | None = None
+    ):
+        self._execute(
+            "UPDATE jobs SET status = ?, error = ?, trace = COALESCE(?, trace), updated_at = ? WHERE id = ?",
+            (status, error, trace, time.time(), job_id),
+        )
+
+    def get_partition(self, order_info: MarketOrder) -> int:
+        return zlib.crc32(get_order_key(order_info).encode()) % len(self._queues)
+
+    def get_depth(self) -> int:
+        return sum(queue.qsize() for queue in self._queues)
+
+    def _insert(self, order_info: MarketOrder, status: str, received_at: float) -> int:
+        # 비밀번호는 접수 시 이미 검증했으므로 저장하지 않습니다
+        payload = order_info.json(exclude={"password"})
+        return self._execute(
+            "INSERT INTO jobs (payload, status, created_at, updated_at) VALUES (?, ?, ?, ?)",
+            (payload, status, received_at, time.time()),
+        )
+
+    async def put(
+        self,
+        order_info: MarketOrder,
+        received_at: float | None = None,
+        trace: OrderTrace | None = None,
+    ) -> int:
+        """
+        received_at: 웹훅을 받은 시각 (time.time), 체결 지연 시간 측정에 사용
+        trace: 접수 단계까지 기록한 시간 기록, 실행 단계를 이어서 기록합니다
+        """
+        received_at = received_at or time.time()
+        job_id = await asyncio.to_thread(self._insert, order_info, PENDING, received_at)
+        self._dispatch(job_id, order_info, received_at, trace)
+        return job_id
+
+    async def run(self, order_info: MarketOrder, received_at: float | None = None):
+        """워커를 거치지 않고 바로 실행하고 결과를 돌려줍니다 (기록은 동일하게 남김)"""
+        received_at = received_at or time.time()
+        job_id = await asyncio.to_thread(self._insert, order_info, RUNNING, received_at)
+        return job_id, await self._run_job(job_id, order_info, received_at)
+
+    async def _run_job(
+        self,
+        job_id: int,
+        order_info: MarketOrder,
+        received_at: float,
+        trace: OrderTrace | None = None,
+    ):
+        if trace is not None and trace.stages:
+            # 접수 응답 후 워커가 꺼낼 때까지 기다린 시간
+            trace.add("queue", trace.stages[-1][2])
+        trace = start_trace(trace)
+        # 주문 처리 중 남기는 로그에 주문 정보가 함께 기록됨
+        with logger.contextualize(
+            order_id=job_id,
+            exchange=order_info.exchange,
+            symbol=f"{order_info.base}/{order_info.quote}",
+        ):
+            started_at = time.monotonic()
+            labels = metrics.get_order_labels(order_info)
+            self.running += 1
+            try:
+                result = await self._handler(order_info)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                metrics.order_results.inc(*labels, "error")
+                logger.error(f"주문 실행 에러 (job {job_id}): {str(e)}")
+                await asyncio.to_thread(
+                    self._set_status, job_id, FAILED, str(e), trace.to_json()
+                )
+                raise
+            finally:
+                self.running -= 1
+            metrics.order_results.inc(*labels, "success")
+            metrics.order_fill_seconds.observe(time.time() - received_at, *labels)
+            logger.bind(
+                elapsed_ms=round((time.monotonic() - started_at) * 1000, 1),
+                stages=trace.to_list(),
+            ).info(f"주문 실행 완료 (job {job_id})")
+            await asyncio.to_thread(self._set_status, job_id, DONE, None, trace.to_json())
+            return result
+
+    def _dispatch(
+        self,
+        job_id: int,
+        order_info: MarketOrder,
+        received_at: float,
+        trace: OrderTrace | None = None,
+    ):
+        if not self._queues or self._stopping:
+            # 종료 중에 접수한 주문은 pending 으로 남아 다음 시작 때 실행
+            return
+        self._queues[self.get_partition(order_info)].put_nowait(
+            (job_id, order_info, received_at, trace)
+        )
+
+    async def start(self, handler: Callable[[MarketOrder], Awaitable], workers: int | None = None):
+        if self._workers:
+            return
+        await asyncio.to_thread(self.connect)
+        self._handler = handler
+        self._stopping = False
+        workers = workers or settings.ORDER_WORKERS
+        self._queues = [asyncio.Queue() for _ in range(workers)]
+        self._workers = [
+            asyncio.create_task(self._work(queue)) for queue in self._queues
+        ]
+        await self.replay()
+
+    async def replay(self):
+        # 끝난 주문 기록은 일주일만 보관
+        await asyncio.to_thread(
+            self._execute,
+            "DELETE FROM jobs WHERE status IN (?, ?) AND updated_at < ?",
+            (DONE, FAILED, time.time() - 7 * 24 * 60 * 60),
+        )
+        rows = await asyncio.to_thread(
+            self._fetch_all,
+            "SELECT id, payload, status, created_at FROM jobs WHERE status IN (?, ?) ORDER BY id",
+            (PENDING, RUNNING),
+        )
+        replayed = 0
+        for job_id, payload, status, received_at in rows:
+            try:
+                order_info = load_order(payload)
+            except Exception as e:
+                logger.error(f"저장된 주문을 읽을 수 없습니다 (job {job_id}): {str(e)}")
+                await asyncio.to_thread(self._set_status, job_id, FAILED, str(e))
+                continue
+            if status == RUNNING:
+                # 이미 거래소에 주문이 나갔을 수 있으므로 다시 실행하지 않음 (중복 주문 방지)
+                await asyncio.to_thread(
+                    self._set_status, job_id, FAILED, INTERRUPTED_ERROR
+                )
+                await asyncio.to_thread(
+                    log_order_error_message,
+                    f"{INTERRUPTED_ERROR} (job {job_id})",
+                    order_info,
+                )
+                continue
+            self._dispatch(job_id, order_info, received_at)
+            replayed += 1
+        if replayed:
+            logger.info(f"미처리 주문 {replayed}건을 다시 실행합니다")
+
+    async def _work(self, queue: asyncio.Queue):
+        worker = asyncio.current_task()
+        while not self._stopping:
+            job_id, order_info, received_at, trace = await queue.get()
+            self._busy.add(worker)
+            try:
+                await asyncio.to_thread(self._set_status, job_id, RUNNING)
+                await self._run_job(job_id, order_info, received_at, trace)
+            except Exception:
+                pass  # _run_job 에서 기록
+            finally:
+                self._busy.discard(worker)
+                queue.task_done()
+
+    async def stop(self, timeout: float | None = None):
+        """
+        새 주문은 더 꺼내지 않고, 실행 중인 주문은 timeout 초까지 기다린 뒤 워커를 멈춥니다.
+        꺼내지 않은 주문은 pending 으로 남아 다음 시작 때 실행됩니다.
+        """
+        if timeout is None:
+            timeout = settings.ORDER_STOP_TIMEOUT
+        self._stopping = True
+        busy = [worker for worker in self._workers if worker in self._busy]
+        for worker in self._workers:
+            if worker not in self._busy:
+                worker.cancel()
+        if busy:
+            logger.info(f"실행 중인 주문 {len(busy)}건이 끝나길 기다립니다")
+            _, pending = await asyncio.wait(busy, timeout=timeout)
+            if pending:
+                logger.error(f"종료 대기 시간을 넘겨 실행 중인 주문 {len(pending)}건을 중단합니다")
+            for worker in pending:
+                worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queues = []
+        self._busy.clear()
+
+    def close(self):
+        with self._lock:
+            if self.con is not None:
+                self.con.close()
+                self.con = None
+
+
+order_queue = OrderQueue()
+
+metrics.Gauge(
+    "poabot_order_queue_depth",
+    "실행을 기다리는 주문 수",
+    collect=lambda: {(): order_queue.get_depth()},
+)
+metrics.Gauge(
+    "poabot_orders_in_flight",
+    "실행 중인 주문 수",
+    collect=lambda: {(): order_queue.running},
+)
@@ -1,19 +1,23 @@
+import re
 import ccxt
 import ccxt.async_support as ccxt_async
+import ccxt.pro as ccxt_pro
 import httpx
 from fastapi import HTTPException
-from pydantic import BaseModel
 from .binance import Binance
 from .upbit import Upbit
 from .bybit import Bybit
 from .bitget import Bitget
 from .okx import Okx
 from .stock import KoreaInvestment
-from exchange.utility import settings, log_message
+from .stock.token import token_manager
+from .registry import ClientKey, ExchangeRegistry
+from .retry import retry, start_order_budget
+from exchange.utility import settings, settings_store, log_message
 from .database import db
 from typing import Literal
 import pendulum
-import time
+import asyncio
 from devtools import debug
 from loguru import logger
 
@@ -21,86 +25,152 @@ from loguru import logger
 from .model import CRYPTO_EXCHANGES, STOCK_EXCHANGES, MarketOrder
 
 
-class Exchange(BaseModel):
-    UPBIT: Upbit | None = None
-    BINANCE: Binance | None = None
-    BYBIT: Bybit | None = None
-    BITGET: Bitget | None = None
-    OKX: Okx | None = None
-    KIS1: KoreaInvestment | None = None
-    KIS2: KoreaInvestment | None = None
-    KIS3: KoreaInvestment | None = None
-    KIS4: KoreaInvestment | None = None
-    KIS5: KoreaInvestment | None = None
-    KIS6: KoreaInvestment | None = None
-    KIS7: KoreaInvestment | None = None
-    KIS8: KoreaInvestment | None = None
-    KIS9: KoreaInvestment | None = None
-    KIS10: KoreaInvestment | None = None
+KIS_ACCOUNTS = tuple(f"KIS{number}" for number in range(1, 11))
 
-    class Config:
-        arbitrary_types_allowed = True
 
+def get_market_type(exchange_name: str, order_info: MarketOrder = None) -> str:
+    if order_info is None or not order_info.is_futures:
+        return "spot"
+    # OKX 는 코인마진 무기한도 swap 마켓
+    if order_info.is_coinm and exchange_name not in ("OKX",):
+        return "delivery"
+    return "swap"
 
-payload = {}
 
-
-def get_exchange(exchange_name: str, kis_number=None):
-    global payload
+def get_client_key(
+    exchange_name: str, kis_number=None, market_type: str = "spot", account=None
+) -> ClientKey:
+    exchange_name = exchange_name.upper()
     if exchange_name in CRYPTO_EXCHANGES:
-        KEY, SECRET, PASSPHRASE = check_key(exchange_name)
-        if not payload.get(exchange_name):
-            if exchange_name in ("BITGET", "OKX"):
-                payload |= {
-                    exchange_name: globals()[exchange_name.title()](
-                        KEY, SECRET, PASSPHRASE
-                    )
-                }
-            else:
-                if not payload.get(exchange_name):
-                    payload |= {
-                        exchange_name: globals()[exchange_name.title()](KEY, SECRET)
-                    }
-
-        return Exchange(**payload)
-
-    elif exchange_name in ("KRX", "NASDAQ", "NYSE", "AMEX"):
-        _kis = f"KIS{kis_number}"
-        key = check_key(_kis)
-        KEY, SECRET, ACCOUNT_NUMBER, ACCOUNT_CODE = key
-        if not payload.get(_kis):
-            payload |= {
-                _kis: globals()["KoreaInvestment"](
-                    KEY, SECRET, ACCOUNT_NUMBER, ACCOUNT_CODE, kis_number
-                )
-            }
-        exchange = Exchange(**payload)
-        kis: KoreaInvestment = exchange.dict()[_kis]
-        kis.auth()
-        return kis
-
-
-def get_bot(
+        if exchange_name == "UPBIT":
+            market_type = "spot"
+        return ClientKey(exchange_name, account or "default", market_type)
+    elif exchange_name in STOCK_EXCHANGES:
+        return ClientKey("KIS", str(kis_number))
+    raise ValueError(f"{exchange_name}는 지원하지 않는 거래소입니다")
+
+
+def get_settings_prefix(key: ClientKey):
+    if key.exchange == "KIS":
+        return f"KIS{key.account}"
+    if key.account != "default":
+        return "CRYPTO_ACCOUNTS"
+    return key.exchange
+
+
+def apply_base_url(client, base_url: str):
+    """ccxt REST 주소의 호스트를 base_url 로 바꾸고 웹소켓 스트림은 끕니다 (REST 만 사용)"""
+    for name, url in client.urls["api"].items():
+        if isinstance(url, str) and not name.startswith("ws"):
+            client.urls["api"][name] = re.sub(r"^https?://[^/]+", base_url, url)
+    for has in ("watchTicker", "watchBalance", "watchPositions"):
+        client.has[has] = False
+    client.base_url_override = base_url
+
+
+async def create_client(key: ClientKey):
+    if key.exchange in CRYPTO_EXCHANGES:
+        KEY, SECRET, PASSPHRASE = check_key(key.exchange, key.account)
+        if key.exchange in ("BITGET", "OKX"):
+            bot = globals()[key.exchange.title()](
+                KEY, SECRET, PASSPHRASE, market_type=key.market_type
+            )
+        else:
+            bot = globals()[key.exchange.title()](
+                KEY, SECRET, market_type=key.market_type
+            )
+        base_url = settings_store.current.EXCHANGE_BASE_URLS.get(key.exchange)
+        if base_url:
+            apply_base_url(bot.client, base_url.rstrip("/"))
+        try:
+            await bot.load_markets()
+        except Exception:
+            await bot.close()
+            raise
+        return bot
+    elif key.exchange == "KIS":
+        KEY, SECRET, ACCOUNT_NUMBER, ACCOUNT_CODE = check_key(f"KIS{key.account}")
+        # 생성 시 토큰 확인/발급(DB, HTTP)이 이벤트 루프를 막지 않도록 스레드에서 생성
+        bot = await asyncio.to_thread(
+            KoreaInvestment, KEY, SECRET, ACCOUNT_NUMBER, ACCOUNT_CODE, int(key.account)
+        )
+        token_manager.start(bot)
+        return bot
+
+
+registry = ExchangeRegistry(create_client)
+
+
+def invalidate_changed(old, new):
+    # .env 에서 키가 바뀐 거래소는 다음 주문 때 새 키로 다시 생성
+    old_dict, new_dict = old.dict(), new.dict()
+    changed = [key for key in new_dict if old_dict.get(key) != new_dict.get(key)]
+    for key in registry.keys():
+        prefix = get_settings_prefix(key)
+        if any(name == prefix or name.startswith(f"{prefix}_") for name in changed):
+            registry.invalidate(key)
+
+
+settings_store.subscribe(invalidate_changed)
+
+
+def get_configured_keys() -> list[ClientKey]:
+    current = settings_store.current
+    keys = []
+    for exchange_name in CRYPTO_EXCHANGES:
+        if exchange_name == "BITGET" and current.BITGET_DEMO_MODE == "true":
+            configured = current.BITGET_DEMO_KEY
+        else:
+            configured = getattr(current, f"{exchange_name}_KEY", None)
+        if configured:
+            keys.append(ClientKey(exchange_name, market_type="spot"))
+            if exchange_name != "UPBIT":
+                keys.append(ClientKey(exchange_name, market_type="swap"))
+        for account in current.CRYPTO_ACCOUNTS.get(exchange_name, {}):
+            keys.append(ClientKey(exchange_name, account, "spot"))
+            if exchange_name != "UPBIT":
+                keys.append(ClientKey(exchange_name, account, "swap"))
+    for account in KIS_ACCOUNTS:
+        if getattr(current, f"{account}_KEY", None):
+            keys.append(ClientKey("KIS", account.removeprefix("KIS")))
+    return keys
+
+
+async def warm_exchanges():
+    await registry.warm(get_configured_keys())
+
+
+async def get_bot(
     exchange_name: Literal[
         "BINANCE", "UPBIT", "BYBIT", "BITGET", "KRX", "NASDAQ", "NYSE", "AMEX", "OKX"
     ],
     kis_number=None,
+    market_type: str = "spot",
+    account: str | None = None,
 ) -> Binance | Upbit | Bybit | Bitget | KoreaInvestment | Okx:
-    exchange_name = exchange_name.upper()
-    if exchange_name in CRYPTO_EXCHANGES:
-        return get_exchange(exchange_name, kis_number).dict()[exchange_name]
-    elif exchange_name in STOCK_EXCHANGES:
-        return get_exchange(exchange_name, kis_number)
+    key = get_client_key(exchange_name, kis_number, market_type, account)
+    return await registry.get(key)
 
 
-def check_key(exchange_name):
-    settings_dict = settings.dict()
-    if exchange_name in CRYPTO_EXCHANGES:
+async def close_exchanges():
+    await registry.close()
+
+
+def check_key(exchange_name, account: str = "default"):
+    current = settings_store.current
+    if exchange_name in CRYPTO_EXCHANGES and account != "default":
+        credentials = current.CRYPTO_ACCOUNTS.get(exchange_name, {}).get(account)
+        if not credentials or not credentials.get("KEY") or not credentials.get("SECRET"):
+            msg = f"{exchange_name} {account} 계좌 키가 없습니다"
+            log_message(msg)
+            raise HTTPException(status_code=404, detail=msg)
+        return credentials["KEY"], credentials["SECRET"], credentials.get("PASSPHRASE")
+    elif exchange_name in CRYPTO_EXCHANGES:
         # 비트겟 데모 모드 체크
-        if exchange_name == "BITGET" and settings_dict.get("BITGET_DEMO_MODE") == "true":
-            key = settings_dict.get("BITGET_DEMO_KEY")
-            secret = settings_dict.get("BITGET_DEMO_SECRET")
-            passphrase = settings_dict.get("BITGET_DEMO_PASSPHRASE")
+        if exchange_name == "BITGET" and current.BITGET_DEMO_MODE == "true":
+            key = current.BITGET_DEMO_KEY
+            secret = current.BITGET_DEMO_SECRET
+            passphrase = current.BITGET_DEMO_PASSPHRASE
             
             if not key:
                 msg = "BITGET_DEMO_KEY가 없습니다"
@@ -115,9 +185,9 @@ def check_key(exchange_name):
             return key, secret, passphrase
         
         # 기존 라이브 모드
-        key = settings_dict.get(exchange_name + "_KEY")
-        secret = settings_dict.get(exchange_name + "_SECRET")
-        passphrase = settings_dict.get(exchange_name + "_PASSPHRASE")
+        key = getattr(current, exchange_name + "_KEY", None)
+        secret = getattr(current, exchange_name + "_SECRET", None)
+        passphrase = getattr(current, exchange_name + "_PASSPHRASE", None)
         if not key:
             msg = f"{exchange_name}_KEY가 없습니다"
             log_message(msg)
@@ -127,11 +197,11 @@ def check_key(exchange_name):
             log_message(msg)
             raise HTTPException(status_code=404, detail=msg)
         return key, secret, passphrase
-    elif exchange_name in ("KIS1", "KIS2", "KIS3", "KIS4", "KIS5", "KIS6", "KIS7", "KIS8", "KIS9", "KIS10"):
-        key = settings_dict.get(f"{exchange_name}_KEY")
-        secret = settings_dict.get(f"{exchange_name}_SECRET")
-        account_number = settings_dict.get(f"{exchange_name}_ACCOUNT_NUMBER")
-        account_code = settings_dict.get(f"{exchange_name}_ACCOUNT_CODE")
+    elif exchange_name in KIS_ACCOUNTS:
+        key = getattr(current, f"{exchange_name}_KEY", None)
+        secret = getattr(current, f"{exchange_name}_SECRET", None)
+        account_number = getattr(current, f"{exchange_name}_ACCOUNT_NUMBER", None)
+        account_code = getattr(current, f"{exchange_name}_ACCOUNT_CODE", None)
         if key and secret and account_number and account_code:
             return key, secret, account_number, account_code
         else:
@@ -143,219 +213,3 @@ def get_today_timestamp(timezone="Asia/Seoul"):
     today_start = int(today.start_of("day").timestamp() * 1000)
     today_end = int(today.end_of("day").timestamp() * 1000)
     return today_start, today_end
-
-
-def retry(
-    func,
-    *args,
-    order_info: MarketOrder,
-    max_attempts=5,
-    delay=1,
-    instance: Binance | Bybit | Bitget | Upbit | Okx = None,
-):
-    attempts = 0
-
-    while attempts < max_attempts:
-        try:
-            result = func(*args)  # 함수 실행
-            return result
-        except Exception as e:
-            logger.error(f"에러 발생: {str(e)}")
-            attempts += 1
-            if func.__name__ == "create_order" or func.__name__ == "set_leverage":
-                if order_info.exchange in ("BINANCE"):
-                    if "Internal error" in str(e):
-                        time.sleep(delay)  # 재시도 간격 설정
-                    elif "Server is currently overloaded" in str(e):
-                        time.sleep(delay)
-                    elif "position side does not match" in str(e):
-                        if instance.position_mode == "one-way":
-                            instance.position_mode = "hedge"
-                            if order_info.side == "buy":
-                                if order_info.is_entry:
-                                    positionSide = "LONG"
-                                elif order_info.is_close:
-                                    positionSide = "SHORT"
-                                    
-                            elif order_info.side == "sell":
-                                if order_info.is_entry:
-                                    positionSide = "SHORT"
-                                elif order_info.is_close:
-                                    positionSide = "LONG"
-                                    
-    
-                            params = {"positionSide": positionSide}
-                        elif instance.position_mode == "hedge":
-                            instance.position_mode = "one-way"
-                            if order_info.is_entry:
-                                params = {}
-                            elif order_info.is_close:
-                                params = {"reduceOnly": True}
-
-                        args = tuple(
-                            params if i == 5 else arg for i, arg in enumerate(args)
-                        )
-
-                    else:
-                        attempts = max_attempts
-                elif order_info.exchange in ("BYBIT"):
-                    if "position idx not match position mode" in str(e):
-                        if instance.position_mode == "one-way":
-                            instance.position_mode = "hedge"
-                            position_idx = None
-                            if order_info.side == "buy":
-                                if order_info.is_entry:
-                                    position_idx = 1
-                                    params = {"position_idx": position_idx}
-                                elif order_info.is_close:
-                                    position_idx = 2
-                                    params = {
-                                        "reduceOnly": True,
-                                        "position_idx": position_idx,
-                                    }
-                            elif order_info.side == "sell":
-                                if order_info.is_entry:
-                                    position_idx = 2
-                                    params = {"position_idx": position_idx}
-                                elif order_info.is_close:
-                                    position_idx = 1
-                                    params = {
-                                        "reduceOnly": True,
-                                        "position_idx": position_idx,
-                                    }
-                        elif instance.position_mode == "hedge":
-                            instance.position_mode = "one-way"
-                            if order_info.is_entry:
-                                params = {"position_idx": 0}
-                            elif order_info.is_close:
-                                params = {"reduceOnly": True, "position_idx": 0}
-
-                        args = tuple(
-                            params if i == 5 else arg for i, arg in enumerate(args)
-                        )
-                    elif "check your server timestamp" in str(e):
-                        bybit: Bybit = instance
-                        bybit.load_time_difference()
-                    else:
-                        attempts = max_attempts
-
-                elif order_info.exchange in ("OKX"):
-                    if "posSide error" in str(e):
-                        params = {}
-
-                        if instance.position_mode == "one-way":
-                            instance.position_mode = "hedge"
-                            pos_side = "net"
-                            if order_info.is_futures and order_info.side == "buy":
-                                if order_info.is_entry:
-                                    pos_side = "long"
-                                elif order_info.is_close:
-                                    pos_side = "short"
-                            elif order_info.is_futures and order_info.side == "sell":
-                                if order_info.is_entry:
-                                    pos_side = "short"
-                                elif order_info.is_close:
-                                    pos_side = "long"
-
-                            if (
-                                order_info.margin_mode is None
-                                or order_info.margin_mode == "isolated"
-                            ):
-                                params |= {"posSide": pos_side, "tdMode": "isolated"}
-                            elif order_info.margin_mode == "cross":
-                                params |= {"posSide": pos_side, "tdMode": "cross"}
-                        elif instance.position_mode == "hedge":
-                            instance.position_mode = "one-way"
-                            if order_info.is_entry:
-                                params |= {}
-                            elif order_info.is_close:
-                                params |= {"reduceOnly": True}
-
-                        if order_info.is_entry:
-                            if order_info.leverage is None:
-                                instance.set_leverage(1, order_info.unified_symbol)
-                            else:
-                                instance.set_leverage(
-                                    order_info.leverage, order_info.unified_symbol
-                                )
-                            if order_info.margin_mode is None:
-                                params |= {"tdMode": "isolated"}
-                            else:
-                                params |= {"tdMode": order_info.margin_mode}
-
-                        args = tuple(
-                            params if i == 5 else arg for i, arg in enumerate(args)
-                        )
-                    else:
-                        attempts = max_attempts
-                elif order_info.exchange in ("BITGET"):
-                    if "unilateral position" in str(e) or "hold side is null" in str(e) or "No position to close" in str(e):
-                        final_side = order_info.side
-                        margin_mode = args[-1].get("marginMode") or "isolated"
-                        if instance.position_mode == "hedge":
-                            instance.position_mode = "one-way"
-                            new_params = {"oneWayMode": True, "marginMode": margin_mode}
-                            args = tuple(
-                                new_params if i == 5 else arg
-                                for i, arg in enumerate(args)
-                            )
-                        elif instance.position_mode == "one-way":
-                            instance.position_mode = "hedge"
-
-                            if order_info.is_entry:
-                                if order_info.is_futures:
-                                    if order_info.is_buy:
-                                        trade_side = "Open" 
-                                    else:
-                                        trade_side = "open"
-                                    new_params = { "tradeSide": trade_side, "marginMode": margin_mode}
-                            elif order_info.is_close:
-                                if order_info.side == "sell":
-                                    final_side = "buy"
-                                elif order_info.side == "buy":
-                                    final_side = "sell"
-                                new_params = {"reduceOnly": True, "tradeSide":"close"}
-                            
-                            args = tuple(
-                                new_params if i == 5 else arg
-                                for i, arg in enumerate(args)
-                            )
-
-                            args = tuple(
-                                final_side if i == 2 else arg
-                                for i, arg in enumerate(args)
-                            )
-
-
-                    elif "two-way positions" in str(e):
-                        if instance.position_mode == "hedge":
-                            instance.position_mode = "one-way"
-                            new_side = order_info.side + "_single"
-                            new_params = {"reduceOnly": True, "side": new_side}
-                            args = tuple(
-                                new_side if i == 2 else arg
-                                for i, arg in enumerate(args)
-                            )
-                            args = tuple(
-                                new_params if i == 5 else arg
-                                for i, arg in enumerate(args)
-                            )
-                        elif instance.position_mode == "one-way":
-                            instance.position_mode = "hedge"
-                            if order_info.is_entry:
-                                new_params = {}
-                            elif order_info.is_close:
-                                new_params = {"reduceOnly": True}
-                            args = tuple(
-                                new_params if i == 5 else arg
-                                for i, arg in enumerate(args)
-                            )
-                    else:
-                        attempts = max_attempts
-                else:
-                    attempts = max_attempts
-
-            if attempts == max_attempts:
-                raise
-            else:
-                logger.error(f"재시도 {max_attempts - attempts}번 남았음")
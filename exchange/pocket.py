@@ -31,7 +31,7 @@ def reauth():
 def create(collection, data):
     try:
         reauth()
-        pb.collection(collection).create(data)
+        return pb.collection(collection).create(data)
     except:
         raise Exception("DB create error")
 
@@ -0,0 +1,95 @@
+import asyncio
+from typing import Awaitable, Callable, NamedTuple
+from loguru import logger
+
+
+class ClientKey(NamedTuple):
+    exchange: str  # BINANCE, UPBIT, ..., KIS
+    account: str = "default"  # KIS 는 계좌 번호
+    market_type: str = "default"
+
+
+class ExchangeRegistry:
+    """
+    (거래소, 계좌, 마켓 타입) 별 거래소 클라이언트 저장소
+    조회는 dict 한 번, 생성은 키마다 한 번만 일어나도록 락으로 보호합니다.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[ClientKey], Awaitable[object]],
+        close_grace: float = 30.0,
+    ):
+        self._factory = factory
+        self._clients: dict[ClientKey, object] = {}
+        self._locks: dict[ClientKey, asyncio.Lock] = {}
+        self._stale: set[ClientKey] = set()
+        self.close_grace = close_grace
+
+    def __contains__(self, key: ClientKey):
+        return key in self._clients
+
+    def keys(self):
+        return list(self._clients)
+
+    def lookup(self, key: ClientKey):
+        return self._clients.get(key)
+
+    async def get(self, key: ClientKey):
+        client = self._clients.get(key)
+        if client is not None and key not in self._stale:
+            return client
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            if key in self._stale:
+                self._stale.discard(key)
+                self._retire(self._clients.pop(key, None))
+            client = self._clients.get(key)
+            if client is None:
+                client = await self._factory(key)
+                self._clients[key] = client
+            return client
+
+    async def warm(self, keys: list[ClientKey]):
+        results = await asyncio.gather(
+            *(self.get(key) for key in keys), return_exceptions=True
+        )
+        for key, result in zip(keys, results):
+            if isinstance(result, Exception):
+                logger.error(f"{key.exchange}({key.account}) 클라이언트 준비 실패: {result}")
+
+    async def rebuild(self, key: ClientKey):
+        self.invalidate(key)
+        return await self.get(key)
+
+    def invalidate(self, key: ClientKey):
+        # 다른 스레드(설정 워처)에서도 호출되므로 표시만 하고 교체는 다음 조회 때
+        if key in self._clients:
+            self._stale.add(key)
+
+    def _retire(self, client):
+        if client is None:
+            return
+        # 진행 중인 주문이 끝날 시간을 주고 닫습니다
+        asyncio.get_running_loop().call_later(
+            self.close_grace, lambda: asyncio.ensure_future(close_client(client))
+        )
+
+    async def close(self, key: ClientKey | None = None):
+        keys = [key] if key is not None else list(self._clients)
+        for _key in keys:
+            self._stale.discard(_key)
+            client = self._clients.pop(_key, None)
+            if client is not None:
+                await close_client(client)
+
+
+async def close_client(client):
+    try:
+        if hasattr(client, "close"):
+            await client.close()
+        elif hasattr(client, "close_session"):
+            client.close_session()
+    except Exception as e:
+        logger.error(f"클라이언트 종료 에러: {str(e)}")
@@ -0,0 +1,319 @@
+import asyncio
+import random
+import time
+from collections import Counter
+from contextlib import nullcontext
+from contextvars import ContextVar
+from dataclasses import dataclass
+from enum import Enum
+from typing import Callable
+import ccxt
+import orjson
+from loguru import logger
+from exchange import metrics
+from exchange.model import MarketOrder
+from exchange.timing import trace_stage
+from exchange.utility import settings
+
+
+class Action(str, Enum):
+    RETRY = "retry"  # 백오프 후 그대로 재시도
+    FLIP_POSITION_MODE = "flip_position_mode"  # 포지션 모드를 바꿔서 즉시 재시도
+    RESYNC_CLOCK = "resync_clock"  # 서버 시간을 다시 맞추고 즉시 재시도
+    ABORT = "abort"
+
+
+@dataclass(frozen=True)
+class Rule:
+    action: Action
+    exceptions: tuple[type[Exception], ...] = ()
+    codes: tuple[str, ...] = ()
+    messages: tuple[str, ...] = ()
+    handler: Callable | None = None
+
+    def match(self, e: Exception, code: str | None) -> bool:
+        if self.exceptions and isinstance(e, self.exceptions):
+            return True
+        if code is not None and code in self.codes:
+            return True
+        message = str(e)
+        return any(fragment in message for fragment in self.messages)
+
+
+# 재시도 횟수 (exchange, 에러 클래스) -> 횟수
+retry_counts: Counter = Counter()
+metrics.Counter(
+    "poabot_retry_total",
+    "거래소 에러로 재시도한 횟수",
+    ("exchange", "error"),
+    collect=lambda: retry_counts,
+)
+
+# 주문 하나에 허용하는 전체 재시도 시간 (time.monotonic 기준 마감 시각)
+order_deadline: ContextVar[float | None] = ContextVar("order_deadline", default=None)
+
+
+def start_order_budget(budget: float | None = None):
+    if budget is None:
+        budget = settings.ORDER_RETRY_BUDGET
+    order_deadline.set(time.monotonic() + budget)
+
+
+def get_error_code(e: Exception) -> str | None:
+    # ccxt 예외 메시지는 "<exchange id> <응답 본문>" 형식
+    parts = str(e).split(" ", 1)
+    if len(parts) != 2:
+        return None
+    try:
+        body = orjson.loads(parts[1])
+    except orjson.JSONDecodeError:
+        return None
+    if not isinstance(body, dict):
+        return None
+    data = body.get("data")
+    if isinstance(data, list) and data and isinstance(data[0], dict):
+        if data[0].get("sCode") not in (None, "0"):
+            return str(data[0]["sCode"])
+    for key in ("code", "retCode"):
+        if body.get(key) is not None:
+            return str(body[key])
+    return None
+
+
+def replace_arg(args: tuple, index: int, value) -> tuple:
+    return tuple(value if i == index else arg for i, arg in enumerate(args))
+
+
+def get_other_mode(position_mode: str) -> str:
+    return "one-way" if position_mode == "hedge" else "hedge"
+
+
+def flip_binance(instance, order_info: MarketOrder, args: tuple, position_mode: str) -> tuple:
+    if position_mode == "hedge":
+        if order_info.side == "buy":
+            if order_info.is_entry:
+                positionSide = "LONG"
+            elif order_info.is_close:
+                positionSide = "SHORT"
+        elif order_info.side == "sell":
+            if order_info.is_entry:
+                positionSide = "SHORT"
+            elif order_info.is_close:
+                positionSide = "LONG"
+        params = {"positionSide": positionSide}
+    elif position_mode == "one-way":
+        if order_info.is_entry:
+            params = {}
+        elif order_info.is_close:
+            params = {"reduceOnly": True}
+    return replace_arg(args, 5, params)
+
+
+def flip_bybit(instance, order_info: MarketOrder, args: tuple, position_mode: str) -> tuple:
+    if position_mode == "hedge":
+        if order_info.side == "buy":
+            if order_info.is_entry:
+                params = {"position_idx": 1}
+            elif order_info.is_close:
+                params = {"reduceOnly": True, "position_idx": 2}
+        elif order_info.side == "sell":
+            if order_info.is_entry:
+                params = {"position_idx": 2}
+            elif order_info.is_close:
+                params = {"reduceOnly": True, "position_idx": 1}
+    elif position_mode == "one-way":
+        if order_info.is_entry:
+            params = {"position_idx": 0}
+        elif order_info.is_close:
+            params = {"reduceOnly": True, "position_idx": 0}
+    return replace_arg(args, 5, params)
+
+
+async def flip_okx(instance, order_info: MarketOrder, args: tuple, position_mode: str) -> tuple:
+    params = {}
+    if position_mode == "hedge":
+        pos_side = "net"
+        if order_info.is_futures and order_info.side == "buy":
+            if order_info.is_entry:
+                pos_side = "long"
+            elif order_info.is_close:
+                pos_side = "short"
+        elif order_info.is_futures and order_info.side == "sell":
+            if order_info.is_entry:
+                pos_side = "short"
+            elif order_info.is_close:
+                pos_side = "long"
+
+        if order_info.margin_mode is None or order_info.margin_mode == "isolated":
+            params |= {"posSide": pos_side, "tdMode": "isolated"}
+        elif order_info.margin_mode == "cross":
+            params |= {"posSide": pos_side, "tdMode": "cross"}
+    elif position_mode == "one-way":
+        if order_info.is_close:
+            params |= {"reduceOnly": True}
+
+    if order_info.is_entry:
+        leverage = 1 if order_info.leverage is None else order_info.leverage
+        await instance.set_leverage(leverage, order_info.unified_symbol, order_info)
+        params |= {"tdMode": order_info.margin_mode or "isolated"}
+    return replace_arg(args, 5, params)
+
+
+def flip_bitget_one_way(instance, order_info: MarketOrder, args: tuple, position_mode: str) -> tuple:
+    final_side = order_info.side
+    margin_mode = args[-1].get("marginMode") or "isolated"
+    if position_mode == "one-way":
+        new_params = {"oneWayMode": True, "marginMode": margin_mode}
+        return replace_arg(args, 5, new_params)
+
+    if order_info.is_entry:
+        trade_side = "Open" if order_info.is_buy else "open"
+        new_params = {"tradeSide": trade_side, "marginMode": margin_mode}
+    elif order_info.is_close:
+        if order_info.side == "sell":
+            final_side = "buy"
+        elif order_info.side == "buy":
+            final_side = "sell"
+        new_params = {"reduceOnly": True, "tradeSide": "close"}
+    args = replace_arg(args, 5, new_params)
+    return replace_arg(args, 2, final_side)
+
+
+def flip_bitget_two_way(instance, order_info: MarketOrder, args: tuple, position_mode: str) -> tuple:
+    if position_mode == "one-way":
+        new_side = order_info.side + "_single"
+        args = replace_arg(args, 2, new_side)
+        return replace_arg(args, 5, {"reduceOnly": True, "side": new_side})
+
+    new_params = {"reduceOnly": True} if order_info.is_close else {}
+    return replace_arg(args, 5, new_params)
+
+
+# 거래소별 에러 -> 처리 방법 (위에서부터 먼저 일치하는 규칙 적용, 없으면 중단)
+ERROR_TABLES: dict[str, list[Rule]] = {
+    "BINANCE": [
+        Rule(
+            Action.RETRY,
+            codes=("-1001",),
+            messages=("Internal error", "Server is currently overloaded"),
+        ),
+        Rule(
+            Action.FLIP_POSITION_MODE,
+            codes=("-4061",),
+            messages=("position side does not match",),
+            handler=flip_binance,
+        ),
+        Rule(Action.RESYNC_CLOCK, exceptions=(ccxt.InvalidNonce,), codes=("-1021",)),
+    ],
+    "BYBIT": [
+        Rule(
+            Action.FLIP_POSITION_MODE,
+            messages=("position idx not match position mode",),
+            handler=flip_bybit,
+        ),
+        Rule(
+            Action.RESYNC_CLOCK,
+            exceptions=(ccxt.InvalidNonce,),
+            codes=("10002",),
+            messages=("check your server timestamp",),
+        ),
+    ],
+    "OKX": [
+        Rule(
+            Action.FLIP_POSITION_MODE,
+            messages=("posSide error",),
+            handler=flip_okx,
+        ),
+    ],
+    "BITGET": [
+        Rule(
+            Action.FLIP_POSITION_MODE,
+            messages=("unilateral position", "hold side is null", "No position to close"),
+            handler=flip_bitget_one_way,
+        ),
+        Rule(
+            Action.FLIP_POSITION_MODE,
+            messages=("two-way positions",),
+            handler=flip_bitget_two_way,
+        ),
+    ],
+}
+
+RETRYABLE_FUNCTIONS = ("create_order", "set_leverage")
+
+
+def find_rule(exchange: str, e: Exception) -> Rule | None:
+    code = get_error_code(e)
+    for rule in ERROR_TABLES.get(exchange, ()):
+        if rule.match(e, code):
+            return rule
+    return None
+
+
+def get_backoff(attempt: int, delay: float, max_delay: float) -> float:
+    # full jitter: 0 ~ min(max_delay, delay * 2^attempt)
+    return random.uniform(0, min(max_delay, delay * 2**attempt))
+
+
+async def retry(
+    func,
+    *args,
+    order_info: MarketOrder,
+    max_attempts=5,
+    delay=1,
+    max_delay=5,
+    instance=None,
+    position_mode: str | None = None,
+):
+    """
+    position_mode: args 를 만들 때 쓴 포지션 모드 (생략하면 instance 의 현재 모드)
+    같은 클라이언트로 동시에 나간 주문이 서로 모드를 되돌리지 않도록
+    이번 주문이 시도한 모드가 지금 모드와 같을 때만 모드를 바꿉니다.
+    """
+    attempts = 0
+    if position_mode is None:
+        position_mode = getattr(instance, "position_mode", None)
+    deadline = order_deadline.get()
+    # @traced 로 감싼 함수는 스스로 단계 시간을 기록
+    stage = None if hasattr(func, "__wrapped__") else func.__name__
+
+    while True:
+        try:
+            with trace_stage(stage) if stage else nullcontext():
+                result = func(*args)  # 함수 실행
+                if asyncio.iscoroutine(result):
+                    result = await result
+            return result
+        except Exception as e:
+            logger.error(f"에러 발생: {str(e)}")
+            attempts += 1
+            rule = None
+            if func.__name__ in RETRYABLE_FUNCTIONS:
+                rule = find_rule(order_info.exchange, e)
+            action = rule.action if rule is not None else Action.ABORT
+
+            if action == Action.ABORT or attempts >= max_attempts:
+                raise
+
+            wait = 0.0
+            if action == Action.RETRY:
+                wait = get_backoff(attempts - 1, delay, max_delay)
+            if deadline is not None and time.monotonic() + wait > deadline:
+                logger.error("주문 재시도 허용 시간을 초과했습니다")
+                raise
+
+            retry_counts[(order_info.exchange, type(e).__name__)] += 1
+            if action == Action.RETRY:
+                await asyncio.sleep(wait)
+            elif action == Action.FLIP_POSITION_MODE:
+                if instance.position_mode == position_mode:
+                    instance.position_mode = get_other_mode(position_mode)
+                # 다른 주문이 이미 바꿨다면 되돌리지 않고 그 모드로 재시도
+                position_mode = instance.position_mode
+                args = rule.handler(instance, order_info, args, position_mode)
+                if asyncio.iscoroutine(args):
+                    args = await args
+            elif action == Action.RESYNC_CLOCK:
+                await instance.client.load_time_difference()
+
+            logger.error(f"재시도 {max_attempts - attempts}번 남았음")
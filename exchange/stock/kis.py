@@ -1,15 +1,24 @@
-from datetime import datetime
 import json
 import httpx
 from exchange.stock.error import TokenExpired
 from exchange.stock.schemas import *
-from exchange.database import db
+from exchange.stock.token import token_manager
+from exchange.stock.quote import KisQuoteCache
+from exchange.stock.limiter import (
+    get_limiter,
+    PRIORITY_CLOSE,
+    PRIORITY_ORDER,
+    PRIORITY_QUOTE,
+)
 from pydantic import validate_arguments
 import traceback
-import copy
 from exchange.model import MarketOrder
+from exchange.utility import settings
 from devtools import debug
 
+# 만료/무효 토큰 응답 코드
+TOKEN_ERROR_CODES = ("EGW00121", "EGW00123")
+
 
 class KoreaInvestment:
     def __init__(
@@ -23,18 +32,23 @@ class KoreaInvestment:
         self.key = key
         self.secret = secret
         self.kis_number = kis_number
+        self.auth_id = f"KIS{kis_number}"
         self.account_code = account_code
         # 계좌코드가 29이면 모의투자, 그 외에는 실전투자
-        self.base_url = (
+        self.is_paper = account_code == "29"
+        self.base_url = settings.EXCHANGE_BASE_URLS.get("KIS") or (
             BaseUrls.paper_base_url.value
-            if account_code == "29"
+            if self.is_paper
             else BaseUrls.base_url.value
         )
         self.is_auth = False
+        self.access_token: str | None = None
         self.account_number = account_number
         self.base_headers = {}
         self.session = httpx.Client()
         self.async_session = httpx.AsyncClient()
+        self.limiter = get_limiter(key, self.is_paper)
+        self.quotes = KisQuoteCache(self)
         self.auth()
 
         self.base_body = {}
@@ -51,35 +65,74 @@ class KoreaInvestment:
             "NYSE": QueryExchangeCode.NYSE,
             "AMEX": QueryExchangeCode.AMEX,
         }
+        self.build_body_templates()
 
     def init_info(self, order_info: MarketOrder):
-        self.order_info = order_info
+        return order_info
 
     def close_session(self):
+        token_manager.stop(self)
         self.session.close()
 
+    async def close(self):
+        self.quotes.stop()
+        self.close_session()
+        await self.async_session.aclose()
+
     def get(self, endpoint: str, params: dict = None, headers: dict = None):
         url = f"{self.base_url}{endpoint}"
         # headers |= self.base_headers
+        self.limiter.acquire_sync()
         return self.session.get(url, params=params, headers=headers).json()
 
-    def post_with_error_handling(
-        self, endpoint: str, data: dict = None, headers: dict = None
+    async def get_async(
+        self,
+        endpoint: str,
+        params: dict = None,
+        headers: dict = None,
+        priority: int = PRIORITY_QUOTE,
     ):
         url = f"{self.base_url}{endpoint}"
-        response = self.session.post(url, json=data, headers=headers).json()
+        await self.limiter.acquire(priority)
+        response = await self.async_session.get(url, params=params, headers=headers)
+        return response.json()
+
+    def check_response(self, response: dict):
         if "access_token" in response.keys() or response["rt_cd"] == "0":
             return response
+        elif response.get("msg_cd") in TOKEN_ERROR_CODES:
+            raise TokenExpired(response)
         else:
             raise Exception(response)
 
+    def post_with_error_handling(
+        self, endpoint: str, data: dict = None, headers: dict = None
+    ):
+        url = f"{self.base_url}{endpoint}"
+        self.limiter.acquire_sync()
+        response = self.session.post(url, json=data, headers=headers).json()
+        return self.check_response(response)
+
     def post(self, endpoint: str, data: dict = None, headers: dict = None):
         return self.post_with_error_handling(endpoint, data, headers)
 
+    async def post_async(
+        self,
+        endpoint: str,
+        data: dict = None,
+        headers: dict = None,
+        priority: int = PRIORITY_ORDER,
+    ):
+        url = f"{self.base_url}{endpoint}"
+        await self.limiter.acquire(priority)
+        response = await self.async_session.post(url, json=data, headers=headers)
+        return self.check_response(response.json())
+
     def get_hashkey(self, data) -> str:
         headers = {"appKey": self.key, "appSecret": self.secret}
         endpoint = "/uapi/hashkey"
         url = f"{self.base_url}{endpoint}"
+        self.limiter.acquire_sync()
         return self.session.post(url, json=data, headers=headers).json()["HASH"]
 
     def open_auth(self):
@@ -88,47 +141,6 @@ class KoreaInvestment:
     def write_auth(self, auth):
         self.write_json("auth.json", auth)
 
-    def check_auth(self, auth, key, secret, kis_number):
-        if auth is None:
-            return False
-        access_token, access_token_token_expired = auth
-        try:
-            if access_token == "nothing":
-                return False
-            else:
-                if not self.is_auth:
-                    # 계좌에 따라 검증 서버도 구분
-                    check_url = f"{self.base_url}/uapi/domestic-stock/v1/quotations/inquire-ccnl"
-                    response = self.session.get(
-                        check_url,
-                        headers={
-                            "authorization": f"BEARER {access_token}",
-                            "appkey": key,
-                            "appsecret": secret,
-                            "custtype": "P",
-                            "tr_id": "FHKST01010300",
-                        },
-                        params={
-                            "FID_COND_MRKT_DIV_CODE": "J",
-                            "FID_INPUT_ISCD": "005930",
-                        },
-                    ).json()
-                    if response["msg_cd"] == "EGW00123":
-                        return False
-
-            access_token_token_expired = datetime.strptime(
-                access_token_token_expired, "%Y-%m-%d %H:%M:%S"
-            )
-            diff = access_token_token_expired - datetime.now()
-            total_seconds = diff.total_seconds()
-            if total_seconds < 60 * 60:
-                return False
-            else:
-                return True
-
-        except Exception as e:
-            print(traceback.format_exc())
-
     def create_auth(self, key: str, secret: str):
         data = {"grant_type": "client_credentials", "appkey": key, "appsecret": secret}
         # 계좌에 따라 토큰 서버도 구분
@@ -143,22 +155,100 @@ class KoreaInvestment:
         else:
             raise Exception(response)
 
-    def auth(self):
-        auth_id = f"KIS{self.kis_number}"
-        auth = db.get_auth(auth_id)
-        if not self.check_auth(auth, self.key, self.secret, self.kis_number):
-            auth = self.create_auth(self.key, self.secret)
-            db.set_auth(auth_id, auth[0], auth[1])
-        else:
-            self.is_auth = True
-        access_token = auth[0]
+    def set_token(self, access_token: str):
+        self.access_token = access_token
         self.base_headers = BaseHeaders(
             authorization=f"Bearer {access_token}",
             appkey=self.key,
             appsecret=self.secret,
             custtype="P",
         ).dict()
-        return auth
+        self.build_order_templates()
+
+    def auth(self):
+        access_token = token_manager.get_token(self)
+        self.set_token(access_token)
+        return access_token
+
+    def build_order_templates(self):
+        """매수/매도, 시장별 주문 헤더를 토큰이 바뀔 때마다 한 번만 만들어 둡니다"""
+        headers = self.base_headers
+        if self.is_paper:
+            korea_headers = (KoreaPaperBuyOrderHeaders, KoreaPaperSellOrderHeaders)
+            usa_headers = (UsaPaperBuyOrderHeaders, UsaPaperSellOrderHeaders)
+        else:
+            korea_headers = (KoreaBuyOrderHeaders, KoreaSellOrderHeaders)
+            usa_headers = (UsaBuyOrderHeaders, UsaSellOrderHeaders)
+        self.order_headers = {
+            ("KRX", "buy"): korea_headers[0](**headers).dict(),
+            ("KRX", "sell"): korea_headers[1](**headers).dict(),
+            ("USA", "buy"): usa_headers[0](**headers).dict(),
+            ("USA", "sell"): usa_headers[1](**headers).dict(),
+        }
+        self.ticker_headers = {
+            "KRX": KoreaTickerHeaders(**headers).dict(),
+            "USA": UsaTickerHeaders(**headers).dict(),
+        }
+
+    def build_body_templates(self):
+        """계좌별 주문 본문/시세 조회 틀, 요청 시에는 종목/수량/가격만 채웁니다"""
+        account = self.base_order_body.dict()
+        self.order_bodies = {
+            ("KRX", "market"): KoreaMarketOrderBody(**account, PDNO="", ORD_QTY="").dict(),
+            ("KRX", "limit"): KoreaOrderBody(
+                **account,
+                PDNO="",
+                ORD_DVSN=KoreaOrderType.limit.value,
+                ORD_QTY="",
+                ORD_UNPR="",
+            ).dict(),
+        }
+        for exchange, exchange_code in self.order_exchange_code.items():
+            self.order_bodies[exchange] = UsaOrderBody(
+                **account,
+                PDNO="",
+                ORD_QTY="",
+                OVRS_ORD_UNPR="",
+                OVRS_EXCG_CD=exchange_code,
+            ).dict()
+        self.ticker_queries = {"KRX": KoreaTickerQuery(FID_INPUT_ISCD="").dict()}
+        for exchange, exchange_code in self.query_exchange_code.items():
+            self.ticker_queries[exchange] = UsaTickerQuery(EXCD=exchange_code, SYMB="").dict()
+
+    def build_order_request(
+        self,
+        exchange: Literal["KRX", "NASDAQ", "NYSE", "AMEX"],
+        ticker: str,
+        order_type: Literal["limit", "market"],
+        side: Literal["buy", "sell"],
+        amount: int,
+        price: int = 0,
+        mintick=0.01,
+        current_price: float | None = None,
+    ) -> tuple[str, dict, dict]:
+        """주문 요청 (endpoint, body, headers) 생성, 미국 주식은 current_price 필요"""
+        amount = str(int(amount))
+
+        if exchange == "KRX":
+            body = self.order_bodies[("KRX", order_type)].copy()
+            body["PDNO"] = ticker
+            body["ORD_QTY"] = amount
+            if order_type == "limit":
+                body["ORD_UNPR"] = str(price)
+            return Endpoints.korea_order.value, body, self.order_headers[("KRX", side)]
+
+        price = (
+            current_price + mintick * 50
+            if side == "buy"
+            else current_price - mintick * 50
+        )
+        if price < 1:
+            price = 1.0
+        body = self.order_bodies[exchange].copy()
+        body["PDNO"] = ticker
+        body["ORD_QTY"] = amount
+        body["OVRS_ORD_UNPR"] = str(float("{:.2f}".format(price)))
+        return Endpoints.usa_order.value, body, self.order_headers[("USA", side)]
 
     def create_order(
         self,
@@ -172,87 +262,24 @@ class KoreaInvestment:
     ):
         max_retries = 3
         last_exception = None
-        
+
         for attempt in range(max_retries):
             try:
-                endpoint = (
-                    Endpoints.korea_order.value
-                    if exchange == "KRX"
-                    else Endpoints.usa_order.value
-                )
-                body = self.base_order_body.dict()
-                headers = copy.deepcopy(self.base_headers)
-                price = str(price)
-
-                amount = str(int(amount))
-
-                if exchange == "KRX":
-                    if self.base_url == BaseUrls.base_url:
-                        headers |= (
-                            KoreaBuyOrderHeaders(**headers)
-                            if side == "buy"
-                            else KoreaSellOrderHeaders(**headers)
-                        )
-                    elif self.base_url == BaseUrls.paper_base_url:
-                        headers |= (
-                            KoreaPaperBuyOrderHeaders(**headers)
-                            if side == "buy"
-                            else KoreaPaperSellOrderHeaders(**headers)
-                        )
-
-                    if order_type == "market":
-                        body |= KoreaMarketOrderBody(**body, PDNO=ticker, ORD_QTY=amount)
-                    elif order_type == "limit":
-                        body |= KoreaOrderBody(
-                            **body,
-                            PDNO=ticker,
-                            ORD_DVSN=KoreaOrderType.limit,
-                            ORD_QTY=amount,
-                            ORD_UNPR=price,
-                        )
-                elif exchange in ("NASDAQ", "NYSE", "AMEX"):
-                    exchange_code = self.order_exchange_code.get(exchange)
+                access_token = self.access_token
+                current_price = None
+                if exchange in ("NASDAQ", "NYSE", "AMEX"):
                     current_price = self.fetch_current_price(exchange, ticker)
-                    price = (
-                        current_price + mintick * 50
-                        if side == "buy"
-                        else current_price - mintick * 50
-                    )
-                    if price < 1:
-                        price = 1.0
-                    price = float("{:.2f}".format(price))
-                    if self.base_url == BaseUrls.base_url:
-                        headers |= (
-                            UsaBuyOrderHeaders(**headers)
-                            if side == "buy"
-                            else UsaSellOrderHeaders(**headers)
-                        )
-                    elif self.base_url == BaseUrls.paper_base_url:
-                        headers |= (
-                            UsaPaperBuyOrderHeaders(**headers)
-                            if side == "buy"
-                            else UsaPaperSellOrderHeaders(**headers)
-                        )
-
-                    if order_type == "market":
-                        body |= UsaOrderBody(
-                            **body,
-                            PDNO=ticker,
-                            ORD_DVSN=UsaOrderType.limit.value,
-                            ORD_QTY=amount,
-                            OVRS_ORD_UNPR=price,
-                            OVRS_EXCG_CD=exchange_code,
-                        )
-                    elif order_type == "limit":
-                        body |= UsaOrderBody(
-                            **body,
-                            PDNO=ticker,
-                            ORD_DVSN=UsaOrderType.limit.value,
-                            ORD_QTY=amount,
-                            OVRS_ORD_UNPR=price,
-                            OVRS_EXCG_CD=exchange_code,
-                        )
+                endpoint, body, headers = self.build_order_request(
+                    exchange, ticker, order_type, side, amount, price, mintick, current_price
+                )
                 return self.post(endpoint, body, headers)
+            except TokenExpired as e:
+                last_exception = e
+                token_manager.invalidate(self, access_token)
+                if attempt < max_retries - 1:
+                    continue
+                else:
+                    raise last_exception
             except Exception as e:
                 last_exception = e
                 if attempt < max_retries - 1:  
@@ -260,6 +287,46 @@ class KoreaInvestment:
                 else:
                     raise last_exception 
 
+    async def create_order_async(
+        self,
+        exchange: Literal["KRX", "NASDAQ", "NYSE", "AMEX"],
+        ticker: str,
+        order_type: Literal["limit", "market"],
+        side: Literal["buy", "sell"],
+        amount: int,
+        price: int = 0,
+        mintick=0.01,
+    ):
+        max_retries = 3
+        last_exception = None
+
+        for attempt in range(max_retries):
+            try:
+                # 동시에 거부된 주문들이 토큰을 한 번만 재발급하도록 주문에 쓴 토큰을 기억
+                access_token = self.access_token
+                current_price = None
+                if exchange in ("NASDAQ", "NYSE", "AMEX"):
+                    current_price = await self.quotes.get_price(exchange, ticker)
+                endpoint, body, headers = self.build_order_request(
+                    exchange, ticker, order_type, side, amount, price, mintick, current_price
+                )
+                # 매도(청산)를 매수보다 먼저 보냄
+                priority = PRIORITY_CLOSE if side == "sell" else PRIORITY_ORDER
+                return await self.post_async(endpoint, body, headers, priority)
+            except TokenExpired as e:
+                last_exception = e
+                await token_manager.invalidate_async(self, access_token)
+                if attempt < max_retries - 1:
+                    continue
+                else:
+                    raise last_exception
+            except Exception as e:
+                last_exception = e
+                if attempt < max_retries - 1:
+                    continue
+                else:
+                    raise last_exception
+
     def create_market_buy_order(
         self,
         exchange: Literal["KRX", "NASDAQ", "NYSE", "AMEX"],
@@ -293,32 +360,54 @@ class KoreaInvestment:
     def create_usa_market_buy_order(self, ticker: str, amount: int, price: int):
         return self.create_market_buy_order("usa", ticker, amount, price)
 
-    def fetch_ticker(
+    def build_ticker_request(
         self, exchange: Literal["KRX", "NASDAQ", "NYSE", "AMEX"], ticker: str
-    ):
+    ) -> tuple[str, dict, dict]:
         if exchange == "KRX":
             endpoint = Endpoints.korea_ticker.value
-            headers = KoreaTickerHeaders(**self.base_headers).dict()
-            query = KoreaTickerQuery(FID_INPUT_ISCD=ticker).dict()
+            headers = self.ticker_headers["KRX"]
+            query = self.ticker_queries["KRX"].copy()
+            query["FID_INPUT_ISCD"] = ticker
         elif exchange in ("NASDAQ", "NYSE", "AMEX"):
-            exchange_code = self.query_exchange_code.get(exchange)
             endpoint = Endpoints.usa_ticker.value
-            headers = UsaTickerHeaders(**self.base_headers).dict()
-            query = UsaTickerQuery(EXCD=exchange_code, SYMB=ticker).dict()
+            headers = self.ticker_headers["USA"]
+            query = self.ticker_queries[exchange].copy()
+            query["SYMB"] = ticker
+        return endpoint, query, headers
+
+    def fetch_ticker(
+        self, exchange: Literal["KRX", "NASDAQ", "NYSE", "AMEX"], ticker: str
+    ):
+        endpoint, query, headers = self.build_ticker_request(exchange, ticker)
         ticker = self.get(endpoint, query, headers)
         return ticker.get("output")
 
-    def fetch_current_price(self, exchange, ticker: str):
+    async def fetch_ticker_async(
+        self, exchange: Literal["KRX", "NASDAQ", "NYSE", "AMEX"], ticker: str
+    ):
+        endpoint, query, headers = self.build_ticker_request(exchange, ticker)
+        ticker = await self.get_async(endpoint, query, headers)
+        return ticker.get("output")
+
+    def parse_current_price(self, exchange, ticker: dict):
         try:
             if exchange == "KRX":
-                return float(self.fetch_ticker(exchange, ticker)["stck_prpr"])
+                return float(ticker["stck_prpr"])
             elif exchange in ("NASDAQ", "NYSE", "AMEX"):
-                return float(self.fetch_ticker(exchange, ticker)["last"])
+                return float(ticker["last"])
 
         except KeyError:
             print(traceback.format_exc())
             return None
 
+    def fetch_current_price(self, exchange, ticker: str):
+        return self.parse_current_price(exchange, self.fetch_ticker(exchange, ticker))
+
+    async def fetch_current_price_async(self, exchange, ticker: str):
+        return self.parse_current_price(
+            exchange, await self.fetch_ticker_async(exchange, ticker)
+        )
+
     def open_json(self, path):
         with open(path, "r") as f:
             return json.load(f)
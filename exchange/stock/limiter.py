@@ -0,0 +1,85 @@
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from exchange.utility import settings
+
+# 숫자가 작을수록 먼저 처리
+PRIORITY_AUTH = 0
+PRIORITY_CLOSE = 1
+PRIORITY_ORDER = 2
+PRIORITY_QUOTE = 3
+
+
+class KisRateLimiter:
+    """
+    KIS 앱키별 초당 요청 제한을 지키는 토큰 버킷
+    토큰이 없으면 요청을 우선순위(토큰 발급 > 매도 > 매수 > 시세) 순서로 대기시킵니다.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._drainer: asyncio.Task | None = None
+
+    def _take(self) -> float:
+        """토큰을 하나 쓰고 0 을, 없으면 기다려야 할 시간을 돌려줍니다"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated_at) * self.rate
+            )
+            self._updated_at = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def _give_back(self):
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + 1)
+
+    async def acquire(self, priority: int = PRIORITY_ORDER):
+        if not self._waiters and self._take() == 0:
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future))
+        if self._drainer is None or self._drainer.done():
+            self._drainer = asyncio.create_task(self._drain())
+        await future
+
+    async def _drain(self):
+        while self._waiters:
+            wait = self._take()
+            if wait:
+                await asyncio.sleep(wait)
+                continue
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                # 기다리던 요청이 취소됨
+                self._give_back()
+                continue
+            future.set_result(None)
+
+    def acquire_sync(self):
+        """동기 호출(스레드/시작 시 토큰 발급)용, 우선순위 대기열을 거치지 않습니다"""
+        while wait := self._take():
+            time.sleep(wait)
+
+
+limiters: dict[str, KisRateLimiter] = {}
+
+
+def get_limiter(app_key: str, is_paper: bool) -> KisRateLimiter:
+    """같은 앱키를 쓰는 계좌는 제한을 공유합니다"""
+    limiter = limiters.get(app_key)
+    if limiter is None:
+        rate = settings.KIS_PAPER_RATE_LIMIT if is_paper else settings.KIS_RATE_LIMIT
+        limiter = limiters[app_key] = KisRateLimiter(rate)
+    return limiter
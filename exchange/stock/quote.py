@@ -0,0 +1,89 @@
+import asyncio
+import time
+from loguru import logger
+from exchange import metrics
+from exchange.utility import settings
+
+
+class KisQuoteCache:
+    """
+    KIS 종목 현재가 캐시
+    한 번 주문한 종목은 KIS_QUOTE_POLL_INTERVAL 마다 REST 로 갱신해 두고
+    (종목이 많으면 앱키 요청 한도의 KIS_QUOTE_RATE_SHARE 안에서 더 천천히),
+    KIS_QUOTE_IDLE 초 동안 다시 쓰이지 않으면 갱신을 멈춥니다.
+    같은 종목을 동시에 조회하면 요청 하나를 공유합니다.
+    """
+
+    def __init__(self, kis):
+        self.kis = kis
+        self._quotes: dict[tuple[str, str], tuple[float, float]] = {}
+        self._inflight: dict[tuple[str, str], asyncio.Task] = {}
+        self._last_used: dict[tuple[str, str], float] = {}
+        self._tasks: dict[tuple[str, str], asyncio.Task] = {}
+
+    def get_cached(self, key: tuple[str, str]) -> float | None:
+        cached = self._quotes.get(key)
+        if cached is not None and time.monotonic() - cached[1] < settings.KIS_QUOTE_MAX_AGE:
+            return cached[0]
+        return None
+
+    async def get_price(self, exchange: str, ticker: str) -> float | None:
+        key = (exchange, ticker)
+        self._last_used[key] = time.monotonic()
+        price = self.get_cached(key)
+        if price is None:
+            metrics.cache_requests.inc("price", exchange, "miss")
+            price = await self._fetch(key)
+        else:
+            metrics.cache_requests.inc("price", exchange, "hit")
+        self._start(key)
+        return price
+
+    async def _fetch(self, key: tuple[str, str]) -> float | None:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._request(key))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # 기다리던 요청 하나가 취소돼도 공유 요청은 계속 진행
+        return await asyncio.shield(task)
+
+    async def _request(self, key: tuple[str, str]) -> float | None:
+        started_at = time.monotonic()
+        price = await self.kis.fetch_current_price_async(*key)
+        cached = self._quotes.get(key)
+        if price is not None and (cached is None or cached[1] < started_at):
+            self._quotes[key] = (price, started_at)
+        return price
+
+    def _start(self, key: tuple[str, str]):
+        if key in self._tasks:
+            return
+        self._tasks[key] = asyncio.create_task(self._poll(key))
+
+    def get_poll_interval(self) -> float:
+        """갱신 중인 종목이 많을수록 천천히 갱신해 시세 요청이 KIS_QUOTE_RATE_SHARE 를 넘지 않게 합니다"""
+        rate = self.kis.limiter.rate * settings.KIS_QUOTE_RATE_SHARE
+        return max(settings.KIS_QUOTE_POLL_INTERVAL, len(self._tasks) / rate)
+
+    async def _poll(self, key: tuple[str, str]):
+        try:
+            while time.monotonic() - self._last_used.get(key, 0) < settings.KIS_QUOTE_IDLE:
+                await asyncio.sleep(self.get_poll_interval())
+                if self.get_cached(key) is not None:
+                    # 주문이 방금 조회한 시세가 아직 유효함
+                    continue
+                try:
+                    await self._fetch(key)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.warning(f"KIS{self.kis.kis_number} {key[1]} 시세 갱신 에러: {str(e)}")
+        finally:
+            self._tasks.pop(key, None)
+
+    def stop(self):
+        for task in list(self._tasks.values()) + list(self._inflight.values()):
+            task.cancel()
+        self._tasks.clear()
+        self._inflight.clear()
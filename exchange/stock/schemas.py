@@ -149,7 +149,7 @@ class OrderBody(AccountInfo):
 
 
 class KoreaOrderBody(OrderBody):
-    ORD_DVSN: Literal[f"{KoreaOrderType.market}", f"{KoreaOrderType.limit}"]
+    ORD_DVSN: Literal[KoreaOrderType.market.value, KoreaOrderType.limit.value]
     ORD_UNPR: str       # 주문가격
 
 
@@ -0,0 +1,148 @@
+import asyncio
+import threading
+from datetime import datetime
+from loguru import logger
+from exchange.database import db
+from exchange.utility import settings
+from exchange.stock.limiter import PRIORITY_AUTH
+
+TOKEN_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+class KisTokenManager:
+    """
+    KIS 계좌별 접근 토큰을 메모리에 들고 있으면서
+    만료(access_token_token_expired) KIS_TOKEN_REFRESH_BEFORE 초 전에 백그라운드로 재발급합니다.
+    주문 경로에서는 메모리의 토큰만 읽고, 토큰 확인/발급 요청은 하지 않습니다.
+    KIS 는 토큰 발급을 분당 1회로 제한하므로 계좌별로 발급은 한 번에 하나만 하고,
+    기다리던 요청은 먼저 끝난 발급의 토큰을 함께 씁니다.
+    """
+
+    def __init__(self):
+        self._tokens: dict[str, tuple[str, datetime]] = {}
+        self._tasks: dict[int, asyncio.Task] = {}
+        self._thread_locks: dict[str, threading.Lock] = {}
+        self._async_locks: dict[str, asyncio.Lock] = {}
+
+    @property
+    def refresh_before(self) -> float:
+        return settings.KIS_TOKEN_REFRESH_BEFORE
+
+    def get_remaining(self, expired_at: datetime) -> float:
+        return (expired_at - datetime.now()).total_seconds()
+
+    def get_token(self, kis) -> str:
+        token = self._tokens.get(kis.auth_id)
+        if token is None or self.get_remaining(token[1]) <= 0:
+            # 처음 한 번(클라이언트 생성 시)만 DB 확인 또는 발급
+            token = self.load(kis) or self.issue(kis)
+        self.start(kis)
+        return token[0]
+
+    def get_newer(self, kis, stale_token: str | None) -> tuple[str, datetime] | None:
+        """stale_token 대신 쓸 수 있는, 이미 발급된 유효한 토큰"""
+        token = self._tokens.get(kis.auth_id)
+        if token is None or token[0] == stale_token or self.get_remaining(token[1]) <= 0:
+            return None
+        return token
+
+    def load(self, kis) -> tuple[str, datetime] | None:
+        auth = db.get_auth(kis.auth_id)
+        if auth is None or auth[0] == "nothing":
+            return None
+        try:
+            expired_at = datetime.strptime(auth[1], TOKEN_TIME_FORMAT)
+        except (TypeError, ValueError):
+            return None
+        if self.get_remaining(expired_at) < self.refresh_before:
+            return None
+        self._tokens[kis.auth_id] = (auth[0], expired_at)
+        return self._tokens[kis.auth_id]
+
+    def issue(
+        self, kis, stale_token: str | None = None, wait_limit: bool = True
+    ) -> tuple[str, datetime]:
+        """stale_token 을 대신할 토큰 발급, 기다리는 동안 다른 요청이 발급했다면 그 토큰을 사용"""
+        lock = self._thread_locks.setdefault(kis.auth_id, threading.Lock())
+        with lock:
+            token = self.get_newer(kis, stale_token)
+            if token is not None:
+                kis.set_token(token[0])
+                return token
+            if wait_limit:
+                kis.limiter.acquire_sync()
+            access_token, expired = kis.create_auth(kis.key, kis.secret)
+            return self.store(kis, access_token, expired)
+
+    async def issue_async(self, kis, stale_token: str | None = None) -> tuple[str, datetime]:
+        lock = self._async_locks.setdefault(kis.auth_id, asyncio.Lock())
+        async with lock:
+            token = self.get_newer(kis, stale_token)
+            if token is not None:
+                kis.set_token(token[0])
+                return token
+            await kis.limiter.acquire(PRIORITY_AUTH)
+            # 동기 경로(스레드)의 발급과도 겹치지 않도록 같은 잠금을 거쳐 발급
+            return await asyncio.to_thread(self.issue, kis, stale_token, False)
+
+    def store(self, kis, access_token: str, expired: str) -> tuple[str, datetime]:
+        db.set_auth(kis.auth_id, access_token, expired)
+        token = (access_token, datetime.strptime(expired, TOKEN_TIME_FORMAT))
+        self._tokens[kis.auth_id] = token
+        kis.set_token(access_token)
+        return token
+
+    def invalidate(self, kis, rejected_token: str | None = None):
+        """주문이 토큰 만료로 실패했을 때 즉시 재발급 (rejected_token: 주문에 쓴 토큰)"""
+        rejected_token = rejected_token or kis.access_token
+        if self.get_newer(kis, rejected_token) is None:
+            logger.warning(f"{kis.auth_id} 토큰이 거부되어 다시 발급합니다")
+        self.issue(kis, rejected_token)
+
+    async def invalidate_async(self, kis, rejected_token: str | None = None):
+        rejected_token = rejected_token or kis.access_token
+        if self.get_newer(kis, rejected_token) is None:
+            logger.warning(f"{kis.auth_id} 토큰이 거부되어 다시 발급합니다")
+        await self.issue_async(kis, rejected_token)
+
+    async def refresh(self, kis, stale_token: str | None = None):
+        _, expired_at = await self.issue_async(kis, stale_token or kis.access_token)
+        logger.info(
+            f"{kis.auth_id} 토큰을 미리 재발급했습니다 (만료 {expired_at.strftime(TOKEN_TIME_FORMAT)})"
+        )
+
+    def start(self, kis):
+        """만료 전 재발급 작업 시작, 이벤트 루프 밖(스레드)에서 만든 클라이언트는 루프에서 다시 호출"""
+        if id(kis) in self._tasks:
+            return
+        try:
+            task = asyncio.get_running_loop().create_task(self._refresh_forever(kis))
+        except RuntimeError:
+            return
+        self._tasks[id(kis)] = task
+
+    async def _refresh_forever(self, kis):
+        while True:
+            access_token, expired_at = self._tokens[kis.auth_id]
+            await asyncio.sleep(max(self.get_remaining(expired_at) - self.refresh_before, 0))
+            _, current_expired_at = self._tokens[kis.auth_id]
+            if current_expired_at != expired_at:
+                # 다른 인스턴스가 이미 재발급함
+                kis.set_token(self._tokens[kis.auth_id][0])
+                continue
+            try:
+                await self.refresh(kis, access_token)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # KIS 는 토큰 발급을 분당 1회로 제한
+                logger.error(f"{kis.auth_id} 토큰 재발급 실패: {str(e)}")
+                await asyncio.sleep(60)
+
+    def stop(self, kis):
+        task = self._tasks.pop(id(kis), None)
+        if task is not None:
+            task.cancel()
+
+
+token_manager = KisTokenManager()
@@ -0,0 +1,73 @@
+import asyncio
+import time
+from loguru import logger
+from exchange import metrics
+from exchange.utility import settings
+
+
+class PriceService:
+    """
+    public 티커 스트림을 구독해 심볼별 최신 last/bid/ask 를 메모리에 유지합니다.
+    처음 조회하는 심볼은 REST 로 가져오면서 구독을 시작하고,
+    스트림이 TICKER_MAX_AGE 보다 오래 멈춰 있으면 REST 로 대체합니다.
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self._tickers: dict[str, tuple[dict, float]] = {}
+        self._tasks: dict[str, asyncio.Task] = {}
+
+    @property
+    def max_age(self) -> float:
+        return settings.TICKER_MAX_AGE
+
+    def get_cached(self, symbol: str) -> dict | None:
+        cached = self._tickers.get(symbol)
+        if cached is not None and time.monotonic() - cached[1] < self.max_age:
+            return cached[0]
+        return None
+
+    async def get_ticker(self, symbol: str) -> dict:
+        ticker = self.get_cached(symbol)
+        if ticker is not None:
+            metrics.cache_requests.inc("price", self.client.id, "hit")
+            return ticker
+
+        metrics.cache_requests.inc("price", self.client.id, "miss")
+        started_at = time.monotonic()
+        ticker = await self.client.fetch_ticker(symbol)
+        self._set(symbol, ticker, started_at)
+        self._start(symbol)
+        return ticker
+
+    async def get_price(self, symbol: str) -> float:
+        return (await self.get_ticker(symbol))["last"]
+
+    def _set(self, symbol: str, ticker: dict, updated_at: float):
+        cached = self._tickers.get(symbol)
+        if cached is None or cached[1] < updated_at:
+            self._tickers[symbol] = (ticker, updated_at)
+
+    def _start(self, symbol: str):
+        if symbol in self._tasks or not self.client.has.get("watchTicker"):
+            return
+        self._tasks[symbol] = asyncio.create_task(self._watch(symbol))
+
+    async def _watch(self, symbol: str):
+        delay = 1
+        while True:
+            try:
+                ticker = await self.client.watch_ticker(symbol)
+                self._set(symbol, ticker, time.monotonic())
+                delay = 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"{self.client.id} {symbol} 티커 스트림 에러: {str(e)}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 60)
+
+    def stop(self):
+        for task in self._tasks.values():
+            task.cancel()
+        self._tasks.clear()
@@ -0,0 +1,83 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+import orjson
+
+
+class OrderTrace:
+    """
+    주문 하나의 단계별 시간 기록 (time.monotonic 기준)
+    웹훅 수신부터 검증, 클라이언트 준비, 수량 계산, 레버리지 설정, 주문 시도, 알림까지
+    어느 단계에서 시간이 걸렸는지 Server-Timing 헤더와 주문 기록으로 남깁니다.
+    """
+
+    def __init__(self, started_at: float | None = None):
+        self.started_at = started_at or time.monotonic()
+        self.stages: list[tuple[str, float, float]] = []
+
+    def add(self, name: str, started_at: float, ended_at: float | None = None):
+        self.stages.append((name, started_at, ended_at or time.monotonic()))
+
+    @contextmanager
+    def stage(self, name: str):
+        started_at = time.monotonic()
+        try:
+            yield
+        finally:
+            self.add(name, started_at)
+
+    def to_list(self) -> list[dict]:
+        return [
+            {
+                "stage": name,
+                "start_ms": round((started_at - self.started_at) * 1000, 1),
+                "duration_ms": round((ended_at - started_at) * 1000, 1),
+            }
+            for name, started_at, ended_at in self.stages
+        ]
+
+    def to_json(self) -> str:
+        return orjson.dumps(self.to_list()).decode()
+
+    def to_server_timing(self) -> str:
+        entries = [
+            f"{name};dur={(ended_at - started_at) * 1000:.1f}"
+            for name, started_at, ended_at in self.stages
+        ]
+        entries.append(f"total;dur={(time.monotonic() - self.started_at) * 1000:.1f}")
+        return ", ".join(entries)
+
+
+current_trace: ContextVar[OrderTrace | None] = ContextVar("current_trace", default=None)
+
+
+def start_trace(trace: OrderTrace | None = None) -> OrderTrace:
+    trace = trace or OrderTrace()
+    current_trace.set(trace)
+    return trace
+
+
+@contextmanager
+def trace_stage(name: str):
+    """진행 중인 주문 기록이 있을 때만 단계 시간을 기록"""
+    trace = current_trace.get()
+    if trace is None:
+        yield
+        return
+    with trace.stage(name):
+        yield
+
+
+def traced(name: str):
+    """async 메서드 전체를 한 단계로 기록하는 데코레이터"""
+
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            with trace_stage(name):
+                return await func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -3,13 +3,15 @@ from exchange.model import MarketOrder, COST_BASED_ORDER_EXCHANGES, STOCK_EXCHAN
 from exchange.utility import settings
 from datetime import datetime, timedelta
 from loguru import logger
+from exchange.utility.notifier import DiscordNotifier
 from devtools import debug, pformat
 import traceback
 import os
+import orjson
 
 # 디스코드 웹훅 관련 import (선택적)
 try:
-    from dhooks import Webhook, Embed
+    from dhooks import Embed
     DISCORD_AVAILABLE = True
 except ImportError:
     DISCORD_AVAILABLE = False
@@ -20,19 +22,57 @@ log_dir = "./log"
 if not os.path.exists(log_dir):
     os.makedirs(log_dir)
 
-# 로그 설정
+
+
+def format_json(record) -> str:
+    """
+    한 이벤트를 JSON 한 줄로 기록
+    logger.bind/contextualize 로 붙인 값(order_id, exchange, symbol, 단계별 시간 등)도 함께 기록합니다.
+    """
+    data = {
+        "time": record["time"].strftime("%Y-%m-%d %H:%M:%S.%f"),
+        "level": record["level"].name,
+        "message": record["message"],
+    }
+    # _ 로 시작하는 값은 다른 싱크용 (_json: 다른 싱크가 포맷하며 남긴 값, _pretty: 콘솔용 글)
+    data.update(
+        (key, value) for key, value in record["extra"].items() if not key.startswith("_")
+    )
+    if record["exception"] is not None:
+        data["exception"] = "".join(
+            traceback.format_exception(*record["exception"])
+        )
+    record["extra"]["_json"] = orjson.dumps(data, default=str).decode()
+    return "{extra[_json]}\n"
+
+
+def format_console(record) -> str:
+    """사람이 읽는 콘솔 형식, 보기 좋게 정리한 글(_pretty)이 있으면 아래에 붙임"""
+    text = "<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level}</level> | <level>{message}</level>"
+    if "_pretty" in record["extra"]:
+        text += "\n{extra[_pretty]}"
+    return text + "\n{exception}"
+
+
+# 로그 설정: 파일/콘솔 쓰기는 loguru 백그라운드 스레드에서 처리 (enqueue)
 logger.remove(0)
 logger.add(
     "./log/poa.log",
     rotation="1 days",
     retention="7 days",
-    format="{time:YYYY-MM-DD HH:mm:ss} | {level} | {message}",
-)
-logger.add(
-    sys.stderr,
-    colorize=True,
-    format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level}</level> | <level>{message}</level>",
+    format=format_json,
+    enqueue=True,
 )
+pretty_console = settings.LOG_PRETTY_CONSOLE
+if pretty_console:
+    logger.add(
+        sys.stderr,
+        colorize=True,
+        format=format_console,
+        enqueue=True,
+    )
+else:
+    logger.add(sys.stderr, format=format_json, enqueue=True)
 
 # 디스코드 웹훅 초기화
 hook = None
@@ -42,7 +82,7 @@ if DISCORD_AVAILABLE:
         if discord_url and discord_url.strip():
             # discordapp.com을 discord.com으로 변경
             url = discord_url.replace("discordapp", "discord")
-            hook = Webhook(url)
+            hook = DiscordNotifier(url)
             logger.info("디스코드 웹훅이 성공적으로 초기화되었습니다")
         else:
             logger.info("디스코드 웹훅 URL이 설정되지 않음 - 콘솔 로그만 사용")
@@ -81,19 +121,18 @@ def logger_test():
 
 def log_message(message="None", embed=None):
     """로그 메시지를 콘솔과 디스코드로 전송"""
-    # 콘솔 로그는 항상 출력
     logger.info(message)
-    print(message)
     
     # 디스코드 웹훅이 사용 가능한 경우에만 전송
+    # 전송 스레드 대기열에 넣기만 하고 바로 돌아옴
     if hook and DISCORD_AVAILABLE:
-        try:
-            if embed:
-                hook.send(embed=embed)
-            else:
-                hook.send(str(message))
-        except Exception as e:
-            logger.warning(f"디스코드 메시지 전송 실패: {str(e)}")
+        hook.send(str(message), embed)
+
+
+def close_notifier():
+    """남은 디스코드 메시지를 보내고 전송 스레드 종료"""
+    if hook:
+        hook.close()
 
 
 def log_order_message(exchange_name, order_result: dict, order_info: MarketOrder):
@@ -248,6 +287,39 @@ def log_hedge_message(exchange, base, quote, exchange_amount, upbit_amount, hedg
     log_message(content, embed)
 
 
+def log_fanout_message(order_info: MarketOrder, results: list):
+    """여러 계좌 주문 결과를 하나의 메시지로 전송"""
+    date = parse_time(datetime.utcnow().timestamp())
+    lines = []
+    for account_order, result in results:
+        if order_info.is_stock:
+            account = f"{account_order.kis_number}번째 계좌"
+        else:
+            account = account_order.account or "default"
+        if isinstance(result, Exception):
+            lines.append(f"❌ {account}: {str(result)}")
+        else:
+            amount = result.get("amount") if isinstance(result, dict) else None
+            lines.append(f"✅ {account}: {amount if amount is not None else account_order.amount}")
+
+    success = sum(1 for _, result in results if not isinstance(result, Exception))
+    summary = f"{success}/{len(results)} 계좌 성공"
+    content = f"📊 다계좌 주문 알림\n일시: {date}\n거래소: {order_info.exchange}\n심볼: {order_info.base}/{order_info.quote}\n거래유형: {order_info.side}\n결과: {summary}\n" + "\n".join(lines)
+
+    if DISCORD_AVAILABLE:
+        embed = Embed(
+            title=f"📊 {order_info.order_name}",
+            description=f"다계좌 주문: {order_info.exchange} {order_info.base} {order_info.side} ({summary})",
+            color=0x00FF00 if success == len(results) else 0xFF0000,
+        )
+        embed.add_field(name="일시", value=str(date), inline=False)
+        embed.add_field(name="계좌별 결과", value="\n".join(lines)[:1024], inline=False)
+    else:
+        embed = None
+
+    log_message(content, embed)
+
+
 def log_error_message(error, name):
     """에러 메시지를 로그 및 디스코드로 전송"""
     content = f"❌ {name} 에러 발생\n{error}"
@@ -308,13 +380,16 @@ def log_validation_error_message(msg):
 
 
 def print_alert_message(order_info: MarketOrder, result="성공"):
-    """웹훅 메시지를 콘솔에 출력"""
-    msg = pformat(order_info.dict(exclude_none=True))
-
+    """웹훅 메시지를 로그로 남김 (주문 필드는 JSON 로그에 그대로, 보기 좋게 정리한 글은 콘솔에만)"""
+    order = order_info.dict(exclude_none=True, exclude={"password"})
+    extra = {"order": order}
+    if pretty_console:
+        extra["_pretty"] = pformat(order)
+    log = logger.bind(**extra)
     if result == "성공":
-        logger.info(f"주문 {result} 웹훅메세지\n{msg}")
+        log.info(f"주문 {result} 웹훅메세지")
     else:
-        logger.error(f"주문 {result} 웹훅메세지\n{msg}")
+        log.error(f"주문 {result} 웹훅메세지")
 
 
 def log_alert_message(order_info: MarketOrder, result="성공"):
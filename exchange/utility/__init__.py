@@ -1,2 +1,2 @@
-from exchange.utility.setting import settings
-from exchange.utility.LogMaker import log_message, log_error_message, log_order_message, log_alert_message, print_alert_message, log_order_error_message, logger_test, log_validation_error_message, log_hedge_message
\ No newline at end of file
+from exchange.utility.setting import settings, settings_store, get_settings
+from exchange.utility.LogMaker import log_message, log_error_message, log_order_message, log_alert_message, print_alert_message, log_order_error_message, logger_test, log_validation_error_message, log_hedge_message, log_fanout_message, close_notifier
\ No newline at end of file
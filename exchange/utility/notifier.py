@@ -0,0 +1,190 @@
+import threading
+import time
+from collections import OrderedDict
+import httpx
+import orjson
+from loguru import logger
+
+# 디스코드 웹훅 제한: 메시지 하나에 embed 10개, embed 글자 수 합계 6000자, 분당 약 30회
+MAX_EMBEDS = 10
+MAX_EMBED_CHARS = 6000
+MAX_DESCRIPTION = 4096
+MAX_CONTENT = 2000
+MIN_INTERVAL = 2.0
+MAX_ATTEMPTS = 3
+# 429 응답을 받고 다시 보내는 최대 횟수
+MAX_RATE_LIMITED = 10
+# 같은 메시지인지 비교할 때 빼는 시각 필드
+TIME_FIELDS = ("일시", "시작 시간", "종료 시간")
+
+
+def get_merge_key(content: str | None, data: dict) -> bytes:
+    """시각만 다른 같은 메시지(반복되는 에러 등)가 하나로 합쳐지도록 시각을 뺀 키"""
+    fields = [
+        (field.get("name"), field.get("value"))
+        for field in data.get("fields") or []
+        if field.get("name") not in TIME_FIELDS
+    ]
+    if data.get("title") is None and not fields:
+        # embed 없이 보낸 메시지
+        return orjson.dumps([content, data.get("description")])
+    return orjson.dumps([data.get("title"), data.get("description"), fields])
+
+
+def get_embed_size(embed: dict) -> int:
+    size = len(embed.get("title") or "") + len(embed.get("description") or "")
+    for field in embed.get("fields") or []:
+        size += len(field.get("name") or "") + len(field.get("value") or "")
+    footer = embed.get("footer") or {}
+    return size + len(footer.get("text") or "")
+
+
+class DiscordNotifier:
+    """
+    디스코드 웹훅 전송 전용 스레드
+    send() 는 대기열에 넣기만 하고 바로 돌아오므로 주문 처리를 막지 않습니다.
+    대기 중인 메시지는 웹훅 호출 한 번에 embed 최대 10개씩 묶어 보내고,
+    시각만 다른 같은 내용(반복되는 에러 등)은 하나로 합쳐 횟수만 표시합니다.
+    429 응답을 받으면 Retry-After 만큼 기다렸다가 MAX_RATE_LIMITED 번까지 다시 보냅니다.
+    """
+
+    def __init__(self, url: str, max_size: int = 1000):
+        self.url = url
+        self.max_size = max_size
+        self.dropped = 0
+        self._pending: OrderedDict[bytes, list] = OrderedDict()
+        self._condition = threading.Condition()
+        self._closed = False
+        self._next_at = 0.0
+        self._thread = threading.Thread(
+            target=self._run, name="discord-notifier", daemon=True
+        )
+        self._thread.start()
+
+    def send(self, message: str = "", embed=None):
+        """embed 가 있으면 message 는 embed 위에 본문으로 함께 보냅니다"""
+        if embed is not None:
+            data = embed.to_dict()
+            # embed 시각은 합치기/전송 기준이 아니므로 빼고 보냄
+            data.pop("timestamp", None)
+            content = str(message)[:MAX_CONTENT] or None
+        else:
+            data = {"description": str(message)}
+            content = None
+        if len(data.get("description") or "") > MAX_DESCRIPTION:
+            data["description"] = data["description"][: MAX_DESCRIPTION - 3] + "..."
+        key = get_merge_key(content, data)
+        with self._condition:
+            if self._closed:
+                return
+            if key in self._pending:
+                self._pending[key][2] += 1
+                return
+            if len(self._pending) >= self.max_size:
+                # 대기열이 가득 차면 가장 오래된 메시지를 버림
+                self._pending.popitem(last=False)
+                self.dropped += 1
+            self._pending[key] = [content, data, 1]
+            self._condition.notify()
+
+    def _next_batch(self) -> dict | None:
+        """웹훅 한 번에 보낼 {"content": 본문, "embeds": [...]}"""
+        with self._condition:
+            while not self._pending and not self._closed:
+                self._condition.wait()
+            batch = []
+            contents = []
+            size = 0
+            content_size = 0
+            while self._pending and len(batch) < MAX_EMBEDS:
+                key = next(iter(self._pending))
+                content, data, count = self._pending[key]
+                if count > 1:
+                    data = {**data, "footer": {"text": f"같은 메시지 {count}회"}}
+                embed_size = get_embed_size(data)
+                next_content_size = content_size + (len(content) + 1 if content else 0)
+                if batch and (
+                    size + embed_size > MAX_EMBED_CHARS or next_content_size > MAX_CONTENT
+                ):
+                    break
+                del self._pending[key]
+                batch.append(data)
+                if content:
+                    contents.append(content)
+                size += embed_size
+                content_size = next_content_size
+            if self.dropped:
+                logger.warning(f"디스코드 대기열이 가득 차 메시지 {self.dropped}개를 버렸습니다")
+                self.dropped = 0
+            if not batch:
+                return None
+            payload = {"embeds": batch}
+            if contents:
+                payload["content"] = "\n".join(contents)
+            return payload
+
+    def _wait(self, seconds: float):
+        self._next_at = max(self._next_at, time.monotonic() + seconds)
+
+    def _post(self, client: httpx.Client, payload: dict):
+        attempts = 0
+        rate_limited = 0
+        while attempts < MAX_ATTEMPTS:
+            delay = self._next_at - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            self._wait(MIN_INTERVAL)
+            try:
+                response = client.post(self.url, json=payload)
+            except httpx.HTTPError as e:
+                attempts += 1
+                logger.warning(f"디스코드 메시지 전송 실패: {str(e)}")
+                continue
+            if response.status_code == 429:
+                # 제한에 걸린 요청은 시도 횟수와 따로 세고, 계속 제한되면 버림
+                rate_limited += 1
+                if rate_limited >= MAX_RATE_LIMITED:
+                    logger.warning(
+                        f"디스코드 전송 제한이 풀리지 않아 메시지 {len(payload['embeds'])}개를 버렸습니다"
+                    )
+                    return
+                self._wait(self.get_retry_after(response))
+                continue
+            if response.headers.get("X-RateLimit-Remaining") == "0":
+                self._wait(float(response.headers.get("X-RateLimit-Reset-After", MIN_INTERVAL)))
+            if response.is_error:
+                attempts += 1
+                logger.warning(
+                    f"디스코드 메시지 전송 실패: {response.status_code} {response.text}"
+                )
+                if response.status_code < 500:
+                    return
+                continue
+            return
+
+    def get_retry_after(self, response: httpx.Response) -> float:
+        retry_after = response.headers.get("Retry-After")
+        if retry_after is None:
+            try:
+                retry_after = response.json().get("retry_after")
+            except ValueError:
+                pass
+        try:
+            return float(retry_after)
+        except (TypeError, ValueError):
+            return MIN_INTERVAL
+
+    def _run(self):
+        with httpx.Client(timeout=10) as client:
+            while payload := self._next_batch():
+                try:
+                    self._post(client, payload)
+                except Exception as e:
+                    logger.warning(f"디스코드 메시지 전송 실패: {str(e)}")
+
+    def close(self, timeout: float = 5):
+        """남은 메시지를 timeout 초까지 보내고 종료"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join(timeout)
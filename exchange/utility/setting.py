@@ -1,10 +1,103 @@
-from exchange.model import Settings
-from functools import lru_cache
+from exchange.model import Settings, env_path
+from loguru import logger
+import threading
+import os
 
 
-@lru_cache()
-def get_settings():
-    return Settings()
+class SettingsStore:
+    """
+    검증된 Settings 스냅샷을 하나만 만들어 공유하고,
+    .env 파일이 바뀌면 새 스냅샷으로 통째로 교체합니다.
+    """
 
+    def __init__(self, env_file: str | None = env_path, interval: float = 2.0):
+        self.env_file = env_file
+        self.interval = interval
+        self._snapshot = Settings(_env_file=env_file)
+        self._mtime = self._get_mtime()
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher: threading.Thread | None = None
 
-settings = get_settings()
+    @property
+    def current(self) -> Settings:
+        return self._snapshot
+
+    def _get_mtime(self):
+        if self.env_file is None:
+            return None
+        try:
+            return os.stat(self.env_file).st_mtime_ns
+        except OSError:
+            return None
+
+    def subscribe(self, listener):
+        """listener(old, new) 는 스냅샷이 교체된 직후 워처 스레드에서 호출됩니다"""
+        self._listeners.append(listener)
+
+    def reload(self) -> bool:
+        with self._lock:
+            try:
+                new = Settings(_env_file=self.env_file)
+            except Exception as e:
+                logger.error(f".env 재로딩 실패, 기존 설정을 유지합니다: {str(e)}")
+                return False
+            old, self._snapshot = self._snapshot, new
+
+        for listener in self._listeners:
+            try:
+                listener(old, new)
+            except Exception as e:
+                logger.error(f"설정 변경 처리 에러: {str(e)}")
+        logger.info(".env 변경을 감지하여 설정을 다시 불러왔습니다")
+        return True
+
+    def _watch(self):
+        while not self._stop.wait(self.interval):
+            mtime = self._get_mtime()
+            if mtime is not None and mtime != self._mtime:
+                self._mtime = mtime
+                self.reload()
+
+    def start_watcher(self):
+        if self.env_file is None or self._watcher is not None:
+            return
+        self._stop.clear()
+        self._watcher = threading.Thread(
+            target=self._watch, name="settings-watcher", daemon=True
+        )
+        self._watcher.start()
+
+    def stop_watcher(self):
+        if self._watcher is None:
+            return
+        self._stop.set()
+        self._watcher.join(timeout=self.interval + 1)
+        self._watcher = None
+
+
+class SettingsProxy:
+    """항상 최신 스냅샷을 읽도록 속성 접근을 위임합니다"""
+
+    def __init__(self, store: SettingsStore):
+        object.__setattr__(self, "_store", store)
+
+    def __getattr__(self, name):
+        return getattr(self._store.current, name)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("설정은 .env 파일을 수정해서 변경하세요")
+
+    def __repr__(self):
+        return repr(self._store.current)
+
+
+settings_store = SettingsStore()
+
+
+def get_settings() -> Settings:
+    return settings_store.current
+
+
+settings = SettingsProxy(settings_store)
@@ -0,0 +1,18 @@
+import uvicorn
+import fire
+from exchange.fake import FakeConfig, FakeServer, create_app
+
+
+def start_server(host="127.0.0.1", port=8900, latency=0.0, error_rate=0.0, seed=0, fill_ratio=1.0):
+    """
+    오프라인 테스트/지연 측정용 가짜 거래소 서버
+    .env 에 EXCHANGE_BASE_URLS='{"BINANCE": "http://127.0.0.1:8900/binance", "KIS": "http://127.0.0.1:8900/kis"}'
+    처럼 지정하면 봇이 실제 거래소 대신 이 서버로 주문합니다.
+    """
+    config = FakeConfig(latency=latency, error_rate=error_rate, seed=seed, fill_ratio=fill_ratio)
+    app = create_app(FakeServer(config))
+    uvicorn.run(app, host=host, port=port)
+
+
+if __name__ == "__main__":
+    fire.Fire(start_server)
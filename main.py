@@ -3,7 +3,7 @@ from fastapi.exception_handlers import (
 )
 from pprint import pprint
 from fastapi import FastAPI, Request, status, BackgroundTasks, Form, HTTPException, Depends
-from fastapi.responses import ORJSONResponse, RedirectResponse, HTMLResponse
+from fastapi.responses import ORJSONResponse, RedirectResponse, HTMLResponse, PlainTextResponse
 from fastapi.exceptions import RequestValidationError
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
@@ -13,6 +13,7 @@ from exchange.stock.kis import KoreaInvestment
 from exchange.model import MarketOrder, PriceRequest, HedgeData, OrderRequest
 from exchange.utility import (
     settings,
+    settings_store,
     log_order_message,
     log_alert_message,
     print_alert_message,
@@ -20,12 +21,28 @@ from exchange.utility import (
     log_order_error_message,
     log_validation_error_message,
     log_hedge_message,
+    log_fanout_message,
     log_error_message,
     log_message,
 )
-from exchange.utility.LogMaker import log_system_startup, log_system_shutdown
+from exchange.utility.LogMaker import log_system_startup, log_system_shutdown, close_notifier
 import traceback
-from exchange import get_exchange, log_message, db, settings, get_bot, pocket
+from exchange import log_message, db, settings, get_bot
+from exchange.pexchange import (
+    close_exchanges,
+    warm_exchanges,
+    get_market_type,
+    start_order_budget,
+)
+from exchange import metrics
+from exchange.timing import current_trace, start_trace, trace_stage
+from exchange.order_queue import order_queue, get_order_key
+from exchange.dedup import alert_dedup
+from exchange.hedge_ledger import hedge_ledger
+from exchange.multileg import Leg, MultiLegError, execute_legs
+from exchange.fanout import execute_fanout, split_order, get_account_name
+from loguru import logger
+import asyncio
 import ipaddress
 import os
 import sys
@@ -33,7 +50,9 @@ from devtools import debug
 import jwt
 from datetime import datetime, timedelta
 import hashlib
+import time
 from typing import Optional
+from functools import partial
 
 VERSION = "0.1.8"
 app = FastAPI(default_response_class=ORJSONResponse)
@@ -87,7 +106,12 @@ def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
 @app.on_event("startup")
 async def startup():
     # 관리자 인터페이스용 데이터베이스 테이블 생성
-    init_admin_db()
+    await init_admin_db()
+    settings_store.start_watcher()
+    asyncio.create_task(warm_exchanges())
+    await alert_dedup.start()
+    await order_queue.start(execute_order)
+    await hedge_ledger.start()
     log_message(f"POABOT 실행 완료! - 버전:{VERSION}")
     # 디스코드 시작 알림
     log_system_startup()
@@ -96,9 +120,16 @@ async def startup():
 async def shutdown():
     # 디스코드 종료 알림
     log_system_shutdown()
+    settings_store.stop_watcher()
+    await order_queue.stop()
+    order_queue.close()
+    alert_dedup.close()
+    await hedge_ledger.stop()
+    await close_exchanges()
     db.close()
+    close_notifier()
 
-def init_admin_db():
+async def init_admin_db():
     """관리자 인터페이스용 데이터베이스 테이블 초기화"""
     try:
         # API 키 관리 테이블
@@ -116,7 +147,7 @@ def init_admin_db():
             updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
         );
         """
-        db.excute(query, {})
+        await db.excute_async(query, {})
         
         # 사용자 관리 테이블
         query = """
@@ -128,7 +159,7 @@ def init_admin_db():
             created_at DATETIME DEFAULT CURRENT_TIMESTAMP
         );
         """
-        db.excute(query, {})
+        await db.excute_async(query, {})
         
         # 기본 관리자 계정 생성 (비밀번호: admin123)
         admin_password_hash = hashlib.sha256("admin123".encode()).hexdigest()
@@ -136,7 +167,7 @@ def init_admin_db():
         INSERT OR IGNORE INTO users (username, password_hash, is_admin)
         VALUES (?, ?, ?)
         """
-        db.excute(query, ("admin", admin_password_hash, 1))
+        await db.excute_async(query, ("admin", admin_password_hash, 1))
         
     except Exception as e:
         log_error_message(traceback.format_exc(), "데이터베이스 초기화 에러")
@@ -163,7 +194,7 @@ async def whitelist_middleware(request: Request, call_next):
             and not ipaddress.ip_address(request.client.host).is_private
         ):
             msg = f"{request.client.host}는 안됩니다"
-            print(msg)
+            logger.warning(msg)
             return ORJSONResponse(
                 status_code=status.HTTP_403_FORBIDDEN,
                 content=f"{request.client.host}는 허용되지 않습니다",
@@ -174,6 +205,18 @@ async def whitelist_middleware(request: Request, call_next):
         response = await call_next(request)
         return response
 
+# 단계별 시간을 Server-Timing 헤더로 돌려주는 주문 경로
+TRACE_PATHS = ("/order", "/", "/orders")
+
+@app.middleware("http")
+async def trace_middleware(request: Request, call_next):
+    if request.method != "POST" or request.url.path not in TRACE_PATHS:
+        return await call_next(request)
+    trace = start_trace()
+    response = await call_next(request)
+    response.headers["Server-Timing"] = trace.to_server_timing()
+    return response
+
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request, exc):
     msgs = [
@@ -200,10 +243,8 @@ async def welcome():
 
 @app.post("/price")
 async def price(price_req: PriceRequest, background_tasks: BackgroundTasks):
-    exchange = get_exchange(price_req.exchange)
-    price = exchange.dict()[price_req.exchange].fetch_price(
-        price_req.base, price_req.quote
-    )
+    bot = await get_bot(price_req.exchange)
+    price = await bot.get_price(f"{price_req.base}/{price_req.quote}")
     return price
 
 def log(exchange_name, result, order_info):
@@ -214,75 +255,171 @@ def log_error(error_message, order_info):
     log_order_error_message(error_message, order_info)
     log_alert_message(order_info, "실패")
 
-@app.post("/order")
-@app.post("/")
-async def order(order_info: MarketOrder, background_tasks: BackgroundTasks):
-    order_result = None
+def get_bot_args(order_info: MarketOrder) -> tuple:
+    exchange_name = order_info.exchange
+    return (
+        exchange_name,
+        order_info.kis_number,
+        get_market_type(exchange_name, order_info),
+        order_info.account,
+    )
+
+async def execute_order(order_info: MarketOrder):
+    """접수 큐의 워커가 주문 하나를 실행합니다 (계좌가 여럿이면 동시에 실행)"""
+    if not order_info.is_fanout:
+        return await execute_account_order(order_info)
+
+    results = await execute_fanout(
+        order_info, partial(execute_account_order, notify=False)
+    )
+    await asyncio.to_thread(log_fanout_message, order_info, results)
+    failed = [
+        f"{get_account_name(account_order)}: {result}"
+        for account_order, result in results
+        if isinstance(result, Exception)
+    ]
+    if failed:
+        raise Exception("\n".join(failed))
+    return [result for _, result in results]
+
+async def execute_account_order(order_info: MarketOrder, notify=True):
+    start_order_budget()
     try:
         exchange_name = order_info.exchange
-        bot = get_bot(exchange_name, order_info.kis_number)
-        bot.init_info(order_info)
-
-        if bot.order_info.is_crypto:
-            if bot.order_info.is_entry:
-                order_result = bot.market_entry(bot.order_info)
-            elif bot.order_info.is_close:
-                order_result = bot.market_close(bot.order_info)
-            elif bot.order_info.is_buy:
-                order_result = bot.market_buy(bot.order_info)
-            elif bot.order_info.is_sell:
-                order_result = bot.market_sell(bot.order_info)
-            background_tasks.add_task(log, exchange_name, order_result, order_info)
-        elif bot.order_info.is_stock:
-            order_result = bot.create_order(
-                bot.order_info.exchange,
-                bot.order_info.base,
-                order_info.type.lower(),
-                order_info.side.lower(),
-                order_info.amount,
-            )
-            background_tasks.add_task(log, exchange_name, order_result, order_info)
+        with trace_stage("get_bot"):
+            bot = await get_bot(*get_bot_args(order_info))
+        with trace_stage("init_info"):
+            order_info = bot.init_info(order_info)
+
+        if order_info.is_crypto:
+            if order_info.is_entry:
+                market_order = bot.market_entry
+            elif order_info.is_close:
+                market_order = bot.market_close
+            elif order_info.is_buy:
+                market_order = bot.market_buy
+            elif order_info.is_sell:
+                market_order = bot.market_sell
+            with metrics.exchange_call_seconds.time(exchange_name, market_order.__name__):
+                order_result = await market_order(order_info)
+            if notify:
+                with trace_stage("log"):
+                    await asyncio.to_thread(log, exchange_name, order_result, order_info)
+        elif order_info.is_stock:
+            with (
+                metrics.exchange_call_seconds.time(exchange_name, "create_order"),
+                trace_stage("create_order"),
+            ):
+                order_result = await bot.create_order_async(
+                    order_info.exchange,
+                    order_info.base,
+                    order_info.type.lower(),
+                    order_info.side.lower(),
+                    order_info.amount,
+                )
+            if notify:
+                with trace_stage("log"):
+                    await asyncio.to_thread(log, exchange_name, order_result, order_info)
+        return order_result
 
     except TypeError as e:
-        error_msg = get_error(e)
-        background_tasks.add_task(
-            log_order_error_message, "\n".join(error_msg), order_info
-        )
+        if notify:
+            error_msg = get_error(e)
+            await asyncio.to_thread(
+                log_order_error_message, "\n".join(error_msg), order_info
+            )
+        raise
 
     except Exception as e:
-        error_msg = get_error(e)
-        background_tasks.add_task(log_error, "\n".join(error_msg), order_info)
+        if notify:
+            error_msg = get_error(e)
+            await asyncio.to_thread(log_error, "\n".join(error_msg), order_info)
+        raise
 
-    else:
-        return {"result": "success"}
-
-    finally:
-        pass
-
-def get_hedge_records(base):
-    records = pocket.get_full_list("kimp", query_params={"filter": f'base = "{base}"'})
-    binance_amount = 0.0
-    binance_records_id = []
-    upbit_amount = 0.0
-    upbit_records_id = []
-    for record in records:
-        if record.exchange == "BINANCE":
-            binance_amount += record.amount
-            binance_records_id.append(record.id)
-        elif record.exchange == "UPBIT":
-            upbit_amount += record.amount
-            upbit_records_id.append(record.id)
-
-    return {
-        "BINANCE": {"amount": binance_amount, "records_id": binance_records_id},
-        "UPBIT": {"amount": upbit_amount, "records_id": upbit_records_id},
-    }
+@app.post("/order")
+@app.post("/")
+async def order(order_info: MarketOrder):
+    received_at = time.time()
+    trace = current_trace.get()
+    if trace is not None:
+        # 요청 본문 읽기 + pydantic 검증
+        trace.add("validation", trace.started_at)
+    with trace_stage("dedup"):
+        alert_key = await alert_dedup.acquire(order_info)
+    if alert_key is None:
+        logger.info(f"중복 알림을 무시합니다: {order_info.exchange} {order_info.base} {order_info.side}")
+        return {"result": "duplicate"}
+    with trace_stage("enqueue"):
+        try:
+            job_id = await order_queue.put(order_info, received_at, trace)
+        except Exception:
+            # 큐에 넣지 못한 알림은 트레이딩뷰가 다시 보내면 실행되도록 기록을 지움
+            await alert_dedup.release(alert_key)
+            raise
+    metrics.order_ack_seconds.observe(
+        time.time() - received_at, *metrics.get_order_labels(order_info)
+    )
+    return {"result": "success", "job_id": job_id}
+
+async def run_order_chain(
+    order_infos: list[tuple[int, MarketOrder]], results: list, received_at: float
+):
+    # 같은 거래소/계좌/종목 주문은 요청 순서대로 실행
+    for index, order_info in order_infos:
+        try:
+            job_id, order_result = await order_queue.run(order_info, received_at)
+        except Exception as e:
+            results[index] = {"result": "error", "error": str(e)}
+        else:
+            results[index] = {
+                "result": "success",
+                "job_id": job_id,
+                "id": order_result.get("id") if isinstance(order_result, dict) else None,
+            }
+
+@app.post("/orders")
+async def orders(order_infos: list[MarketOrder]):
+    received_at = time.time()
+    trace = current_trace.get()
+    if trace is not None:
+        trace.add("validation", trace.started_at)
+    results: list[dict | None] = [None] * len(order_infos)
+    chains: dict[str, list[tuple[int, MarketOrder]]] = {}
+    clients = set()
+    for index, order_info in enumerate(order_infos):
+        # 한 묶음 안의 같은 주문은 의도한 것일 수 있으므로 alert_id 를 준 주문만 중복 확인
+        if order_info.alert_id and await alert_dedup.is_duplicate(order_info):
+            results[index] = {"result": "duplicate"}
+            continue
+        chains.setdefault(get_order_key(order_info), []).append((index, order_info))
+        account_orders = split_order(order_info) if order_info.is_fanout else [order_info]
+        clients.update(get_bot_args(account_order) for account_order in account_orders)
+
+    # 거래소/계좌별 클라이언트를 먼저 준비한 뒤 모든 묶음을 동시에 실행
+    with trace_stage("get_bot"):
+        await asyncio.gather(
+            *(get_bot(*client) for client in clients), return_exceptions=True
+        )
+    with trace_stage("execute"):
+        await asyncio.gather(
+            *(run_order_chain(chain, results, received_at) for chain in chains.values())
+        )
+    return results
+
+@app.get("/metrics")
+async def get_metrics():
+    """Prometheus 텍스트 형식의 지연 시간/재시도/큐/캐시 지표"""
+    return PlainTextResponse(
+        metrics.render(), media_type="text/plain; version=0.0.4"
+    )
 
 @app.post("/hedge")
 async def hedge(hedge_data: HedgeData, background_tasks: BackgroundTasks):
     exchange_name = hedge_data.exchange.upper()
-    bot = get_bot(exchange_name)
-    upbit = get_bot("UPBIT")
+    started_at = time.monotonic()
+    start_order_budget()
+    bot = await get_bot(exchange_name, market_type="swap")
+    upbit = await get_bot("UPBIT")
 
     base = hedge_data.base
     quote = hedge_data.quote
@@ -304,133 +441,146 @@ async def hedge(hedge_data: HedgeData, background_tasks: BackgroundTasks):
         try:
             if amount is None:
                 raise Exception("헷지할 수량을 요청하세요")
-            binance_order_result = bot.market_entry(foreign_order_info)
-            binance_order_amount = binance_order_result["amount"]
-            pocket.create(
-                "kimp",
-                {
-                    "exchange": "BINANCE",
-                    "base": base,
-                    "quote": quote,
-                    "amount": binance_order_amount,
-                },
-            )
             if leverage is None:
                 leverage = 1
-            try:
-                korea_order_info = OrderRequest(
-                    exchange="UPBIT",
-                    base=base,
-                    quote="KRW",
-                    side="buy",
-                    type="market",
-                    amount=binance_order_amount,
-                )
-                upbit.init_info(korea_order_info)
-                upbit_order_result = upbit.market_buy(korea_order_info)
-            except Exception as e:
-                hedge_records = get_hedge_records(base)
-                binance_records_id = hedge_records["BINANCE"]["records_id"]
-                binance_amount = hedge_records["BINANCE"]["amount"]
-                binance_order_result = bot.market_close(
-                    OrderRequest(
-                        exchange=exchange_name,
-                        base=base,
-                        quote=quote,
-                        side="close/buy",
-                        amount=binance_amount,
+            korea_order_info = OrderRequest(
+                exchange="UPBIT",
+                base=base,
+                quote="KRW",
+                side="buy",
+                type="market",
+                amount=foreign_order_info.amount,
+            )
+            upbit.init_info(korea_order_info)
+
+            async def foreign_entry():
+                result = await bot.market_entry(foreign_order_info)
+                return result["amount"]
+
+            async def foreign_close(foreign_amount):
+                try:
+                    await bot.market_close(
+                        OrderRequest(
+                            exchange=exchange_name,
+                            base=base,
+                            quote=quote,
+                            side="close/buy",
+                            amount=foreign_amount,
+                        )
                     )
+                except Exception:
+                    # 헷지 종료 때 정리할 수 있도록 장부에 남김
+                    await hedge_ledger.add(exchange_name, base, quote, foreign_amount)
+                    raise
+
+            async def upbit_buy():
+                result = await upbit.market_buy(korea_order_info)
+                upbit_order_info = await upbit.get_order(result["id"])
+                return upbit_order_info["filled"]
+
+            async def upbit_sell(upbit_amount):
+                try:
+                    await upbit.market_sell(
+                        OrderRequest(
+                            exchange="UPBIT",
+                            base=base,
+                            quote="KRW",
+                            side="sell",
+                            amount=upbit_amount,
+                        )
+                    )
+                except Exception:
+                    await hedge_ledger.add("UPBIT", base, "KRW", upbit_amount)
+                    raise
+
+            try:
+                results = await execute_legs(
+                    [
+                        Leg(exchange_name, foreign_entry, foreign_close),
+                        Leg("UPBIT", upbit_buy, upbit_sell),
+                    ]
                 )
-                for binance_record_id in binance_records_id:
-                    pocket.delete("kimp", binance_record_id)
-                log_message(
-                    "[헷지 실패] 업비트에서 에러가 발생하여 바이낸스 포지션을 종료합니다"
-                )
-            else:
-                upbit_order_info = upbit.get_order(upbit_order_result["id"])
-                upbit_order_amount = upbit_order_info["filled"]
-                pocket.create(
-                    "kimp",
-                    {
-                        "exchange": "UPBIT",
-                        "base": base,
-                        "quote": "KRW",
-                        "amount": upbit_order_amount,
-                    },
-                )
-                log_hedge_message(
-                    exchange_name,
-                    base,
-                    quote,
-                    binance_order_amount,
-                    upbit_order_amount,
-                    hedge,
-                )
+            except MultiLegError as e:
+                log_message(f"[헷지 실패] {str(e)}")
+                raise
+            foreign_order_amount = results[exchange_name]
+            upbit_order_amount = results["UPBIT"]
+            await hedge_ledger.add(exchange_name, base, quote, foreign_order_amount)
+            await hedge_ledger.add("UPBIT", base, "KRW", upbit_order_amount)
+            log_hedge_message(
+                exchange_name,
+                base,
+                quote,
+                foreign_order_amount,
+                upbit_order_amount,
+                hedge,
+            )
 
         except Exception as e:
             background_tasks.add_task(
                 log_error_message, traceback.format_exc(), "헷지 에러"
             )
+            metrics.hedge_seconds.observe(
+                time.monotonic() - started_at, exchange_name, hedge, "error"
+            )
             return {"result": "error"}
         else:
+            metrics.hedge_seconds.observe(
+                time.monotonic() - started_at, exchange_name, hedge, "success"
+            )
             return {"result": "success"}
 
     elif hedge == "OFF":
         try:
-            records = pocket.get_full_list(
-                "kimp", query_params={"filter": f'base = "{base}"'}
-            )
-            binance_amount = 0.0
-            binance_records_id = []
-            upbit_amount = 0.0
-            upbit_records_id = []
-            for record in records:
-                if record.exchange == "BINANCE":
-                    binance_amount += record.amount
-                    binance_records_id.append(record.id)
-                elif record.exchange == "UPBIT":
-                    upbit_amount += record.amount
-                    upbit_records_id.append(record.id)
-
-            if binance_amount > 0 and upbit_amount > 0:
-                # 바이낸스
-                order_info = OrderRequest(
-                    exchange="BINANCE",
-                    base=base,
-                    quote=quote,
-                    side="close/buy",
-                    amount=binance_amount,
-                )
-                binance_order_result = bot.market_close(order_info)
-                for binance_record_id in binance_records_id:
-                    pocket.delete("kimp", binance_record_id)
+            hedge_totals = hedge_ledger.get_totals(base, exchange_name)
+            foreign_amount = hedge_totals[exchange_name]
+            upbit_amount = hedge_totals["UPBIT"]
+
+            if foreign_amount == 0 and upbit_amount == 0:
+                log_message(f"{exchange_name}, UPBIT에 종료할 수량이 없습니다")
+            else:
+                # 보상 주문이 실패해서 한쪽만 남은 포지션도 각각 종료
+                if foreign_amount > 0:
+                    order_info = OrderRequest(
+                        exchange=exchange_name,
+                        base=base,
+                        quote=quote,
+                        side="close/buy",
+                        amount=foreign_amount,
+                    )
+                    foreign_order_result = await bot.market_close(order_info)
+                    await hedge_ledger.close(base, exchange_name)
+                else:
+                    log_message(f"{exchange_name}에 종료할 수량이 없습니다")
                 # 업비트
-                order_info = OrderRequest(
-                    exchange="UPBIT",
-                    base=base,
-                    quote="KRW",
-                    side="sell",
-                    amount=upbit_amount,
-                )
-                upbit_order_result = upbit.market_sell(order_info)
-                for upbit_record_id in upbit_records_id:
-                    pocket.delete("kimp", upbit_record_id)
+                if upbit_amount > 0:
+                    order_info = OrderRequest(
+                        exchange="UPBIT",
+                        base=base,
+                        quote="KRW",
+                        side="sell",
+                        amount=upbit_amount,
+                    )
+                    upbit_order_result = await upbit.market_sell(order_info)
+                    await hedge_ledger.close(base, "UPBIT")
+                else:
+                    log_message("UPBIT에 종료할 수량이 없습니다")
 
                 log_hedge_message(
-                    exchange_name, base, quote, binance_amount, upbit_amount, hedge
+                    exchange_name, base, quote, foreign_amount, upbit_amount, hedge
                 )
-            elif binance_amount == 0 and upbit_amount == 0:
-                log_message(f"{exchange_name}, UPBIT에 종료할 수량이 없습니다")
-            elif binance_amount == 0:
-                log_message(f"{exchange_name}에 종료할 수량이 없습니다")
-            elif upbit_amount == 0:
-                log_message("UPBIT에 종료할 수량이 없습니다")
         except Exception as e:
             background_tasks.add_task(
                 log_error_message, traceback.format_exc(), "헷지종료 에러"
             )
+            metrics.hedge_seconds.observe(
+                time.monotonic() - started_at, exchange_name, hedge, "error"
+            )
             return {"result": "error"}
         else:
+            metrics.hedge_seconds.observe(
+                time.monotonic() - started_at, exchange_name, hedge, "success"
+            )
             return {"result": "success"}
 
 # ========== 관리자 인터페이스 엔드포인트들 ==========
@@ -446,7 +596,7 @@ async def admin_login(request: Request, username: str = Form(...), password: str
     try:
         password_hash = hashlib.sha256(password.encode()).hexdigest()
         query = "SELECT * FROM users WHERE username = ? AND password_hash = ? AND is_admin = 1"
-        user = db.fetch_one(query, (username, password_hash))
+        user = await db.fetch_one_async(query, (username, password_hash))
         
         if user:
             access_token = create_access_token(data={"sub": username})
@@ -476,7 +626,7 @@ async def admin_dashboard(request: Request):
         
         # API 키 목록 조회
         query = "SELECT * FROM api_keys ORDER BY exchange, created_at DESC"
-        api_keys = db.fetch_all(query, {})
+        api_keys = await db.fetch_all_async(query, {})
         
         return templates.TemplateResponse("admin_dashboard.html", {
             "request": request,
@@ -507,7 +657,7 @@ async def add_api_key(
         INSERT INTO api_keys (exchange, api_key, secret_key, passphrase, account_number, account_code)
         VALUES (?, ?, ?, ?, ?, ?)
         """
-        db.excute(query, (exchange, api_key, secret_key, passphrase, account_number, account_code))
+        await db.excute_async(query, (exchange, api_key, secret_key, passphrase, account_number, account_code))
         
         return RedirectResponse(url="/admin/dashboard", status_code=302)
     except Exception as e:
@@ -524,7 +674,7 @@ async def delete_api_key(request: Request, key_id: int):
             return RedirectResponse(url="/admin")
         
         query = "DELETE FROM api_keys WHERE id = ?"
-        db.excute(query, (key_id,))
+        await db.excute_async(query, (key_id,))
         
         return RedirectResponse(url="/admin/dashboard", status_code=302)
     except Exception as e:
@@ -541,7 +691,7 @@ async def toggle_api_key(request: Request, key_id: int):
             return RedirectResponse(url="/admin")
         
         query = "UPDATE api_keys SET is_active = NOT is_active WHERE id = ?"
-        db.excute(query, (key_id,))
+        await db.excute_async(query, (key_id,))
         
         return RedirectResponse(url="/admin/dashboard", status_code=302)
     except Exception as e:
@@ -558,7 +708,7 @@ async def edit_api_key_page(request: Request, key_id: int):
             return RedirectResponse(url="/admin")
         
         query = "SELECT * FROM api_keys WHERE id = ?"
-        api_key = db.fetch_one(query, (key_id,))
+        api_key = await db.fetch_one_async(query, (key_id,))
         
         if not api_key:
             return RedirectResponse(url="/admin/dashboard")
@@ -607,7 +757,7 @@ async def update_api_key(
             account_number = ?, account_code = ?, updated_at = CURRENT_TIMESTAMP
         WHERE id = ?
         """
-        db.excute(query, (exchange, api_key, secret_key, passphrase, account_number, account_code, key_id))
+        await db.excute_async(query, (exchange, api_key, secret_key, passphrase, account_number, account_code, key_id))
         
         return RedirectResponse(url="/admin/dashboard", status_code=302)
     except Exception as e:
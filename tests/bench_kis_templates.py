@@ -0,0 +1,45 @@
+"""
+KIS 요청 생성 속도 비교: 매 요청마다 스키마 모델로 만들던 방식 vs 계좌별 템플릿
+    python tests/bench_kis_templates.py [반복 횟수]
+"""
+import os
+import sys
+import timeit
+from pathlib import Path
+
+os.environ.setdefault("PASSWORD", "test")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import kis_reference
+
+CASES = {
+    "KRX market order": (
+        lambda kis: kis.build_order_request("KRX", "005930", "market", "buy", 10),
+        lambda kis: kis_reference.build_order_request(kis, "KRX", "005930", "market", "buy", 10),
+    ),
+    "NASDAQ order": (
+        lambda kis: kis.build_order_request("NASDAQ", "AAPL", "market", "buy", 10, current_price=190.0),
+        lambda kis: kis_reference.build_order_request(kis, "NASDAQ", "AAPL", "market", "buy", 10, current_price=190.0),
+    ),
+    "ticker request": (
+        lambda kis: kis.build_ticker_request("NASDAQ", "AAPL"),
+        lambda kis: kis_reference.build_ticker_request(kis, "NASDAQ", "AAPL"),
+    ),
+}
+
+
+def main(number: int = 20000):
+    kis = kis_reference.create_kis("01")
+    try:
+        print(f"{'':20} {'per call':>10} {'template':>10}")
+        for name, (new, old) in CASES.items():
+            old_us = timeit.timeit(lambda: old(kis), number=number) / number * 1e6
+            new_us = timeit.timeit(lambda: new(kis), number=number) / number * 1e6
+            print(f"{name:20} {old_us:8.1f}us {new_us:8.1f}us")
+    finally:
+        kis.close_session()
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,21 @@
+import os
+import sys
+from pathlib import Path
+import pytest
+
+# exchange 를 import 하면 Settings 를 바로 만들기 때문에 .env 없이도 뜨도록 기본값을 넣어둡니다
+os.environ.setdefault("PASSWORD", "test")
+# main 은 import 할 때 WHITELIST 를 기본 허용 목록에 더함
+os.environ.setdefault("WHITELIST", "[]")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+@pytest.fixture
+def temp_db(tmp_path):
+    """store.db 대신 쓰는 임시 DB (전역 db 는 싱글턴이라 따로 만듦)"""
+    from exchange.database import Database
+
+    database = object.__new__(Database)
+    database._setup(str(tmp_path / "store.db"))
+    yield database
+    database.close()
@@ -0,0 +1,112 @@
+"""
+템플릿 도입 전 KoreaInvestment 의 요청 생성 방식 (매 요청마다 스키마 모델로 생성)
+tests/test_kis_templates.py 와 tests/bench_kis_templates.py 가 현재 구현과 비교할 때 사용합니다.
+"""
+import copy
+from exchange.stock.schemas import *
+
+
+def build_order_request(
+    kis,
+    exchange,
+    ticker,
+    order_type,
+    side,
+    amount,
+    price=0,
+    mintick=0.01,
+    current_price=None,
+):
+    endpoint = (
+        Endpoints.korea_order.value
+        if exchange == "KRX"
+        else Endpoints.usa_order.value
+    )
+    body = kis.base_order_body.dict()
+    headers = copy.deepcopy(kis.base_headers)
+    price = str(price)
+
+    amount = str(int(amount))
+
+    if exchange == "KRX":
+        if kis.base_url == BaseUrls.base_url:
+            headers |= (
+                KoreaBuyOrderHeaders(**headers)
+                if side == "buy"
+                else KoreaSellOrderHeaders(**headers)
+            )
+        elif kis.base_url == BaseUrls.paper_base_url:
+            headers |= (
+                KoreaPaperBuyOrderHeaders(**headers)
+                if side == "buy"
+                else KoreaPaperSellOrderHeaders(**headers)
+            )
+
+        if order_type == "market":
+            body |= KoreaMarketOrderBody(**body, PDNO=ticker, ORD_QTY=amount)
+        elif order_type == "limit":
+            body |= KoreaOrderBody(
+                **body,
+                PDNO=ticker,
+                ORD_DVSN=KoreaOrderType.limit,
+                ORD_QTY=amount,
+                ORD_UNPR=price,
+            )
+    elif exchange in ("NASDAQ", "NYSE", "AMEX"):
+        exchange_code = kis.order_exchange_code.get(exchange)
+        price = (
+            current_price + mintick * 50
+            if side == "buy"
+            else current_price - mintick * 50
+        )
+        if price < 1:
+            price = 1.0
+        price = float("{:.2f}".format(price))
+        if kis.base_url == BaseUrls.base_url:
+            headers |= (
+                UsaBuyOrderHeaders(**headers)
+                if side == "buy"
+                else UsaSellOrderHeaders(**headers)
+            )
+        elif kis.base_url == BaseUrls.paper_base_url:
+            headers |= (
+                UsaPaperBuyOrderHeaders(**headers)
+                if side == "buy"
+                else UsaPaperSellOrderHeaders(**headers)
+            )
+
+        body |= UsaOrderBody(
+            **body,
+            PDNO=ticker,
+            ORD_DVSN=UsaOrderType.limit.value,
+            ORD_QTY=amount,
+            OVRS_ORD_UNPR=price,
+            OVRS_EXCG_CD=exchange_code,
+        )
+    return endpoint, body, headers
+
+
+def build_ticker_request(kis, exchange, ticker):
+    if exchange == "KRX":
+        endpoint = Endpoints.korea_ticker.value
+        headers = KoreaTickerHeaders(**kis.base_headers).dict()
+        query = KoreaTickerQuery(FID_INPUT_ISCD=ticker).dict()
+    elif exchange in ("NASDAQ", "NYSE", "AMEX"):
+        exchange_code = kis.query_exchange_code.get(exchange)
+        endpoint = Endpoints.usa_ticker.value
+        headers = UsaTickerHeaders(**kis.base_headers).dict()
+        query = UsaTickerQuery(EXCD=exchange_code, SYMB=ticker).dict()
+    return endpoint, query, headers
+
+
+def create_kis(account_code: str):
+    """네트워크 없이 쓸 수 있는 KoreaInvestment (토큰 발급 대신 고정 토큰 사용)"""
+    from exchange.stock import token
+    from exchange.stock.kis import KoreaInvestment
+
+    get_token = token.token_manager.get_token
+    token.token_manager.get_token = lambda kis: "test-token"
+    try:
+        return KoreaInvestment("app-key", "app-secret", "12345678", account_code, 1)
+    finally:
+        token.token_manager.get_token = get_token
@@ -0,0 +1,77 @@
+import sqlite3
+import threading
+import pytest
+
+
+def test_commit_error_reaches_caller_and_writer_survives(temp_db, monkeypatch):
+    def broken_commit(con, batch):
+        raise sqlite3.OperationalError("disk I/O error")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(temp_db, "_commit", broken_commit)
+        with pytest.raises(sqlite3.OperationalError, match="disk I/O error"):
+            temp_db.excute("CREATE TABLE IF NOT EXISTS t (v)", {})
+    assert temp_db._writer.is_alive()
+    temp_db.excute("CREATE TABLE IF NOT EXISTS t (v)", {})
+
+
+def test_failed_write_in_group_does_not_fail_others(temp_db):
+    temp_db.excute("CREATE TABLE t (v INTEGER UNIQUE)", {})
+    temp_db.excute_many("INSERT INTO t VALUES (?)", [(1,)])
+    errors = []
+
+    def write(value):
+        try:
+            temp_db.excute("INSERT INTO t VALUES (?)", (value,))
+        except sqlite3.IntegrityError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=write, args=(value,)) for value in (1, 2, 3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(errors) == 1
+    assert temp_db.fetch_all("SELECT v FROM t ORDER BY v", ()) == [(1,), (2,), (3,)]
+
+
+def test_dead_writer_is_restarted(temp_db):
+    temp_db._writes.put(None)
+    temp_db._writer.join(timeout=5)
+    assert not temp_db._writer.is_alive()
+    temp_db.excute("CREATE TABLE IF NOT EXISTS t (v)", {})
+    assert temp_db._writer.is_alive()
+
+
+def test_timed_out_write_is_not_applied_later(temp_db, monkeypatch):
+    temp_db.excute("CREATE TABLE t (v)", {})
+    monkeypatch.setattr("exchange.database.WRITE_TIMEOUT", 0.2)
+    committing, release = threading.Event(), threading.Event()
+    commit = temp_db._commit
+
+    def slow_commit(con, batch):
+        committing.set()
+        release.wait(5)
+        commit(con, batch)
+
+    monkeypatch.setattr(temp_db, "_commit", slow_commit)
+    # 첫 쓰기가 커밋 중인 동안 두 번째 쓰기는 시작도 못 하고 시간 초과
+    first = threading.Thread(target=lambda: temp_db.excute("INSERT INTO t VALUES (1)", ()))
+    first.start()
+    assert committing.wait(5)
+    with pytest.raises(sqlite3.OperationalError, match="취소"):
+        temp_db.excute("INSERT INTO t VALUES (2)", ())
+    release.set()
+    first.join()
+    monkeypatch.setattr(temp_db, "_commit", commit)
+    # 쓰기 스레드가 취소된 쓰기를 건너뛰고 다음 쓰기를 처리
+    temp_db.excute("INSERT INTO t VALUES (3)", ())
+    assert temp_db.fetch_all("SELECT v FROM t ORDER BY v", ()) == [(1,), (3,)]
+
+
+def test_write_timeout(temp_db, monkeypatch):
+    monkeypatch.setattr("exchange.database.WRITE_TIMEOUT", 0.1)
+    monkeypatch.setattr(temp_db, "_commit", lambda con, batch: None)
+    # 쓰기 스레드가 이미 시작한 쓰기는 취소하지 못하고 결과를 알 수 없다고 알림
+    with pytest.raises(sqlite3.OperationalError, match="반영 여부"):
+        temp_db.excute("CREATE TABLE IF NOT EXISTS t (v)", {})
@@ -0,0 +1,90 @@
+import asyncio
+import pytest
+from exchange.dedup import AlertDedup
+from exchange.model import MarketOrder
+
+
+def make_order(**kwargs) -> MarketOrder:
+    values = dict(exchange="BINANCE", base="BTC", quote="USDT.P", side="entry/buy", amount=0.01, password="test")
+    return MarketOrder(**(values | kwargs))
+
+
+@pytest.fixture
+def database_url(tmp_path):
+    return str(tmp_path / "queue.db")
+
+
+def check(dedup: AlertDedup, *orders) -> list[bool]:
+    async def run():
+        return [await dedup.is_duplicate(order) for order in orders]
+
+    return asyncio.run(run())
+
+
+def test_same_order_within_window_is_duplicate(database_url):
+    dedup = AlertDedup(database_url)
+    assert check(dedup, make_order(), make_order(), make_order(amount=0.02)) == [False, True, False]
+    dedup.close()
+
+
+def test_alert_id_decides_duplicates(database_url):
+    dedup = AlertDedup(database_url)
+    orders = (make_order(alert_id="a"), make_order(alert_id="b"), make_order(alert_id="a", amount=0.5))
+    assert check(dedup, *orders) == [False, False, True]
+    dedup.close()
+
+
+def test_concurrent_alerts_run_once(database_url):
+    dedup = AlertDedup(database_url)
+
+    async def run():
+        return await asyncio.gather(*(dedup.is_duplicate(make_order(alert_id="same")) for _ in range(5)))
+
+    assert sorted(asyncio.run(run())) == [False, True, True, True, True]
+    dedup.close()
+
+
+def test_seen_alerts_survive_restart(database_url):
+    dedup = AlertDedup(database_url)
+    assert check(dedup, make_order(alert_id="a")) == [False]
+    dedup.close()
+    restarted = AlertDedup(database_url)
+    assert check(restarted, make_order(alert_id="a")) == [True]
+    restarted.close()
+
+
+def test_other_process_claim_is_respected(database_url):
+    first, second = AlertDedup(database_url), AlertDedup(database_url)
+    assert check(first, make_order(alert_id="a")) == [False]
+    assert check(second, make_order(alert_id="a")) == [True]
+    first.close()
+    second.close()
+
+
+def test_released_alert_runs_again(database_url):
+    dedup = AlertDedup(database_url)
+
+    async def run():
+        key = await dedup.acquire(make_order())
+        # 큐 접수에 실패해서 기록을 되돌림
+        await dedup.release(key)
+        return await dedup.acquire(make_order()), await dedup.acquire(make_order())
+
+    retried, duplicate = asyncio.run(run())
+    assert retried is not None
+    assert duplicate is None
+    dedup.close()
+    # 다시 접수한 알림은 재시작 후에도 중복으로 남음
+    restarted = AlertDedup(database_url)
+    assert check(restarted, make_order()) == [True]
+    restarted.close()
+
+
+def test_dedup_opens_database_on_first_use(tmp_path, monkeypatch):
+    database_url = tmp_path / "configured.db"
+    monkeypatch.setattr("exchange.dedup.get_queue_database_url", lambda: str(database_url))
+    dedup = AlertDedup()
+    assert not database_url.exists()
+    asyncio.run(dedup.start())
+    assert database_url.exists()
+    dedup.close()
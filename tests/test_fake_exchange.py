@@ -0,0 +1,119 @@
+import asyncio
+import socket
+import threading
+import time
+import ccxt
+import httpx
+import pytest
+import uvicorn
+from exchange import retry as retry_module
+from exchange.binance import Binance
+from exchange.fake import FakeServer, create_app
+from exchange.fake.app import DIALECTS
+from exchange.markets import market_snapshot
+from exchange.model import MarketOrder
+from exchange.pexchange import apply_base_url
+from exchange.retry import Action, find_rule
+
+# 거래소별 포지션 모드 불일치 에러 preset
+POSITION_MODE_PRESETS = {
+    "BINANCE": ("binance", "position_side"),
+    "BYBIT": ("bybit", "position_idx"),
+    "OKX": ("okx", "pos_side"),
+    "BITGET": ("bitget", "unilateral_position"),
+}
+
+
+@pytest.fixture(scope="module")
+def fake_exchange():
+    """가짜 거래소를 스레드에서 띄우고 (FakeServer, 주소) 를 돌려줌"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    fake = FakeServer()
+    server = uvicorn.Server(
+        uvicorn.Config(create_app(fake), host="127.0.0.1", port=port, log_level="warning")
+    )
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not server.started:
+        assert time.monotonic() < deadline, "가짜 거래소가 뜨지 않았습니다"
+        time.sleep(0.05)
+    yield fake, f"http://127.0.0.1:{port}"
+    server.should_exit = True
+    thread.join(timeout=5)
+
+
+@pytest.fixture
+def fake(fake_exchange, tmp_path, monkeypatch):
+    fake, base_url = fake_exchange
+    fake.reset()
+    # 다른 테스트/실제 실행의 마켓 스냅샷을 쓰지 않음
+    monkeypatch.setattr(market_snapshot, "directory", tmp_path)
+    return fake, base_url
+
+
+def make_order(**kwargs) -> MarketOrder:
+    values = dict(exchange="BINANCE", base="BTC", quote="USDT.P", side="entry/buy", amount=0.01, password="test")
+    return MarketOrder(**(values | kwargs))
+
+
+def run_binance(base_url: str, order_info: MarketOrder):
+    async def run():
+        bot = Binance("key", "secret", market_type="swap")
+        apply_base_url(bot.client, f"{base_url}/binance")
+        try:
+            await bot.load_markets()
+            bot.init_info(order_info)
+            return bot, await bot.market_entry(order_info)
+        finally:
+            await bot.close()
+
+    return asyncio.run(run())
+
+
+def test_market_entry_fills_on_fake_exchange(fake):
+    fake, base_url = fake
+    bot, result = run_binance(base_url, make_order())
+    assert result["status"] == "closed"
+    assert result["filled"] == pytest.approx(0.01)
+    [position] = fake.account("binance-futures").get_positions()
+    assert position["symbol"] == "BTCUSDT"
+    assert position["signed"] == pytest.approx(0.01)
+
+
+def test_injected_position_mode_error_takes_flip_path(fake, monkeypatch):
+    fake, base_url = fake
+    # 계정은 헤지 모드, 봇은 one-way 로 알고 있음
+    fake.account("binance-futures").hedge_mode = True
+    response = httpx.post(
+        f"{base_url}/_fake/errors",
+        json={"exchange": "binance", "preset": "position_side", "path": "/fapi/v1/order"},
+    )
+    assert response.status_code == 200
+    actions = []
+    find = retry_module.find_rule
+
+    def record(exchange, e):
+        rule = find(exchange, e)
+        actions.append(rule.action if rule is not None else None)
+        return rule
+
+    monkeypatch.setattr(retry_module, "find_rule", record)
+    bot, result = run_binance(base_url, make_order())
+    assert actions == [Action.FLIP_POSITION_MODE]
+    assert bot.position_mode == "hedge"
+    assert result["status"] == "closed"
+    [position] = fake.account("binance-futures").get_positions()
+    assert position["position_side"] == "LONG"
+
+
+@pytest.mark.parametrize("exchange", POSITION_MODE_PRESETS)
+def test_position_mode_presets_match_retry_tables(exchange):
+    dialect, preset = POSITION_MODE_PRESETS[exchange]
+    status, body = DIALECTS[dialect].ERRORS[preset]
+    # ccxt 가 거래소 에러를 올리는 형식: "<exchange id> <응답 본문>"
+    e = ccxt.ExchangeError(f"{dialect} {httpx.Response(status, json=body).text}")
+    rule = find_rule(exchange, e)
+    assert rule is not None and rule.action == Action.FLIP_POSITION_MODE
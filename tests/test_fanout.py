@@ -0,0 +1,66 @@
+import pytest
+from pydantic import ValidationError
+from exchange.fanout import split_order
+from exchange.model import MarketOrder
+from exchange.pexchange import get_client_key, get_market_type, get_settings_prefix
+
+
+def make_order(**kwargs) -> MarketOrder:
+    values = dict(exchange="BINANCE", base="BTC", quote="USDT.P", side="entry/buy", amount=0.01, password="test")
+    return MarketOrder(**(values | kwargs))
+
+
+def client_key(order_info: MarketOrder):
+    return get_client_key(
+        order_info.exchange,
+        order_info.kis_number,
+        get_market_type(order_info.exchange, order_info),
+        order_info.account,
+    )
+
+
+def test_single_crypto_account_list_is_not_fanout():
+    order = make_order(account=["sub1"])
+    assert order.account == "sub1"
+    assert not order.is_fanout
+    key = client_key(order)
+    assert key.account == "sub1"
+    assert len({key}) == 1
+
+
+def test_single_kis_number_list_is_not_fanout():
+    order = make_order(exchange="KRX", base="005930", quote="KRW", side="buy", amount=1, kis_number=[2])
+    assert order.kis_number == 2
+    assert not order.is_fanout
+    key = client_key(order)
+    assert key.account == "2"
+    assert get_settings_prefix(key) == "KIS2"
+
+
+def test_empty_account_list_is_rejected():
+    with pytest.raises(ValidationError):
+        make_order(account=[])
+
+
+def test_split_order_per_account():
+    order = make_order(account=["sub1", "sub2"], amounts=[0.1, 0.2])
+    assert order.is_fanout
+    orders = split_order(order)
+    assert [(o.account, o.amount, o.amounts) for o in orders] == [
+        ("sub1", 0.1, None),
+        ("sub2", 0.2, None),
+    ]
+    assert len({client_key(o) for o in orders}) == 2
+
+
+def test_single_account_with_amounts_uses_that_amount():
+    order = make_order(kis_number=[3], amounts=[5], exchange="KRX", base="005930", quote="KRW", side="buy")
+    assert order.is_fanout
+    [account_order] = split_order(order)
+    assert account_order.kis_number == 3
+    assert account_order.amount == 5
+
+
+def test_amounts_length_must_match_accounts():
+    with pytest.raises(ValidationError):
+        make_order(account=["sub1", "sub2"], amounts=[0.1])
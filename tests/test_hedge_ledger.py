@@ -0,0 +1,62 @@
+import asyncio
+from types import SimpleNamespace
+import pytest
+from exchange import hedge_ledger as hedge_ledger_module
+from exchange.hedge_ledger import HedgeLedger
+
+
+def make_record(id, exchange, base, amount, quote="USDT.P"):
+    return SimpleNamespace(id=id, exchange=exchange, base=base, quote=quote, amount=amount)
+
+
+@pytest.fixture
+def ledger(temp_db, monkeypatch):
+    monkeypatch.setattr(hedge_ledger_module, "db", temp_db)
+    ledger = HedgeLedger()
+    ledger.init_db()
+    return ledger
+
+
+def test_totals_after_add_and_close(ledger):
+    async def run():
+        await ledger.add("BINANCE", "BTC", "USDT.P", -0.1)
+        await ledger.add("BINANCE", "BTC", "USDT.P", -0.2)
+        await ledger.add("UPBIT", "BTC", "KRW", 0.3)
+        await ledger.add("BYBIT", "ETH", "USDT.P", -1.0)
+        totals = ledger.get_totals("BTC")
+        closed = await ledger.close("BTC", "BINANCE")
+        return totals, closed
+
+    totals, closed = asyncio.run(run())
+    assert totals == pytest.approx({"BINANCE": -0.3, "UPBIT": 0.3})
+    assert closed == pytest.approx(-0.3)
+    assert ledger.get_totals("BTC") == pytest.approx({"BINANCE": 0.0, "UPBIT": 0.3})
+    assert ledger.get_totals("ETH", "BYBIT") == {"BYBIT": -1.0, "UPBIT": 0.0}
+
+    # 다시 불러와도 종료한 기록은 합계에 들어가지 않음
+    reloaded = HedgeLedger()
+    reloaded.load()
+    assert reloaded.get_totals("BTC") == pytest.approx({"BINANCE": 0.0, "UPBIT": 0.3})
+
+
+def test_reconcile_imports_pocketbase_records_once(ledger, monkeypatch):
+    records = [
+        make_record("pb1", "BINANCE", "BTC", -0.5),
+        make_record("pb2", "UPBIT", "BTC", 0.5, quote="KRW"),
+        make_record("pb3", "KRX", "005930", 3, quote="KRW"),
+    ]
+    monkeypatch.setattr(hedge_ledger_module.pocket, "get_full_list", lambda collection: records)
+
+    asyncio.run(ledger.add("BINANCE", "BTC", "USDT.P", -0.1))
+    ledger.reconcile()
+    assert ledger.get_totals("BTC") == pytest.approx({"BINANCE": -0.6, "UPBIT": 0.5})
+    # 주식 기록은 헷지 장부로 가져오지 않음
+    assert ledger.get_amount("005930", "KRX") == 0.0
+
+    # 이미 가져온 기록은 다시 더하지 않음
+    ledger.reconcile()
+    assert ledger.get_totals("BTC") == pytest.approx({"BINANCE": -0.6, "UPBIT": 0.5})
+
+    reloaded = HedgeLedger()
+    reloaded.load()
+    assert reloaded.get_totals("BTC") == pytest.approx({"BINANCE": -0.6, "UPBIT": 0.5})
@@ -0,0 +1,54 @@
+import asyncio
+import pytest
+from exchange.stock.limiter import KisRateLimiter
+from exchange.stock.quote import KisQuoteCache
+from exchange.utility import settings_store
+
+
+class FakeKis:
+    kis_number = 1
+
+    def __init__(self, rate: float):
+        self.limiter = KisRateLimiter(rate)
+        self.requests = 0
+
+    async def fetch_current_price_async(self, exchange, ticker):
+        self.requests += 1
+        return 100.0
+
+
+@pytest.fixture
+def quote_settings(monkeypatch):
+    def apply(**values):
+        monkeypatch.setattr(settings_store, "_snapshot", settings_store.current.copy(update=values))
+
+    return apply
+
+
+def test_poll_interval_scales_with_symbols(quote_settings):
+    quote_settings(KIS_QUOTE_POLL_INTERVAL=1.0, KIS_QUOTE_RATE_SHARE=0.5)
+    cache = KisQuoteCache(FakeKis(rate=1.8))
+    cache._tasks = {("NASDAQ", "AAPL"): None}
+    assert cache.get_poll_interval() == pytest.approx(1.11, abs=0.01)
+    cache._tasks = {("NASDAQ", symbol): None for symbol in ("AAPL", "TSLA", "NVDA")}
+    # 모의투자 1.8회/초의 절반 안에서 3종목 갱신
+    assert cache.get_poll_interval() == pytest.approx(3 / 0.9)
+    # 실전 계좌는 설정한 주기 그대로
+    cache = KisQuoteCache(FakeKis(rate=18))
+    cache._tasks = {("NASDAQ", symbol): None for symbol in ("AAPL", "TSLA", "NVDA")}
+    assert cache.get_poll_interval() == 1.0
+
+
+def test_poll_skips_fresh_quote(quote_settings):
+    quote_settings(KIS_QUOTE_POLL_INTERVAL=0.05, KIS_QUOTE_MAX_AGE=10.0, KIS_QUOTE_IDLE=0.3)
+    kis = FakeKis(rate=1000)
+    cache = KisQuoteCache(kis)
+
+    async def run():
+        assert await cache.get_price("NASDAQ", "AAPL") == 100.0
+        await asyncio.sleep(0.5)
+        cache.stop()
+
+    asyncio.run(run())
+    # 첫 조회 시세가 계속 유효해서 갱신 요청이 없음
+    assert kis.requests == 1
@@ -0,0 +1,53 @@
+import json
+import pytest
+from exchange.stock.schemas import BaseUrls
+import kis_reference
+
+
+@pytest.fixture(params=["01", "29"], ids=["live", "paper"])
+def kis(request):
+    kis = kis_reference.create_kis(request.param)
+    yield kis
+    kis.close_session()
+
+
+def assert_same(new, old):
+    assert new == old
+    # httpx 가 실제로 보내는 JSON 도 같아야 함
+    assert json.dumps(new, sort_keys=True) == json.dumps(old, sort_keys=True)
+
+
+def test_base_url_follows_account(kis):
+    expected = BaseUrls.paper_base_url if kis.is_paper else BaseUrls.base_url
+    assert kis.base_url == expected.value
+
+
+@pytest.mark.parametrize("exchange", ["KRX", "NASDAQ", "NYSE", "AMEX"])
+@pytest.mark.parametrize("order_type", ["market", "limit"])
+@pytest.mark.parametrize("side", ["buy", "sell"])
+def test_order_request_matches_per_call_construction(kis, exchange, order_type, side):
+    args = (exchange, "005930" if exchange == "KRX" else "AAPL", order_type, side, 3.0, 71000, 0.01, 0.4 if side == "sell" else 190.123)
+    endpoint, body, headers = kis.build_order_request(*args)
+    old_endpoint, old_body, old_headers = kis_reference.build_order_request(kis, *args)
+    assert endpoint == old_endpoint
+    assert_same(body, old_body)
+    assert_same(headers, old_headers)
+
+
+@pytest.mark.parametrize("exchange", ["KRX", "NASDAQ", "NYSE", "AMEX"])
+def test_ticker_request_matches_per_call_construction(kis, exchange):
+    new = kis.build_ticker_request(exchange, "TSLA")
+    old = kis_reference.build_ticker_request(kis, exchange, "TSLA")
+    assert new[0] == old[0]
+    assert_same(new[1], old[1])
+    assert_same(new[2], old[2])
+
+
+def test_templates_follow_token_and_are_not_mutated(kis):
+    _, body, headers = kis.build_order_request("KRX", "005930", "market", "buy", 1)
+    body["PDNO"] = "changed"
+    kis.set_token("new-token")
+    _, body, new_headers = kis.build_order_request("KRX", "005930", "market", "buy", 1)
+    assert body["PDNO"] == "005930"
+    assert new_headers["authorization"] == "Bearer new-token"
+    assert new_headers == kis_reference.build_order_request(kis, "KRX", "005930", "market", "buy", 1)[2]
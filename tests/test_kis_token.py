@@ -0,0 +1,80 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import pytest
+from exchange.stock import token as token_module
+from exchange.stock.limiter import KisRateLimiter
+from exchange.stock.token import TOKEN_TIME_FORMAT, KisTokenManager
+
+
+class FakeDb:
+    def __init__(self):
+        self.auth = {}
+
+    def get_auth(self, exchange):
+        return self.auth.get(exchange)
+
+    def set_auth(self, exchange, access_token, expired):
+        self.auth[exchange] = (access_token, expired)
+
+
+class FakeKis:
+    def __init__(self):
+        self.auth_id = "KIS1"
+        self.key = "key"
+        self.secret = "secret"
+        self.limiter = KisRateLimiter(1000)
+        self.access_token = None
+        self.issued = 0
+        self._lock = threading.Lock()
+
+    def create_auth(self, key, secret):
+        with self._lock:
+            self.issued += 1
+            issued = self.issued
+        time.sleep(0.05)
+        expired = (datetime.now() + timedelta(days=1)).strftime(TOKEN_TIME_FORMAT)
+        return f"token-{issued}", expired
+
+    def set_token(self, access_token):
+        self.access_token = access_token
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    monkeypatch.setattr(token_module, "db", FakeDb())
+    return KisTokenManager()
+
+
+def test_concurrent_invalidate_async_issues_once(manager):
+    kis = FakeKis()
+    manager.issue(kis)
+    rejected = kis.access_token
+
+    async def run():
+        await asyncio.gather(*(manager.invalidate_async(kis, rejected) for _ in range(10)))
+
+    asyncio.run(run())
+    assert kis.issued == 2
+    assert kis.access_token == "token-2"
+
+
+def test_late_invalidate_reuses_newer_token(manager):
+    kis = FakeKis()
+    manager.issue(kis)
+    asyncio.run(manager.refresh(kis))
+    assert kis.access_token == "token-2"
+    # 재발급 전에 나간 주문이 예전 토큰으로 거부됨
+    asyncio.run(manager.invalidate_async(kis, "token-1"))
+    assert kis.issued == 2
+
+
+def test_concurrent_invalidate_from_threads_issues_once(manager):
+    kis = FakeKis()
+    manager.issue(kis)
+    rejected = kis.access_token
+    with ThreadPoolExecutor(8) as executor:
+        list(executor.map(lambda _: manager.invalidate(kis, rejected), range(8)))
+    assert kis.issued == 2
@@ -0,0 +1,52 @@
+import asyncio
+import time
+from exchange.stock.limiter import PRIORITY_AUTH, PRIORITY_CLOSE, PRIORITY_ORDER, PRIORITY_QUOTE, KisRateLimiter
+
+
+def test_waiters_are_served_by_priority():
+    limiter = KisRateLimiter(rate=50)
+    served = []
+
+    async def request(name, priority):
+        await limiter.acquire(priority)
+        served.append(name)
+
+    async def run():
+        await limiter.acquire()  # 버킷을 비워서 이후 요청이 모두 대기하게 함
+        await asyncio.gather(
+            request("quote", PRIORITY_QUOTE),
+            request("buy", PRIORITY_ORDER),
+            request("sell", PRIORITY_CLOSE),
+            request("auth", PRIORITY_AUTH),
+        )
+
+    asyncio.run(run())
+    assert served == ["auth", "sell", "buy", "quote"]
+
+
+def test_rate_is_respected():
+    limiter = KisRateLimiter(rate=20)
+
+    async def run():
+        started_at = time.monotonic()
+        await asyncio.gather(*(limiter.acquire() for _ in range(5)))
+        return time.monotonic() - started_at
+
+    # 처음 1개는 바로, 나머지 4개는 0.05초 간격
+    assert asyncio.run(run()) >= 0.19
+
+
+def test_cancelled_waiter_gives_token_back():
+    limiter = KisRateLimiter(rate=20)
+
+    async def run():
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire(PRIORITY_AUTH))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        started_at = time.monotonic()
+        await limiter.acquire()
+        return time.monotonic() - started_at
+
+    # 취소된 요청 몫의 토큰을 다음 요청이 바로 사용
+    assert asyncio.run(run()) < 0.09
@@ -0,0 +1,68 @@
+import orjson
+from loguru import logger
+from exchange.model import MarketOrder
+from exchange.utility import LogMaker
+from exchange.utility.LogMaker import format_json
+
+
+def test_format_json_with_several_sinks():
+    first, second = [], []
+    ids = [logger.add(first.append, format=format_json), logger.add(second.append, format=format_json)]
+    try:
+        logger.bind(order_id="abc").info("주문")
+    finally:
+        for id in ids:
+            logger.remove(id)
+
+    for lines in (first, second):
+        [line] = lines
+        data = orjson.loads(str(line))
+        assert data["message"] == "주문"
+        assert data["order_id"] == "abc"
+        assert "_json" not in data
+
+
+def capture(function, *args) -> list[dict]:
+    lines = []
+    id = logger.add(lines.append, format=format_json)
+    try:
+        function(*args)
+    finally:
+        logger.remove(id)
+    return [orjson.loads(str(line)) for line in lines]
+
+
+def make_order() -> MarketOrder:
+    return MarketOrder(exchange="BINANCE", base="BTC", quote="USDT.P", side="entry/buy", amount=0.01, password="test")
+
+
+def test_alert_message_is_structured_in_json(monkeypatch):
+    monkeypatch.setattr(LogMaker, "pretty_console", True)
+    [data] = capture(LogMaker.print_alert_message, make_order())
+    assert data["message"] == "주문 성공 웹훅메세지"
+    assert data["order"]["base"] == "BTC"
+    assert data["order"]["amount"] == 0.01
+    assert "password" not in data["order"]
+    assert "_pretty" not in data
+
+
+def test_alert_message_skips_pretty_text_without_pretty_console(monkeypatch):
+    def pformat(value):
+        raise AssertionError("pformat 을 호출하면 안 됨")
+
+    monkeypatch.setattr(LogMaker, "pretty_console", False)
+    monkeypatch.setattr(LogMaker, "pformat", pformat)
+    [data] = capture(LogMaker.print_alert_message, make_order(), "실패")
+    assert data["level"] == "ERROR"
+    assert data["order"]["side"] == "buy"
+
+
+def test_console_format_appends_pretty_text():
+    lines = []
+    id = logger.add(lines.append, format=LogMaker.format_console, colorize=False)
+    try:
+        logger.bind(_pretty="{'base': 'BTC'}").info("주문")
+    finally:
+        logger.remove(id)
+    [line] = lines
+    assert str(line).rstrip().endswith("주문\n{'base': 'BTC'}")
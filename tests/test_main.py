@@ -0,0 +1,177 @@
+import asyncio
+import pytest
+import main
+from exchange.dedup import AlertDedup
+from exchange.model import MarketOrder
+
+
+def make_order(**kwargs) -> MarketOrder:
+    values = dict(exchange="BINANCE", base="BTC", quote="USDT.P", side="entry/buy", amount=0.01, password="test")
+    return MarketOrder(**(values | kwargs))
+
+
+@pytest.fixture
+def dedup(tmp_path, monkeypatch):
+    dedup = AlertDedup(str(tmp_path / "queue.db"))
+    monkeypatch.setattr(main, "alert_dedup", dedup)
+    yield dedup
+    dedup.close()
+
+
+def test_order_retry_runs_after_enqueue_failure(dedup, monkeypatch):
+    jobs = []
+
+    async def put(order_info, received_at=None, trace=None):
+        if not jobs:
+            jobs.append(None)
+            raise OSError("disk I/O error")
+        jobs.append(order_info)
+        return len(jobs)
+
+    monkeypatch.setattr(main.order_queue, "put", put)
+
+    async def run():
+        with pytest.raises(OSError):
+            await main.order(make_order())
+        return await main.order(make_order()), await main.order(make_order())
+
+    retried, duplicate = asyncio.run(run())
+    assert retried == {"result": "success", "job_id": 2}
+    assert duplicate == {"result": "duplicate"}
+
+
+@pytest.fixture
+def executed(monkeypatch):
+    """/orders 가 실행한 주문 (거래소 대신 기록만)"""
+    executed = []
+
+    async def get_bot(*args):
+        return None
+
+    async def run(order_info, received_at=None):
+        executed.append(order_info)
+        await asyncio.sleep(0)
+        return len(executed), {"id": str(len(executed))}
+
+    monkeypatch.setattr(main, "get_bot", get_bot)
+    monkeypatch.setattr(main.order_queue, "run", run)
+    return executed
+
+
+def test_orders_keeps_identical_legs_without_alert_id(dedup, executed):
+    results = asyncio.run(main.orders([make_order(), make_order()]))
+    assert [result["result"] for result in results] == ["success", "success"]
+    assert len(executed) == 2
+
+
+def test_orders_drops_repeated_alert_id(dedup, executed):
+    results = asyncio.run(main.orders([make_order(alert_id="a"), make_order(alert_id="a", base="ETH")]))
+    assert [result["result"] for result in results] == ["success", "duplicate"]
+    assert len(executed) == 1
+
+
+def test_orders_results_follow_request_order(dedup, monkeypatch):
+    executed = []
+
+    async def get_bot(*args):
+        return None
+
+    async def run(order_info, received_at=None):
+        # BTC 주문이 더 오래 걸려서 ETH 주문이 먼저 끝남
+        await asyncio.sleep(0.02 if order_info.base == "BTC" else 0)
+        executed.append((order_info.base, order_info.amount))
+        return len(executed), {"id": f"{order_info.base} {order_info.amount}"}
+
+    monkeypatch.setattr(main, "get_bot", get_bot)
+    monkeypatch.setattr(main.order_queue, "run", run)
+    legs = [
+        make_order(base="BTC", amount=1),
+        make_order(base="ETH", amount=2),
+        make_order(base="BTC", side="close/sell", amount=3),
+        make_order(base="ETH", side="close/sell", amount=4),
+    ]
+    results = asyncio.run(main.orders(legs))
+    assert [result["id"] for result in results] == ["BTC 1.0", "ETH 2.0", "BTC 3.0", "ETH 4.0"]
+    # 같은 거래소/계좌/종목 묶음은 요청 순서대로 실행
+    assert executed == [("ETH", 2), ("ETH", 4), ("BTC", 1), ("BTC", 3)]
+
+
+def test_orders_reports_failed_leg_in_place(dedup, monkeypatch):
+    async def get_bot(*args):
+        return None
+
+    async def run(order_info, received_at=None):
+        if order_info.base == "ETH":
+            raise ValueError("잔고 부족")
+        return 1, {"id": "1"}
+
+    monkeypatch.setattr(main, "get_bot", get_bot)
+    monkeypatch.setattr(main.order_queue, "run", run)
+    results = asyncio.run(main.orders([make_order(base="ETH"), make_order()]))
+    assert results[0] == {"result": "error", "error": "잔고 부족"}
+    assert results[1]["result"] == "success"
+
+
+class HedgeBot:
+    def __init__(self):
+        self.orders = []
+
+    def init_info(self, order_info):
+        return order_info
+
+    async def market_close(self, order_info):
+        self.orders.append(("close", order_info.exchange, order_info.amount))
+
+    async def market_sell(self, order_info):
+        self.orders.append(("sell", order_info.exchange, order_info.amount))
+
+
+@pytest.fixture
+def hedge_ledger(monkeypatch):
+    from exchange.hedge_ledger import HedgeLedger
+
+    ledger = HedgeLedger()
+    closed = []
+
+    async def close(base, exchange):
+        closed.append((base, exchange))
+        return ledger._totals.pop((base, exchange), 0.0)
+
+    ledger.closed = closed
+    monkeypatch.setattr(ledger, "close", close)
+    monkeypatch.setattr(main, "hedge_ledger", ledger)
+    return ledger
+
+
+def run_hedge_off(monkeypatch) -> tuple[dict, HedgeBot, HedgeBot]:
+    from fastapi import BackgroundTasks
+    from exchange.model import HedgeData
+
+    bot, upbit = HedgeBot(), HedgeBot()
+
+    async def get_bot(exchange_name, *args, **kwargs):
+        return upbit if exchange_name == "UPBIT" else bot
+
+    monkeypatch.setattr(main, "get_bot", get_bot)
+    hedge_data = HedgeData(password="test", exchange="BINANCE", base="BTC", hedge="OFF")
+    result = asyncio.run(main.hedge(hedge_data, BackgroundTasks()))
+    return result, bot, upbit
+
+
+def test_hedge_off_closes_one_sided_leftover(hedge_ledger, monkeypatch):
+    # 보상 주문이 실패해서 업비트 쪽만 장부에 남은 경우
+    hedge_ledger._totals = {("BTC", "UPBIT"): 0.5}
+    result, bot, upbit = run_hedge_off(monkeypatch)
+    assert result == {"result": "success"}
+    assert bot.orders == []
+    assert upbit.orders == [("sell", "UPBIT", 0.5)]
+    assert hedge_ledger.closed == [("BTC", "UPBIT")]
+
+
+def test_hedge_off_closes_both_sides(hedge_ledger, monkeypatch):
+    hedge_ledger._totals = {("BTC", "BINANCE"): 0.1, ("BTC", "UPBIT"): 0.1}
+    result, bot, upbit = run_hedge_off(monkeypatch)
+    assert result == {"result": "success"}
+    assert bot.orders == [("close", "BINANCE", 0.1)]
+    assert upbit.orders == [("sell", "UPBIT", 0.1)]
+    assert hedge_ledger.get_totals("BTC", "BINANCE") == {"BINANCE": 0.0, "UPBIT": 0.0}
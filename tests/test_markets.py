@@ -0,0 +1,66 @@
+import asyncio
+import time
+import orjson
+from exchange.markets import MarketSnapshot
+
+MARKETS = {"BTC/USDT": {"id": "BTCUSDT", "symbol": "BTC/USDT"}}
+
+
+class Client:
+    id = "binance"
+
+    def __init__(self):
+        self.options = {}
+        self.markets = None
+        self.currencies = None
+        self.loaded = 0
+
+    async def load_markets(self, reload=False):
+        self.loaded += 1
+        self.markets = {"ETH/USDT": {"id": "ETHUSDT", "symbol": "ETH/USDT"}}
+        return self.markets
+
+    def set_markets(self, markets, currencies=None):
+        self.markets = markets
+        self.currencies = currencies
+
+
+def write_snapshot(snapshot: MarketSnapshot, client: Client, saved_at: float):
+    path = snapshot.get_path(client)
+    path.write_bytes(orjson.dumps({"saved_at": saved_at, "markets": MARKETS, "currencies": None}))
+    return path
+
+
+def hydrate(snapshot: MarketSnapshot, client: Client):
+    async def run():
+        await snapshot.hydrate(client)
+        # 백그라운드 갱신이 끝날 시간
+        await asyncio.sleep(0.05)
+        snapshot.stop(client)
+
+    asyncio.run(run())
+
+
+def test_fresh_snapshot_skips_load_markets(tmp_path):
+    snapshot, client = MarketSnapshot(tmp_path), Client()
+    write_snapshot(snapshot, client, time.time())
+    hydrate(snapshot, client)
+    assert client.loaded == 0
+    assert client.markets == MARKETS
+
+
+def test_expired_snapshot_is_used_then_refreshed(tmp_path):
+    snapshot, client = MarketSnapshot(tmp_path), Client()
+    path = write_snapshot(snapshot, client, time.time() - snapshot.ttl - 1)
+    hydrate(snapshot, client)
+    assert client.loaded == 1
+    assert "ETH/USDT" in client.markets
+    # 갱신한 마켓을 다음 시작을 위해 저장
+    assert "ETH/USDT" in orjson.loads(path.read_bytes())["markets"]
+
+
+def test_missing_snapshot_loads_and_saves(tmp_path):
+    snapshot, client = MarketSnapshot(tmp_path), Client()
+    hydrate(snapshot, client)
+    assert client.loaded == 1
+    assert snapshot.get_path(client).exists()
@@ -0,0 +1,37 @@
+from exchange import metrics
+
+
+def test_histogram_renders_cumulative_buckets(monkeypatch):
+    monkeypatch.setattr(metrics, "registry", [])
+    histogram = metrics.Histogram(
+        "poabot_test_seconds", "테스트 지연 시간", ("exchange",), buckets=(0.1, 1.0)
+    )
+    histogram.observe(0.05, "BINANCE")
+    histogram.observe(0.5, "BINANCE")
+    histogram.observe(3.0, "BINANCE")
+
+    assert metrics.render().splitlines() == [
+        "# HELP poabot_test_seconds 테스트 지연 시간",
+        "# TYPE poabot_test_seconds histogram",
+        'poabot_test_seconds_bucket{exchange="BINANCE",le="0.1"} 1',
+        'poabot_test_seconds_bucket{exchange="BINANCE",le="1.0"} 2',
+        'poabot_test_seconds_bucket{exchange="BINANCE",le="+Inf"} 3',
+        'poabot_test_seconds_sum{exchange="BINANCE"} 3.55',
+        'poabot_test_seconds_count{exchange="BINANCE"} 3',
+    ]
+
+
+def test_bucket_boundary_is_inclusive(monkeypatch):
+    monkeypatch.setattr(metrics, "registry", [])
+    histogram = metrics.Histogram("poabot_test_seconds", "테스트", buckets=(0.1, 1.0))
+    histogram.observe(0.1)
+    lines = metrics.render().splitlines()
+    assert 'poabot_test_seconds_bucket{le="0.1"} 1' in lines
+
+
+def test_counter_escapes_label_values(monkeypatch):
+    monkeypatch.setattr(metrics, "registry", [])
+    counter = metrics.Counter("poabot_test_total", "테스트", ("name",))
+    counter.inc('a"b')
+    counter.inc('a"b', amount=2)
+    assert 'poabot_test_total{name="a\\"b"} 3.0' in metrics.render().splitlines()
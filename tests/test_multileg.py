@@ -0,0 +1,78 @@
+import asyncio
+import pytest
+from exchange.multileg import Leg, MultiLegError, execute_legs
+
+
+class Order:
+    """주문/되돌리기 호출을 기록하는 가짜 주문"""
+
+    def __init__(self, name, error=None, delay=0.0, compensate_error=None):
+        self.name = name
+        self.error = error
+        self.delay = delay
+        self.compensate_error = compensate_error
+        self.compensated = []
+
+    async def execute(self):
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return f"{self.name}-result"
+
+    async def compensate(self, result):
+        if self.compensate_error is not None:
+            raise self.compensate_error
+        self.compensated.append(result)
+
+    def leg(self) -> Leg:
+        return Leg(self.name, self.execute, self.compensate)
+
+
+def test_all_legs_succeed():
+    upbit, binance = Order("upbit"), Order("binance")
+    results = asyncio.run(execute_legs([upbit.leg(), binance.leg()], timeout=1))
+    assert results == {"upbit": "upbit-result", "binance": "binance-result"}
+    assert upbit.compensated == binance.compensated == []
+
+
+def test_failed_leg_compensates_the_others():
+    upbit, binance = Order("upbit"), Order("binance", error=Exception("margin"))
+    with pytest.raises(MultiLegError) as info:
+        asyncio.run(execute_legs([upbit.leg(), binance.leg()], timeout=1))
+    assert upbit.compensated == ["upbit-result"]
+    assert binance.compensated == []
+    assert list(info.value.errors) == ["binance"]
+    assert info.value.compensated == ["upbit"]
+
+
+def test_compensation_error_is_reported():
+    upbit = Order("upbit", compensate_error=Exception("no balance"))
+    binance = Order("binance", error=Exception("margin"))
+    with pytest.raises(MultiLegError) as info:
+        asyncio.run(execute_legs([upbit.leg(), binance.leg()], timeout=1))
+    assert info.value.compensated == []
+    assert str(info.value.compensation_errors["upbit"]) == "no balance"
+    assert "upbit 되돌리기 실패" in str(info.value)
+
+
+def test_leg_without_compensate_is_not_listed():
+    upbit = Order("upbit")
+    binance = Order("binance", error=Exception("margin"))
+    with pytest.raises(MultiLegError) as info:
+        asyncio.run(execute_legs([Leg("upbit", upbit.execute), binance.leg()], timeout=1))
+    assert info.value.compensated == []
+
+
+def test_late_leg_is_compensated_when_it_finishes():
+    upbit, binance = Order("upbit"), Order("binance", delay=0.2)
+
+    async def run():
+        with pytest.raises(MultiLegError) as info:
+            await execute_legs([upbit.leg(), binance.leg()], timeout=0.05)
+        assert isinstance(info.value.errors["binance"], asyncio.TimeoutError)
+        assert upbit.compensated == ["upbit-result"]
+        assert binance.compensated == []
+        await asyncio.sleep(0.3)
+
+    asyncio.run(run())
+    assert binance.compensated == ["binance-result"]
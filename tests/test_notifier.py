@@ -0,0 +1,82 @@
+import httpx
+import orjson
+import pytest
+from dhooks import Embed
+from exchange.utility import notifier as notifier_module
+from exchange.utility.notifier import DiscordNotifier
+
+
+class Webhook:
+    """웹훅 대신 요청을 기록하고 responses 에 넣은 응답을 차례로 돌려줌"""
+
+    def __init__(self):
+        self.requests: list[httpx.Request] = []
+        self.responses: list[httpx.Response] = []
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        return self.responses.pop(0) if self.responses else httpx.Response(204)
+
+    def get_payloads(self) -> list[dict]:
+        return [orjson.loads(request.content) for request in self.requests]
+
+
+@pytest.fixture
+def webhook(monkeypatch):
+    webhook = Webhook()
+
+    client = httpx.Client
+    monkeypatch.setattr(
+        notifier_module.httpx,
+        "Client",
+        lambda **kwargs: client(transport=httpx.MockTransport(webhook.handle)),
+    )
+    monkeypatch.setattr(notifier_module, "MIN_INTERVAL", 0.0)
+    return webhook
+
+
+def make_embed(date: str) -> Embed:
+    embed = Embed(title="❌ 주문 오류", description="[주문 오류가 발생했습니다]\nInsufficient margin")
+    embed.add_field(name="일시", value=date, inline=False)
+    embed.add_field(name="거래소", value="BINANCE", inline=False)
+    return embed
+
+
+def send_all(notifier: DiscordNotifier, *messages):
+    # 전송 스레드가 중간에 꺼내가지 않도록 대기열을 잡은 채로 넣음
+    with notifier._condition:
+        for message, embed in messages:
+            notifier.send(message, embed)
+    notifier.close()
+
+
+def test_repeated_embeds_with_different_times_are_merged(webhook):
+    notifier = DiscordNotifier("http://discord.test/webhook")
+    send_all(
+        notifier,
+        ("주문 오류 1", make_embed("24-01-01 00:00:01")),
+        ("주문 오류 2", make_embed("24-01-01 00:00:02")),
+    )
+    [payload] = webhook.get_payloads()
+    [embed] = payload["embeds"]
+    assert embed["footer"] == {"text": "같은 메시지 2회"}
+    assert payload["content"] == "주문 오류 1"
+
+
+def test_message_is_sent_with_embed(webhook):
+    notifier = DiscordNotifier("http://discord.test/webhook")
+    send_all(notifier, ("✅ 체결 알림", make_embed("1")), ("⚠️ 검증 오류", None))
+    [payload] = webhook.get_payloads()
+    assert payload["content"] == "✅ 체결 알림"
+    assert [embed.get("title") for embed in payload["embeds"]] == ["❌ 주문 오류", None]
+    assert payload["embeds"][1]["description"] == "⚠️ 검증 오류"
+
+
+def test_rate_limited_webhook_gives_up(webhook):
+    webhook.responses.extend(
+        httpx.Response(429, headers={"Retry-After": "0"}) for _ in range(100)
+    )
+    notifier = DiscordNotifier("http://discord.test/webhook")
+    send_all(notifier, ("메시지", None))
+    assert not notifier._thread.is_alive()
+    assert len(webhook.requests) == notifier_module.MAX_RATE_LIMITED
@@ -0,0 +1,52 @@
+import asyncio
+import pytest
+from exchange.model import MarketOrder
+from exchange.okx import Okx
+import exchange.error as error
+
+
+def make_order(**kwargs) -> MarketOrder:
+    values = dict(exchange="OKX", base="BTC", quote="USDT", side="buy", password="test")
+    return MarketOrder(**(values | kwargs))
+
+
+def get_balance(balance: dict, order_info: MarketOrder, base: str):
+    async def run():
+        okx = Okx("key", "secret", "passphrase")
+        calls = []
+
+        async def fetch_balance(currency, params=None):
+            calls.append(currency)
+            return balance
+
+        okx.account.fetch_balance = fetch_balance
+        try:
+            return await okx.get_balance(base, order_info), calls
+        finally:
+            await okx.client.close()
+
+    return asyncio.run(run())
+
+
+BALANCE = {
+    "free": {"USDT": 100.0, "BTC": 0.5},
+    "total": {"USDT": 150.0, "BTC": 0.5},
+}
+
+
+def test_get_balance_spot_buy_uses_free_quote():
+    result, calls = get_balance(BALANCE, make_order(percent=50), "USDT")
+    assert result == 100.0
+    assert calls == ["USDT"]
+
+
+def test_get_balance_entry_uses_total_when_requested():
+    order = make_order(quote="USDT.P", side="entry/buy", percent=50)
+    order.is_total = True
+    result, _ = get_balance(BALANCE, order, "USDT")
+    assert result == 150.0
+
+
+def test_get_balance_without_balance_raises():
+    with pytest.raises(error.FreeAmountNoneError):
+        get_balance(BALANCE, make_order(side="sell", percent=100), "ETH")
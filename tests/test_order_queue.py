@@ -0,0 +1,121 @@
+import asyncio
+import pytest
+from exchange import order_queue as order_queue_module
+from exchange.model import MarketOrder
+from exchange.order_queue import DONE, FAILED, INTERRUPTED_ERROR, PENDING, RUNNING, OrderQueue, load_order
+
+
+def make_order(**kwargs) -> MarketOrder:
+    values = dict(exchange="BINANCE", base="BTC", quote="USDT.P", side="entry/buy", amount=0.01, password="test")
+    return MarketOrder(**(values | kwargs))
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        {},
+        {"side": "close/sell"},
+        {"quote": "USDTPERP", "side": "entry/sell"},
+        {"quote": "USD.P", "side": "close/buy"},
+        {"exchange": "BITGET", "quote": "USDT", "side": "entry/buy"},
+        {"exchange": "UPBIT", "quote": "KRW", "side": "buy", "amount": None, "cost": 5000},
+        {"exchange": "KRX", "base": "005930", "quote": "KRW", "side": "sell", "amount": 3, "kis_number": 2},
+        {"account": ["sub1", "sub2"], "amounts": [0.1, 0.2]},
+    ],
+)
+def test_load_order_round_trip(values):
+    order = make_order(**values)
+    loaded = load_order(order.json(exclude={"password"}))
+    assert loaded.dict(exclude={"password"}) == order.dict(exclude={"password"})
+
+
+def test_replay_runs_pending_and_fails_running(tmp_path, monkeypatch):
+    notified = []
+    monkeypatch.setattr(
+        order_queue_module,
+        "log_order_error_message",
+        lambda error, order_info: notified.append((error, order_info)),
+    )
+    queue = OrderQueue(str(tmp_path / "queue.db"))
+    pending = make_order()
+    running = make_order(base="ETH", side="close/sell")
+    pending_id = queue._insert(pending, PENDING, 1.0)
+    running_id = queue._insert(running, RUNNING, 2.0)
+
+    executed = []
+
+    async def handler(order_info):
+        executed.append(order_info)
+        return {"id": "1"}
+
+    async def run():
+        await queue.start(handler, workers=1)
+        await asyncio.gather(*(q.join() for q in queue._queues))
+        await queue.stop()
+
+    try:
+        asyncio.run(run())
+        statuses = dict(queue._fetch_all("SELECT id, status FROM jobs", ()))
+        errors = dict(queue._fetch_all("SELECT id, error FROM jobs", ()))
+    finally:
+        queue.close()
+
+    [order] = executed
+    assert order.is_entry and order.is_futures and order.side == "buy"
+    assert order.unified_symbol == "BTC/USDT:USDT"
+    assert statuses == {pending_id: DONE, running_id: FAILED}
+    assert errors[running_id] == INTERRUPTED_ERROR
+    [(error, order_info)] = notified
+    assert INTERRUPTED_ERROR in error
+    assert order_info.base == "ETH" and order_info.is_close
+
+
+def test_queue_opens_database_on_first_use(tmp_path, monkeypatch):
+    database_url = tmp_path / "configured.db"
+    monkeypatch.setattr(
+        order_queue_module, "get_queue_database_url", lambda: str(database_url)
+    )
+    queue = OrderQueue()
+    assert queue.con is None and not database_url.exists()
+    queue._insert(make_order(), PENDING, 1.0)
+    assert database_url.exists()
+    queue.close()
+
+
+def run_stop(queue: OrderQueue, job_seconds: float, timeout: float) -> dict:
+    started = asyncio.Event()
+
+    async def handler(order_info):
+        started.set()
+        await asyncio.sleep(job_seconds)
+        return {"id": "1"}
+
+    async def run():
+        await queue.start(handler, workers=1)
+        await queue.put(make_order())
+        await started.wait()
+        # 실행 중에 들어온 주문은 종료 후 pending 으로 남아야 함
+        await queue.put(make_order(base="ETH"))
+        await queue.stop(timeout=timeout)
+
+    asyncio.run(run())
+    return dict(queue._fetch_all("SELECT id, status FROM jobs", ()))
+
+
+def test_stop_waits_for_running_order(tmp_path):
+    queue = OrderQueue(str(tmp_path / "queue.db"))
+    try:
+        statuses = run_stop(queue, job_seconds=0.05, timeout=5)
+    finally:
+        queue.close()
+    assert statuses == {1: DONE, 2: PENDING}
+
+
+def test_stop_cancels_running_order_after_timeout(tmp_path):
+    queue = OrderQueue(str(tmp_path / "queue.db"))
+    try:
+        statuses = run_stop(queue, job_seconds=5, timeout=0.05)
+    finally:
+        queue.close()
+    # 중단된 주문은 다음 시작 때 실패로 기록되고 알림
+    assert statuses == {1: RUNNING, 2: PENDING}
@@ -0,0 +1,65 @@
+import asyncio
+from exchange.registry import ClientKey, ExchangeRegistry
+
+KEY = ClientKey("BINANCE", "default", "swap")
+
+
+class Client:
+    def __init__(self, number: int):
+        self.number = number
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+def make_registry(close_grace: float = 0.0) -> tuple[ExchangeRegistry, list[Client]]:
+    built = []
+
+    async def factory(key):
+        # 생성 중에 다른 요청이 끼어들 수 있도록 양보
+        await asyncio.sleep(0.01)
+        built.append(Client(len(built) + 1))
+        return built[-1]
+
+    return ExchangeRegistry(factory, close_grace=close_grace), built
+
+
+def test_concurrent_get_builds_once():
+    registry, built = make_registry()
+
+    async def run():
+        return await asyncio.gather(*(registry.get(KEY) for _ in range(10)))
+
+    clients = asyncio.run(run())
+    assert len(built) == 1
+    assert all(client is built[0] for client in clients)
+
+
+def test_invalidate_rebuilds_and_retires_old_client():
+    registry, built = make_registry(close_grace=0.01)
+
+    async def run():
+        old = await registry.get(KEY)
+        registry.invalidate(KEY)
+        # 무효화만 하고 교체는 다음 조회 때
+        assert registry.lookup(KEY) is old and not old.closed
+        new = await registry.get(KEY)
+        await asyncio.sleep(0.05)
+        return old, new
+
+    old, new = asyncio.run(run())
+    assert new is not old
+    assert len(built) == 2
+    assert old.closed and not new.closed
+
+
+def test_invalidate_unknown_key_is_ignored():
+    registry, built = make_registry()
+
+    async def run():
+        registry.invalidate(KEY)
+        return await registry.get(KEY)
+
+    assert asyncio.run(run()) is built[0]
+    assert len(built) == 1
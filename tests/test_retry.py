@@ -0,0 +1,247 @@
+import asyncio
+import ccxt
+import pytest
+from exchange.model import MarketOrder
+from exchange.retry import (
+    Action,
+    find_rule,
+    flip_binance,
+    flip_bitget_one_way,
+    flip_bitget_two_way,
+    flip_bybit,
+    flip_okx,
+    get_error_code,
+    order_deadline,
+    retry,
+)
+
+
+def make_order(**kwargs) -> MarketOrder:
+    values = dict(exchange="BINANCE", base="BTC", quote="USDT.P", side="entry/buy", amount=0.01, password="test")
+    return MarketOrder(**(values | kwargs))
+
+
+class Instance:
+    def __init__(self, position_mode="one-way"):
+        self.position_mode = position_mode
+        self.leverage = None
+
+    async def set_leverage(self, leverage, symbol, order_info):
+        self.leverage = (leverage, symbol)
+
+
+# create_order(symbol, type, side, amount, price, params)
+ARGS = ("BTC/USDT:USDT", "market", "buy", 0.01, None, {})
+
+
+@pytest.mark.parametrize(
+    "exchange, error, action",
+    [
+        ("BINANCE", ccxt.ExchangeNotAvailable('binance {"code":-1001,"msg":"Internal error; unable to process your request."}'), Action.RETRY),
+        ("BINANCE", ccxt.InvalidOrder('binance {"code":-4061,"msg":"Order\'s position side does not match user\'s setting."}'), Action.FLIP_POSITION_MODE),
+        ("BINANCE", ccxt.InvalidNonce('binance {"code":-1021,"msg":"Timestamp for this request is outside of the recvWindow."}'), Action.RESYNC_CLOCK),
+        ("BYBIT", ccxt.InvalidOrder('bybit {"retCode":10001,"retMsg":"position idx not match position mode","result":{}}'), Action.FLIP_POSITION_MODE),
+        ("BYBIT", ccxt.ExchangeError('bybit {"retCode":10002,"retMsg":"invalid request, please check your server timestamp or recv_window param"}'), Action.RESYNC_CLOCK),
+        ("OKX", ccxt.InvalidOrder('okx {"code":"1","data":[{"sCode":"51000","sMsg":"Parameter posSide error "}],"msg":"All operations failed"}'), Action.FLIP_POSITION_MODE),
+        ("BITGET", ccxt.ExchangeError('bitget {"code":"40774","msg":"The order type for unilateral position must also be the unilateral position type."}'), Action.FLIP_POSITION_MODE),
+        ("BITGET", ccxt.ExchangeError('bitget {"code":"40775","msg":"The order type for two-way positions must also be the two-way positions type."}'), Action.FLIP_POSITION_MODE),
+    ],
+)
+def test_find_rule(exchange, error, action):
+    rule = find_rule(exchange, error)
+    assert rule is not None
+    assert rule.action == action
+
+
+def test_find_rule_routes_bitget_modes_to_their_handlers():
+    one_way = ccxt.ExchangeError('bitget {"code":"40774","msg":"unilateral position"}')
+    two_way = ccxt.ExchangeError('bitget {"code":"40775","msg":"two-way positions"}')
+    assert find_rule("BITGET", one_way).handler is flip_bitget_one_way
+    assert find_rule("BITGET", two_way).handler is flip_bitget_two_way
+
+
+@pytest.mark.parametrize(
+    "exchange, error",
+    [
+        ("BINANCE", ccxt.InsufficientFunds('binance {"code":-2019,"msg":"Margin is insufficient."}')),
+        ("UPBIT", ccxt.ExchangeNotAvailable("upbit Internal error")),
+        ("OKX", ccxt.InsufficientFunds('okx {"code":"1","data":[{"sCode":"51008","sMsg":"Insufficient balance"}]}')),
+    ],
+)
+def test_find_rule_without_match(exchange, error):
+    assert find_rule(exchange, error) is None
+
+
+@pytest.mark.parametrize(
+    "message, code",
+    [
+        ('binance {"code":-4061,"msg":"x"}', "-4061"),
+        ('bybit {"retCode":10001,"retMsg":"x"}', "10001"),
+        ('okx {"code":"1","data":[{"sCode":"51000","sMsg":"x"}]}', "51000"),
+        ('okx {"code":"50001","data":[]}', "50001"),
+        ("binance Internal error", None),
+        ("timeout", None),
+    ],
+)
+def test_get_error_code(message, code):
+    assert get_error_code(Exception(message)) == code
+
+
+@pytest.mark.parametrize(
+    "side, params",
+    [
+        ("entry/buy", {"positionSide": "LONG"}),
+        ("entry/sell", {"positionSide": "SHORT"}),
+        ("close/buy", {"positionSide": "SHORT"}),
+        ("close/sell", {"positionSide": "LONG"}),
+    ],
+)
+def test_flip_binance_to_hedge(side, params):
+    instance = Instance("one-way")
+    args = flip_binance(instance, make_order(side=side), ARGS, "hedge")
+    assert args[5] == params
+    assert args[:5] == ARGS[:5]
+    # 모드 전환은 retry 가 결정
+    assert instance.position_mode == "one-way"
+
+
+def test_flip_binance_to_one_way():
+    instance = Instance("hedge")
+    assert flip_binance(instance, make_order(side="entry/buy"), ARGS, "one-way")[5] == {}
+    assert flip_binance(instance, make_order(side="close/sell"), ARGS, "one-way")[5] == {"reduceOnly": True}
+
+
+@pytest.mark.parametrize(
+    "mode, side, params",
+    [
+        ("hedge", "entry/buy", {"position_idx": 1}),
+        ("hedge", "entry/sell", {"position_idx": 2}),
+        ("hedge", "close/buy", {"reduceOnly": True, "position_idx": 2}),
+        ("hedge", "close/sell", {"reduceOnly": True, "position_idx": 1}),
+        ("one-way", "entry/buy", {"position_idx": 0}),
+        ("one-way", "close/sell", {"reduceOnly": True, "position_idx": 0}),
+    ],
+)
+def test_flip_bybit(mode, side, params):
+    args = flip_bybit(Instance(), make_order(exchange="BYBIT", side=side), ARGS, mode)
+    assert args[5] == params
+
+
+def test_flip_okx_to_hedge_sets_pos_side_and_leverage():
+    instance = Instance("hedge")
+    order = make_order(exchange="OKX", side="entry/sell", leverage=3)
+    args = asyncio.run(flip_okx(instance, order, ARGS, "hedge"))
+    assert args[5] == {"posSide": "short", "tdMode": "isolated"}
+    assert instance.leverage == (3, "BTC/USDT:USDT")
+
+
+def test_flip_okx_to_one_way_close():
+    instance = Instance("one-way")
+    args = asyncio.run(flip_okx(instance, make_order(exchange="OKX", side="close/buy"), ARGS, "one-way"))
+    assert args[5] == {"reduceOnly": True}
+    assert instance.leverage is None
+
+
+def test_flip_bitget_one_way_close_flips_side():
+    order = make_order(exchange="BITGET", side="close/sell")
+    args = flip_bitget_one_way(Instance(), order, ARGS[:2] + ("sell",) + ARGS[3:], "hedge")
+    assert args[2] == "buy"
+    assert args[5] == {"reduceOnly": True, "tradeSide": "close"}
+
+
+def test_flip_bitget_one_way_back_from_hedge():
+    args = flip_bitget_one_way(Instance(), make_order(exchange="BITGET"), ARGS[:5] + ({"marginMode": "crossed"},), "one-way")
+    assert args[5] == {"oneWayMode": True, "marginMode": "crossed"}
+
+
+def test_flip_bitget_two_way():
+    args = flip_bitget_two_way(Instance(), make_order(exchange="BITGET", side="close/sell"), ARGS, "one-way")
+    assert args[2] == "sell_single"
+    assert args[5] == {"reduceOnly": True, "side": "sell_single"}
+
+
+class FakeExchange:
+    def __init__(self, errors):
+        self.errors = list(errors)
+        self.calls = []
+        self.position_mode = "one-way"
+
+    async def create_order(self, *args):
+        self.calls.append(args)
+        if self.errors:
+            raise self.errors.pop(0)
+        return {"id": "1"}
+
+
+def run_retry(exchange, order, **kwargs):
+    async def run():
+        order_deadline.set(None)
+        return await retry(exchange.create_order, *ARGS, order_info=order, instance=exchange, delay=0, **kwargs)
+
+    return asyncio.run(run())
+
+
+def test_retry_flips_position_mode_and_succeeds():
+    exchange = FakeExchange([ccxt.InvalidOrder('binance {"code":-4061,"msg":"position side does not match"}')])
+    assert run_retry(exchange, make_order()) == {"id": "1"}
+    assert exchange.position_mode == "hedge"
+    assert [call[5] for call in exchange.calls] == [{}, {"positionSide": "LONG"}]
+
+
+def test_retry_aborts_on_unknown_error():
+    exchange = FakeExchange([ccxt.InsufficientFunds('binance {"code":-2019,"msg":"Margin is insufficient."}')])
+    with pytest.raises(ccxt.InsufficientFunds):
+        run_retry(exchange, make_order())
+    assert len(exchange.calls) == 1
+
+
+def test_retry_gives_up_after_max_attempts():
+    overloaded = 'binance {"code":-1001,"msg":"Internal error"}'
+    exchange = FakeExchange([ccxt.ExchangeNotAvailable(overloaded) for _ in range(5)])
+    with pytest.raises(ccxt.ExchangeNotAvailable):
+        run_retry(exchange, make_order(), max_attempts=3)
+    assert len(exchange.calls) == 3
+
+
+def test_retry_stops_at_order_deadline():
+    exchange = FakeExchange([ccxt.ExchangeNotAvailable('binance {"code":-1001,"msg":"Internal error"}')])
+
+    async def run():
+        order_deadline.set(0.0)
+        return await retry(exchange.create_order, *ARGS, order_info=make_order(), instance=exchange, delay=1)
+
+    with pytest.raises(ccxt.ExchangeNotAvailable):
+        asyncio.run(run())
+    assert len(exchange.calls) == 1
+
+
+class HedgeModeExchange:
+    """헤지 모드 계정: positionSide 없는 주문은 거부"""
+
+    def __init__(self):
+        self.position_mode = "one-way"
+        self.calls = []
+
+    async def create_order(self, *args):
+        self.calls.append(args)
+        await asyncio.sleep(0)
+        if "positionSide" not in args[5]:
+            raise ccxt.InvalidOrder('binance {"code":-4061,"msg":"position side does not match"}')
+        return {"id": str(len(self.calls))}
+
+
+def test_concurrent_orders_do_not_flip_the_mode_back():
+    exchange = HedgeModeExchange()
+
+    async def run():
+        order_deadline.set(None)
+        return await asyncio.gather(
+            *(
+                retry(exchange.create_order, *ARGS, order_info=make_order(), instance=exchange, delay=0, max_attempts=2, position_mode="one-way")
+                for _ in range(2)
+            )
+        )
+
+    assert len(asyncio.run(run())) == 2
+    assert exchange.position_mode == "hedge"
+    assert len(exchange.calls) == 4
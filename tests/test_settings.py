@@ -0,0 +1,69 @@
+import os
+import threading
+import pytest
+from exchange import pexchange
+from exchange.registry import ClientKey, ExchangeRegistry
+from exchange.utility.setting import SettingsProxy, SettingsStore
+
+
+def write_env(path, text: str):
+    path.write_text(text)
+    # 같은 시각 안에 두 번 써도 워처가 바뀐 것을 알도록 수정 시각을 밀어둠
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+@pytest.fixture
+def env_file(tmp_path):
+    path = tmp_path / ".env"
+    write_env(path, "ORDER_WORKERS=2\nBINANCE_KEY=old\n")
+    return path
+
+
+def test_watcher_reloads_and_notifies_subscribers(env_file):
+    store = SettingsStore(str(env_file), interval=0.05)
+    settings = SettingsProxy(store)
+    changes = []
+    changed = threading.Event()
+
+    def listener(old, new):
+        changes.append((old.ORDER_WORKERS, new.ORDER_WORKERS))
+        changed.set()
+
+    store.subscribe(listener)
+    store.start_watcher()
+    try:
+        assert settings.ORDER_WORKERS == 2
+        write_env(env_file, "ORDER_WORKERS=8\nBINANCE_KEY=old\n")
+        assert changed.wait(5)
+    finally:
+        store.stop_watcher()
+    assert changes == [(2, 8)]
+    assert settings.ORDER_WORKERS == 8
+
+
+def test_invalid_env_keeps_previous_snapshot(env_file):
+    store = SettingsStore(str(env_file))
+    calls = []
+    store.subscribe(lambda old, new: calls.append(new))
+    write_env(env_file, "ORDER_WORKERS=many\n")
+    assert store.reload() is False
+    assert store.current.ORDER_WORKERS == 2
+    assert calls == []
+
+
+def test_changed_keys_invalidate_their_clients(env_file, monkeypatch):
+    store = SettingsStore(str(env_file))
+
+    async def factory(key):
+        return object()
+
+    registry = ExchangeRegistry(factory)
+    keys = [ClientKey("BINANCE", "default", "swap"), ClientKey("OKX", "default", "spot")]
+    registry._clients = {key: object() for key in keys}
+    monkeypatch.setattr(pexchange, "registry", registry)
+    store.subscribe(pexchange.invalidate_changed)
+
+    write_env(env_file, "ORDER_WORKERS=2\nBINANCE_KEY=new\n")
+    assert store.reload()
+    assert registry._stale == {keys[0]}
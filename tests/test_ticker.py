@@ -0,0 +1,59 @@
+import asyncio
+from exchange.ticker import PriceService
+from exchange.utility import settings_store
+
+
+class Client:
+    id = "binance"
+
+    def __init__(self):
+        self.has = {"watchTicker": True}
+        self.rest = 0
+        self.stream: asyncio.Queue = asyncio.Queue()
+
+    async def fetch_ticker(self, symbol):
+        self.rest += 1
+        return {"symbol": symbol, "last": 100.0 + self.rest}
+
+    async def watch_ticker(self, symbol):
+        return await self.stream.get()
+
+
+def test_stream_price_is_served_from_memory(monkeypatch):
+    async def run():
+        client = Client()
+        prices = PriceService(client)
+        first = await prices.get_price("BTC/USDT")
+        client.stream.put_nowait({"symbol": "BTC/USDT", "last": 200.0})
+        await asyncio.sleep(0)
+        second = await prices.get_price("BTC/USDT")
+        prices.stop()
+        return client.rest, first, second
+
+    assert asyncio.run(run()) == (1, 101.0, 200.0)
+
+
+def test_stale_stream_falls_back_to_rest(monkeypatch):
+    monkeypatch.setattr(
+        settings_store, "_snapshot", settings_store.current.copy(update={"TICKER_MAX_AGE": 0.05})
+    )
+
+    async def run():
+        client = Client()
+        prices = PriceService(client)
+        await prices.get_price("BTC/USDT")
+        # 스트림이 멈춘 채 TICKER_MAX_AGE 가 지나면 REST 로 다시 조회
+        await asyncio.sleep(0.1)
+        price = await prices.get_price("BTC/USDT")
+        prices.stop()
+        return client.rest, price
+
+    assert asyncio.run(run()) == (2, 102.0)
+
+
+def test_older_rest_response_does_not_overwrite_stream():
+    client = Client()
+    prices = PriceService(client)
+    prices._set("BTC/USDT", {"last": 200.0}, updated_at=10.0)
+    prices._set("BTC/USDT", {"last": 101.0}, updated_at=5.0)
+    assert prices._tickers["BTC/USDT"][0]["last"] == 200.0
@@ -0,0 +1,101 @@
+import asyncio
+import re
+import orjson
+import httpx
+import main
+from exchange.dedup import AlertDedup
+from exchange.model import MarketOrder
+from exchange.order_queue import OrderQueue
+from exchange.timing import OrderTrace, current_trace, trace_stage, traced
+
+SERVER_TIMING = re.compile(r"^[a-z_]+;dur=\d+\.\d$")
+
+
+def test_server_timing_header_format():
+    trace = OrderTrace(started_at=100.0)
+    trace.add("validation", 100.0, 100.0012)
+    trace.add("dedup", 100.0012, 100.0042)
+    header = trace.to_server_timing()
+    entries = header.split(", ")
+    assert entries[:2] == ["validation;dur=1.2", "dedup;dur=3.0"]
+    assert entries[-1].startswith("total;dur=")
+    assert all(SERVER_TIMING.match(entry) for entry in entries)
+
+
+def test_order_response_has_server_timing(tmp_path, monkeypatch):
+    dedup = AlertDedup(str(tmp_path / "queue.db"))
+    monkeypatch.setattr(main, "alert_dedup", dedup)
+
+    async def put(order_info, received_at=None, trace=None):
+        return 1
+
+    monkeypatch.setattr(main.order_queue, "put", put)
+    body = dict(exchange="BINANCE", base="BTC", quote="USDT.P", side="entry/buy", amount=0.01, password="test")
+    # 화이트리스트 미들웨어가 IP 를 확인하므로 루프백 주소로 요청
+    transport = httpx.ASGITransport(app=main.app, client=("127.0.0.1", 50000))
+
+    async def run():
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post("/order", json=body)
+
+    try:
+        response = asyncio.run(run())
+    finally:
+        dedup.close()
+    assert response.json() == {"result": "success", "job_id": 1}
+    entries = response.headers["Server-Timing"].split(", ")
+    assert [entry.split(";")[0] for entry in entries] == ["validation", "dedup", "enqueue", "total"]
+    assert all(SERVER_TIMING.match(entry) for entry in entries)
+
+
+def test_trace_json_has_relative_stages():
+    trace = OrderTrace(started_at=10.0)
+    trace.add("get_bot", 10.5, 10.75)
+    assert orjson.loads(trace.to_json()) == [
+        {"stage": "get_bot", "start_ms": 500.0, "duration_ms": 250.0}
+    ]
+
+
+def test_stage_is_skipped_without_trace():
+    @traced("create_order")
+    async def create_order():
+        with trace_stage("log"):
+            return "ok"
+
+    async def run():
+        current_trace.set(None)
+        return await create_order()
+
+    assert asyncio.run(run()) == "ok"
+
+
+def test_job_trace_is_stored_as_json(tmp_path):
+    queue = OrderQueue(str(tmp_path / "queue.db"))
+    order_info = MarketOrder(
+        exchange="BINANCE", base="BTC", quote="USDT.P", side="entry/buy", amount=0.01, password="test"
+    )
+
+    @traced("create_order")
+    async def handler(order_info):
+        with trace_stage("get_bot"):
+            pass
+        return {"id": "1"}
+
+    async def run():
+        await queue.start(handler, workers=1)
+        trace = OrderTrace()
+        trace.add("validation", trace.started_at)
+        job_id = await queue.put(order_info, trace=trace)
+        await asyncio.gather(*(q.join() for q in queue._queues))
+        await queue.stop()
+        return job_id
+
+    try:
+        job_id = asyncio.run(run())
+        (trace_json,) = queue._fetch_all("SELECT trace FROM jobs WHERE id = ?", (job_id,))[0]
+    finally:
+        queue.close()
+    stages = orjson.loads(trace_json)
+    assert [stage["stage"] for stage in stages] == ["validation", "queue", "get_bot", "create_order"]
+    assert all(set(stage) == {"stage", "start_ms", "duration_ms"} for stage in stages)
+    assert all(stage["duration_ms"] >= 0 for stage in stages)